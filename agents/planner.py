@@ -148,18 +148,19 @@ def _find_signup_fields(model: Dict[str,Any]) -> Optional[Dict[str,str]]:
 
 # ----------------------------- suites -----------------------------
 
+def _login_step(user: str, password: str, success: Optional[str] = None) -> Dict[str, Any]:
+    """צעד login יחיד (core/actions/login.py) – מזהה סיסמה/משתמש/submit בעצמו, כולל פתיחת מודאל."""
+    value = {"user": user, "password": password}
+    if success:
+        value["success"] = success
+    return {"type": "login", "value": value}
+
 def _suite_login(model: Dict[str,Any]) -> Optional[List[Dict[str,Any]]]:
-    tri = _find_login_triplet(model)
-    if not tri:
+    if not _first_input_by_type(model, "password"):
         return None
     steps = [
         {"type": "goto", "selector": "/"},
-        {"type": "wait_for_selector", "selector": tri["user"], "value": "visible"},
-        {"type": "wait_for_selector", "selector": tri["pass"], "value": "visible"},
-        {"type": "fill", "selector": tri["user"], "value": "${USERNAME}"},
-        {"type": "fill", "selector": tri["pass"], "value": "${PASSWORD}"},
-        {"type": "click", "selector": tri["submit"]},
-        {"type": "wait_for_selector", "selector": _success_probe(model), "value": "visible"},
+        _login_step("${USERNAME}", "${PASSWORD}", _success_probe(model)),
         {"type": "screenshot", "value": "after_login.png"},
     ]
     return [{"id": "AI-AUTO-LOGIN", "name": "AI Login (page)", "steps": steps}]
@@ -181,32 +182,17 @@ def _suite_signup_then_login(model: Dict[str,Any]) -> Optional[List[Dict[str,Any
     steps += [
         {"type": "wait_for_selector", "selector": trig, "value": "visible"},
         {"type": "click", "selector": trig},
-        {"type": "wait_for_selector", "selector": fields["user"], "value": "visible"},
-        {"type": "wait_for_selector", "selector": fields["pass"], "value": "visible"},
-        {"type": "fill", "selector": fields["user"], "value": "${NEW_USERNAME}"},
-        {"type": "fill", "selector": fields["pass"], "value": "${NEW_PASSWORD}"},
+        # fill_form ממתין לשדות וממלא את שניהם ב-evaluate אחד
+        {"type": "fill_form", "value": {fields["user"]: "${NEW_USERNAME}", fields["pass"]: "${NEW_PASSWORD}"}},
         {"type": "click", "selector": fields["submit"], "continue_on_fail": True},
-        {"type": "wait", "value": "1200ms", "continue_on_fail": True},
+        {"type": "wait_for_network_idle", "value": "500ms", "continue_on_fail": True},
         {"type": "screenshot", "value": "after_signup.png", "continue_on_fail": True},
     ]
-    # Login (modal/page)
+    # Login (modal/page) – צעד login אחד; טריגר מפורש אם זוהה, אחרת הצעד פותח בעצמו
     if login_trig:
-        steps += [
-            {"type": "click", "selector": login_trig},
-            {"type": "wait_for_selector", "selector": "input[type=text], input[type=email], #loginusername, [name*=user i], [name*=email i]", "value": "visible"},
-            {"type": "wait_for_selector", "selector": "input[type=password], #loginpassword, [name*=pass i]", "value": "visible"},
-            {"type": "fill", "selector": "input[type=text], input[type=email], #loginusername, [name*=user i], [name*=email i]", "value": "${NEW_USERNAME}"},
-            {"type": "fill", "selector": "input[type=password], #loginpassword, [name*=pass i]", "value": "${NEW_PASSWORD}"},
-            {"type": "click", "selector": "#logInModal .modal-footer .btn-primary", "continue_on_fail": True},
-        ]
+        steps += [{"type": "click", "selector": login_trig}, _login_step("${NEW_USERNAME}", "${NEW_PASSWORD}")]
     elif login_trip:
-        steps += [
-            {"type": "wait_for_selector", "selector": login_trip["user"], "value": "visible"},
-            {"type": "wait_for_selector", "selector": login_trip["pass"], "value": "visible"},
-            {"type": "fill", "selector": login_trip["user"], "value": "${NEW_USERNAME}"},
-            {"type": "fill", "selector": login_trip["pass"], "value": "${NEW_PASSWORD}"},
-            {"type": "click", "selector": login_trip["submit"]},
-        ]
+        steps += [_login_step("${NEW_USERNAME}", "${NEW_PASSWORD}")]
     else:
         steps += [{"type": "screenshot", "value": "no_login_path.png"}]
         return [{"id": "AI-AUTO-SIGNUP", "name": "AI Sign up (no login path found)", "steps": steps}]
@@ -253,7 +239,7 @@ def _suite_browse_clickables(graph: Dict[str, Any], limit_per_page: int = 5) ->
             steps += [
                 {"type": "wait_for_selector", "selector": c["selector"], "value": "visible", "retry": 1, "retry_delay_ms": 400, "continue_on_fail": True},
                 {"type": "click", "selector": c["selector"], "continue_on_fail": True},
-                {"type": "wait", "value": "800ms", "continue_on_fail": True},
+                {"type": "wait_for_dom_stable", "value": "300ms", "continue_on_fail": True},
                 {"type": "screenshot", "value": f"clicked_{safe_name}.png", "continue_on_fail": True},
             ]
         out.append({
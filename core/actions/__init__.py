@@ -1,31 +1,44 @@
 from .browser_actions import action_goto, action_click, action_press
+from .login import action_login  # זיהוי טופס לוגין בסבב אחד
 from .form_actions import (
     action_fill, action_select_option, action_wait, action_screenshot,
     action_wait_for_selector,   # ← חדש
 )
+from .wait_actions import action_wait_for_response, action_wait_for_network_idle, action_wait_for_dom_stable  # המתנות מבוססות-תנאי
+from .fill_form import action_fill_form  # הרבה שדות ב-evaluate אחד
+from .resolver import resolve_element  # בחירת אלמנט (מודאל/נראות/disabled) בסבב אחד – לכל פעולה
+from .assert_all import action_assert_all  # הרבה בדיקות בלולאת polling אחת
 from .assert_actions import (
     action_assert_visible, action_assert_text, action_assert_contains, action_assert_url
 )
 
 # -----------------------------------------------------
 # מיפוי שם פעולה ← פונקציה
+# כל פעולה היא flow (core/engine.py) – אותו מימוש ל-sync ול-async:
+#   run_sync(ACTION_REGISTRY["click"](page, ...)) / await run_async(...)
 # -----------------------------------------------------
 ACTION_REGISTRY = {
     # פעולות ניווט/דפדפן
     "goto": action_goto,
     "click": action_click,
     "press": action_press,
+    "login": action_login,      # value: {user, password[, success]}
 
     # פעולות טפסים/דף
     "fill": action_fill,
+    "fill_form": action_fill_form,      # value: {selector|name|label: value}
     "select_option": action_select_option,
     "wait": action_wait,
     "screenshot": action_screenshot,
     "wait_for_selector": action_wait_for_selector,  # ← חדש
+    "wait_for_response": action_wait_for_response,          # selector: URL glob/re:, value: status
+    "wait_for_network_idle": action_wait_for_network_idle,  # value: quiet window ("500ms")
+    "wait_for_dom_stable": action_wait_for_dom_stable,      # value: quiet window ("300ms")
 
     # אימותים (assertions)
     "assert_visible": action_assert_visible,
     "assert_text": action_assert_text,
     "assert_contains": action_assert_contains,
     "assert_url": action_assert_url,
+    "assert_all": action_assert_all,    # value: [checks] או {checks, soft}
 }
\ No newline at end of file
@@ -1,10 +1,18 @@
 from playwright.sync_api import expect
+from playwright.async_api import expect as async_expect
 import re
+from core.engine import call, twin
+
+
+def _expect(target, check: str, *args, **kwargs):
+    """expect(target).<check>(...) – עם ה-expect של המנוע שמריץ את ה-flow."""
+    return twin(lambda: getattr(expect(target), check)(*args, **kwargs),
+                lambda: getattr(async_expect(target), check)(*args, **kwargs))
 
 def action_assert_visible(page, *, selector, timeout_ms=7000, **_):
     loc = page.locator(selector)
     try:
-        expect(loc).to_be_visible(timeout=timeout_ms)
+        yield _expect(loc, "to_be_visible", timeout=timeout_ms)
     except Exception as e:
         raise AssertionError(f"Expected VISIBLE: {selector}. Error: {e}")
 
@@ -16,10 +24,10 @@ def action_assert_text(page, *, selector, value, timeout_ms=7000, **_):
     loc = page.locator(selector)
     try:
         # Playwright כבר מנרמל רווחים בתוכו; אם צריך קפדנות גבוהה אפשר להוריד strip()
-        expect(loc).to_have_text(str(value), timeout=timeout_ms)
+        yield _expect(loc, "to_have_text", str(value), timeout=timeout_ms)
     except Exception as e:
         try:
-            actual = loc.inner_text(timeout=1000)
+            actual = yield call(loc.inner_text, timeout=1000)
         except Exception:
             actual = "<unavailable>"
         raise AssertionError(
@@ -34,10 +42,10 @@ def action_assert_contains(page, *, selector, value, timeout_ms=7000, **_):
     try:
         # אם value הוא str נקי – זה בודק 'contains'; אם תרצה case-insensitive:
         # expect(loc).to_contain_text(re.compile(re.escape(str(value)), re.I), timeout=timeout_ms)
-        expect(loc).to_contain_text(str(value), timeout=timeout_ms)
+        yield _expect(loc, "to_contain_text", str(value), timeout=timeout_ms)
     except Exception as e:
         try:
-            actual = loc.inner_text(timeout=1000)
+            actual = yield call(loc.inner_text, timeout=1000)
         except Exception:
             actual = "<unavailable>"
         raise AssertionError(
@@ -51,7 +59,7 @@ def action_assert_url(page, *, value, timeout_ms=7000, **_):
     try:
         # שימוש ב-expect מחכה לשינוי URL עד ה-timeout
         pattern = re.compile(re.escape(str(value)))
-        expect(page).to_have_url(pattern, timeout=timeout_ms)
+        yield _expect(page, "to_have_url", pattern, timeout=timeout_ms)
     except Exception as e:
         current = page.url
         raise AssertionError(
@@ -66,11 +74,11 @@ def action_assert_exists(page, *, selector, timeout_ms=7000, **_):
     """
     loc = page.locator(selector)
     try:
-        expect(loc).to_have_count(lambda c: c >= 1, timeout=timeout_ms)  # טריק, אבל ברור יותר:
+        yield _expect(loc, "to_have_count", lambda c: c >= 1, timeout=timeout_ms)  # טריק, אבל ברור יותר:
         # לחלופין:
         # if loc.count() == 0: raise AssertionError(...)
     except Exception:
-        if loc.count() == 0:
+        if (yield call(loc.count)) == 0:
             raise AssertionError(f"Expected element to exist: {selector}")
         # אם נסיבות אחרות:
         raise
@@ -81,6 +89,6 @@ def action_assert_not_visible(page, *, selector, timeout_ms=7000, **_):
     """
     loc = page.locator(selector)
     try:
-        expect(loc).not_to_be_visible(timeout=timeout_ms)
+        yield _expect(loc, "not_to_be_visible", timeout=timeout_ms)
     except Exception as e:
         raise AssertionError(f"Expected NOT VISIBLE: {selector}. Error: {e}")
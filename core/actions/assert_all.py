@@ -0,0 +1,182 @@
+# core/actions/assert_all.py
+from __future__ import annotations
+import re, time
+from typing import Any, Dict, List
+
+from core.actions.resolver import POLL_MS
+from core.engine import call, pause
+
+# assert_all: הרבה בדיקות בלולאת polling אחת עם deadline משותף. בכל סבב evaluate אחד
+# בודק את כל הבדיקות שעוד לא עברו עם selector "פשוט" (compound CSS בלי צירופים/pseudo –
+# #id, .cls, tag, [attr=..]), כולל חדירה ל-shadow roots פתוחים כמו ב-Playwright.
+# כל selector אחר (צירופים שעשויים לחצות shadow root, text=, xpath=, //...) נבדק דרך
+# locator.evaluate_all משלו באותו סבב, עם הסמנטיקה המלאה של Playwright.
+# בסוף – כל הכישלונות עם הערך בפועל.
+KINDS = ("visible", "hidden", "text", "contains", "count", "url", "title")
+
+# (els, check) => {ok, actual} – משותף ל-batch ול-locator.evaluate_all
+JUDGE_JS = """
+(els, c) => {
+  const visible = (el) => {
+    const r = el.getBoundingClientRect();
+    if (!r.width || !r.height) return false;
+    const cs = getComputedStyle(el);
+    return cs.visibility !== 'hidden' && cs.display !== 'none';
+  };
+  const norm = (s) => (s || '').replace(/\\s+/g, ' ').trim();
+  const textOf = (el) => el ? norm(el.innerText || el.textContent) : null;
+  switch (c.kind) {
+    case 'visible': { const n = els.filter(visible).length; return {ok: n > 0, actual: `${els.length} match(es), ${n} visible`}; }
+    case 'hidden':  { const n = els.filter(visible).length; return {ok: n === 0, actual: `${n} visible`}; }
+    case 'text':    { const t = textOf(els[0]); return {ok: t === norm(String(c.expected)), actual: t}; }
+    case 'contains': {
+      const ts = els.map(textOf);
+      return {ok: ts.some(t => t.includes(String(c.expected))), actual: ts.length ? ts[0] : null};
+    }
+    case 'count': {
+      const n = els.length;
+      const ok = (c.expected == null || n === c.expected) && (c.min == null || n >= c.min) && (c.max == null || n <= c.max);
+      return {ok, actual: n};
+    }
+    case 'url':   return {ok: location.href.includes(String(c.expected)), actual: location.href};
+    case 'title': return {ok: document.title.includes(String(c.expected)), actual: document.title};
+  }
+  return {ok: false, actual: 'unknown check ' + c.kind};
+}
+"""
+
+BATCH_JS = """
+(checks) => {
+  const judge = %s;
+  // document + כל ה-shadow roots הפתוחים (גם מקוננים) – נאסף פעם אחת לסבב, רק אם צריך
+  let roots = null;
+  const allRoots = () => {
+    if (roots) return roots;
+    roots = [document];
+    for (let i = 0; i < roots.length; i++) {
+      for (const el of roots[i].querySelectorAll('*')) if (el.shadowRoot) roots.push(el.shadowRoot);
+    }
+    return roots;
+  };
+  return checks.map((c) => {
+    if (!c.sel) return judge([], c);
+    if (!c.simple) return {engine: true};   // ייבדק דרך locator
+    let els;
+    try { els = allRoots().flatMap(r => Array.from(r.querySelectorAll(c.sel))); }
+    catch (e) { return {engine: true}; }
+    return judge(els, c);
+  });
+}
+""" % JUDGE_JS.strip()
+
+# compound selector בלי צירופים (רווח, >, +, ~) ובלי pseudo – אותה תוצאה ב-querySelectorAll
+# לכל root וב-CSS של Playwright
+_SIMPLE_CSS = re.compile(r"^(?:[\w\-*]+|[#.][\w\-]+|\[[^\]]*\])+$")
+
+
+def _label(c: Dict[str, Any]) -> str:
+    if c["kind"] in ("url", "title"):
+        return f"{c['kind']} contains {c['expected']!r}"
+    if c["kind"] == "count":
+        lim = " ".join(f"{k}={c[k]}" for k in ("expected", "min", "max") if c.get(k) is not None)
+        return f"count {c['sel']!r} {lim}"
+    if c["kind"] in ("text", "contains"):
+        return f"{c['kind']} {c['sel']!r} {c['expected']!r}"
+    return f"{c['kind']} {c['sel']!r}"
+
+
+def parse_checks(value: Any) -> tuple:
+    """
+    value של assert_all – רשימת בדיקות, או {checks: [...], soft: true}:
+      - visible: "#header"
+      - hidden: ".spinner"
+      - {text: ".title", equals: "Products"}
+      - {contains: ".cart", value: "3"}
+      - {count: ".item", equals: 6}        # או min / max
+      - {url: "/inventory"}                # url/title: מכיל
+    soft=true: כישלונות נרשמים והריצה ממשיכה, אבל נכשלת בסופה.
+    מחזיר (checks, soft).
+    """
+    soft = False
+    if isinstance(value, dict):
+        soft = str(value.get("soft", False)).strip().lower() in ("1", "true", "yes", "on")
+        value = value.get("checks")
+    if not isinstance(value, list) or not value:
+        raise ValueError("assert_all step requires a non-empty list of checks")
+    checks: List[Dict[str, Any]] = []
+    for i, item in enumerate(value, start=1):
+        kind = next((k for k in KINDS if isinstance(item, dict) and k in item), None)
+        if not kind:
+            raise ValueError(f"assert_all check {i}: expected one of {', '.join(KINDS)}")
+        c: Dict[str, Any] = {"kind": kind, "sel": None, "expected": None, "min": None, "max": None,
+                             "simple": False}
+        if kind in ("url", "title"):
+            c["expected"] = item[kind]
+        else:
+            c["sel"] = str(item[kind])
+            c["simple"] = bool(_SIMPLE_CSS.match(c["sel"].strip()))
+            c["expected"] = item.get("equals", item.get("value"))
+            if kind in ("text", "contains") and c["expected"] is None:
+                raise ValueError(f"assert_all check {i}: '{kind}' requires equals/value")
+        if kind == "count":
+            c["expected"] = None if c["expected"] is None else int(c["expected"])
+            c["min"] = None if item.get("min") is None else int(item["min"])
+            c["max"] = None if item.get("max") is None else int(item["max"])
+        c["label"] = _label(c)
+        checks.append(c)
+    return checks, soft
+
+
+def failure_message(outcomes: List[Dict[str, Any]]) -> str:
+    bad = [o for o in outcomes if not o["ok"]]
+    lines = [f"assert_all: {len(bad)}/{len(outcomes)} checks failed"]
+    lines += [f"  ✗ {o['check']}  actual={o.get('actual')!r}" for o in bad]
+    return "\n".join(lines)
+
+
+def _settle(checks, done, res) -> List[int]:
+    """ממזג תוצאות סבב; מחזיר אינדקסים של בדיקות של מנוע Playwright (לא CSS)."""
+    engine = []
+    for i, r in zip([i for i in range(len(checks)) if not done[i]["ok"]], res):
+        if r.get("engine"):
+            engine.append(i)
+        else:
+            done[i] = {"check": checks[i]["label"], "ok": bool(r.get("ok")), "actual": r.get("actual")}
+    return engine
+
+
+def _result(outcomes, soft: bool) -> Dict[str, Any]:
+    if all(o["ok"] for o in outcomes):
+        return {"checks": outcomes}
+    if not soft:
+        raise AssertionError(failure_message(outcomes))
+    return {"checks": outcomes, "soft_failed": failure_message(outcomes)}
+
+
+def action_assert_all(page, *, value=None, timeout_ms=7000, **_):
+    """
+    כל הבדיקות חולקות timeout_ms אחד; בדיקה שעברה לא נבדקת שוב. בכישלון – כל הבדיקות
+    שנכשלו עם הערך בפועל (לא רק הראשונה). soft: מחזיר soft_failed במקום לזרוק.
+    """
+    checks, soft = parse_checks(value)
+    deadline = time.monotonic() + max(0, int(timeout_ms)) / 1000.0
+    done = [{"check": c["label"], "ok": False, "actual": None} for c in checks]
+    n = 0
+    while True:
+        todo = [c for i, c in enumerate(checks) if not done[i]["ok"]]
+        try:
+            res = yield call(page.evaluate, BATCH_JS, todo)
+        except Exception:
+            res = [{"ok": False, "actual": "<page not ready>"}] * len(todo)  # ניווט באמצע – סבב הבא
+        for i in _settle(checks, done, res):
+            try:
+                r = yield call(page.locator(checks[i]["sel"]).evaluate_all, JUDGE_JS, checks[i])
+            except Exception as e:
+                r = {"ok": False, "actual": f"<{type(e).__name__}>"}
+            done[i] = {"check": checks[i]["label"], "ok": bool(r.get("ok")), "actual": r.get("actual")}
+        left = deadline - time.monotonic()
+        if all(o["ok"] for o in done) or left <= 0:
+            break
+        yield pause(min(left, POLL_MS[min(n, len(POLL_MS) - 1)] / 1000.0))
+        n += 1
+    return _result(done, soft)
@@ -0,0 +1,170 @@
+# core/actions/fill_form.py
+from __future__ import annotations
+import time
+from typing import Any, Dict, List
+
+from core.actions.resolver import MODAL_CSS, POLL_MS
+from core.engine import call, pause
+
+# fill_form: מילוי טופס שלם ב-evaluate אחד. כל מפתח הוא selector, או (אם אינו selector
+# תקין / לא נמצא) name / id / טקסט label / aria-label / placeholder. הערך נקבע דרך ה-setter
+# המקורי של הדפדפן (כדי ש-React/Vue יראו את השינוי) ואחריו input + change + blur.
+# שדות שעדיין לא קיימים בדף נוסים שוב בסבב הבא, עד timeout_ms אחד לכל הטופס.
+FILL_JS = """
+(root, [fields, modalCss]) => {
+  const visible = (el) => {
+    const r = el.getBoundingClientRect();
+    if (!r.width || !r.height) return false;
+    const cs = getComputedStyle(el);
+    return cs.visibility !== 'hidden' && cs.display !== 'none';
+  };
+  const usable = (el) => !(el.disabled || el.readOnly || el.getAttribute('aria-disabled') === 'true'
+                           || el.closest('fieldset[disabled]'));
+  const modals = Array.from(document.querySelectorAll(modalCss)).filter(visible);
+  const inModal = (el) => modals.some(m => m.contains(el));
+  const norm = (s) => (s || '').replace(/\\s+/g, ' ').trim().toLowerCase();
+  const CONTROLS = 'input, select, textarea, [contenteditable=""], [contenteditable=true]';
+
+  const pick = (els) => {
+    els = els.filter(el => el && (visible(el) || el.type === 'checkbox' || el.type === 'radio'));
+    return els.find(inModal) || els[0] || null;
+  };
+  const all = (sel) => { try { return Array.from(root.querySelectorAll(sel)); } catch (e) { return null; } };
+  const find = (key) => {
+    const bySel = all(key);
+    if (bySel && bySel.length) {
+      // selector שמצביע על label/עוטף – השדה שבתוכו
+      const els = bySel.map(el => el.matches(CONTROLS) ? el : (el.control || el.querySelector(CONTROLS)));
+      const el = pick(els);
+      if (el) return el;
+    }
+    const k = norm(key);
+    const ctrls = Array.from(root.querySelectorAll(CONTROLS));
+    let el = pick(ctrls.filter(c => c.name === key || c.id === key));
+    if (el) return el;
+    const labels = Array.from(root.querySelectorAll('label'));
+    el = pick(labels.filter(l => norm(l.textContent) === k).map(l => l.control));
+    if (el) return el;
+    el = pick(ctrls.filter(c => norm(c.getAttribute('aria-label')) === k || norm(c.placeholder) === k));
+    if (el) return el;
+    return pick(labels.filter(l => norm(l.textContent).includes(k)).map(l => l.control));
+  };
+
+  const truthy = (v) => v === true || ['true', '1', 'yes', 'on', 'checked', 'y', 'כן'].includes(norm(String(v)));
+  const fire = (el, names) => names.forEach(n => el.dispatchEvent(new Event(n, {bubbles: true})));
+  const setNative = (el, v) => {
+    const proto = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+    const desc = Object.getOwnPropertyDescriptor(proto, 'value');
+    if (desc && desc.set) desc.set.call(el, v); else el.value = v;
+  };
+  const labelOf = (el) => norm((el.labels && el.labels[0] && el.labels[0].textContent) || el.getAttribute('aria-label'));
+
+  const out = [];
+  for (const [key, value] of fields) {
+    const el = find(key);
+    if (!el) { out.push({key, ok: false, error: 'not found'}); continue; }
+    // radio: הזמינות נבדקת על האופציה שנבחרה בקבוצה, לא על הכפתור שנמצא לפי המפתח
+    if (el.type !== 'radio' && !usable(el)) { out.push({key, ok: false, error: 'disabled'}); continue; }
+    const tag = el.tagName.toLowerCase();
+    const type = (el.type || '').toLowerCase();
+    try {
+      if (tag === 'select') {
+        const want = Array.isArray(value) ? value.map(String) : [String(value)];
+        const opts = Array.from(el.options);
+        const hits = want.map(w => opts.find(o => o.value === w) || opts.find(o => norm(o.label) === norm(w)));
+        if (hits.some(h => !h)) { out.push({key, ok: false, kind: 'select', error: 'option not found'}); continue; }
+        opts.forEach(o => { o.selected = hits.includes(o); });
+        fire(el, ['input', 'change']);
+        out.push({key, ok: true, kind: 'select'});
+      } else if (type === 'checkbox') {
+        const on = truthy(value);
+        if (el.checked !== on) el.click();
+        out.push({key, ok: el.checked === on, kind: 'checkbox'});
+      } else if (type === 'radio') {
+        // קודם value/label בקבוצה (גם "yes"/"1" יכולים להיות value של אופציה); רק true
+        // בוליאני אמיתי = הכפתור עצמו. false נדחה – radio אי אפשר "לבטל"
+        if (value === false) { out.push({key, ok: false, kind: 'radio', error: 'radio cannot be unchecked'}); continue; }
+        let target = null;
+        if (value !== true) {
+          const group = el.name ? Array.from((el.form || document).querySelectorAll('input[type=radio]'))
+                                    .filter(r => r.name === el.name) : [el];
+          target = group.find(r => r.value === String(value)) || group.find(r => labelOf(r) === norm(String(value)));
+        } else {
+          target = el;
+        }
+        if (!target) { out.push({key, ok: false, kind: 'radio', error: 'option not found'}); continue; }
+        if (!usable(target)) { out.push({key, ok: false, kind: 'radio', error: 'disabled'}); continue; }
+        if (!target.checked) target.click();
+        out.push({key, ok: target.checked, kind: 'radio'});
+      } else if (el.isContentEditable) {
+        el.focus();
+        el.textContent = String(value ?? '');
+        fire(el, ['input', 'blur']);
+        out.push({key, ok: true, kind: 'contenteditable'});
+      } else {
+        el.focus();
+        setNative(el, String(value ?? ''));
+        fire(el, ['input', 'change']);
+        el.dispatchEvent(new FocusEvent('blur'));
+        out.push({key, ok: true, kind: tag === 'textarea' ? 'textarea' : 'input'});
+      }
+    } catch (e) {
+      out.push({key, ok: false, error: String(e && e.message || e)});
+    }
+  }
+  return out;
+}
+"""
+
+
+# שגיאות שעשויות להיפתר בסבב הבא (שדה נטען באיחור / מופעל אחרי שדה קודם). אם נשארו
+# כאלה ב-timeout הצעד נכשל ב-RuntimeError (חולף – ה-retry של הצעד ינסה שוב), אחרת AssertionError.
+RETRY_ERRORS = ("not found", "disabled")
+
+
+def form_fields(value: Any) -> Dict[str, Any]:
+    """value של fill_form: מיפוי {selector|name|label: ערך} (לא ריק)."""
+    if not isinstance(value, dict) or not value:
+        raise ValueError("fill_form step requires value: {selector|name|label: value, ...}")
+    return value
+
+
+def form_error(outcomes: List[Dict[str, Any]]) -> str:
+    bad = [f"{o['key']!r}: {o.get('error') or 'not set'}" for o in outcomes if not o.get("ok")]
+    return f"fill_form: {len(bad)}/{len(outcomes)} שדות נכשלו – " + "; ".join(bad)
+
+
+def action_fill_form(page, *, selector=None, value=None, timeout_ms=7000, **_):
+    """
+    ממלא הרבה שדות בסבב אחד מול הדפדפן. שדה שלא נמצא עדיין (נטען/נפתח באיחור) נוסה שוב
+    בסבבים הבאים; כישלון סופי (אופציה לא קיימת, disabled, timeout) מפיל את הצעד עם פירוט לכל שדה.
+    selector (אופציונלי) מגביל את החיפוש למכל – למשל form או מודאל.
+    """
+    fields = form_fields(value)
+    root = page.locator(selector).first if selector else page.locator(":root")
+    deadline = time.monotonic() + max(0, int(timeout_ms)) / 1000.0
+    done: Dict[str, Dict[str, Any]] = {}
+    pending = list(fields.items())
+    n = 0
+    while pending:
+        left = deadline - time.monotonic()
+        try:
+            res = yield call(root.evaluate, FILL_JS, [pending, MODAL_CSS], timeout=max(1, int(left * 1000)))
+        except Exception:
+            res = []
+        for o in res:
+            done[o["key"]] = o
+        pending = [(k, v) for k, v in pending
+                   if not done.get(k, {}).get("ok") and done.get(k, {}).get("error", "not found") in RETRY_ERRORS]
+        left = deadline - time.monotonic()
+        if not pending or left <= 0:
+            break
+        yield pause(min(left, POLL_MS[min(n, len(POLL_MS) - 1)] / 1000.0))
+        n += 1
+
+    outcomes = [done.get(k) or {"key": k, "ok": False, "error": "not found"} for k in fields]
+    if not all(o.get("ok") for o in outcomes):
+        if any(not o.get("ok") and o.get("error", "not found") in RETRY_ERRORS for o in outcomes):
+            raise RuntimeError(form_error(outcomes))
+        raise AssertionError(form_error(outcomes))
+    return {"fields": outcomes}
@@ -1,33 +1,8 @@
 from playwright.sync_api import TimeoutError as PWTimeoutError
-import time
-# ===== עוזרים פנימיים =====
-def _pick_visible_candidate(page, selector: str, timeout_ms: int):
-    """
-    בוחר את האלמנט הראשון שהוא גם נראה (visible) וגם לא-disabled.
-    אם יש מודאל/דיאלוג פתוח – נותן לו עדיפות.
-    """
-    half = max(500, int(timeout_ms * 0.5))
-
-    # 1) בתוך מודאל/דיאלוג (אם קיים) — עדיפות
-    modal = page.locator("[role=dialog]:visible, .modal.show, .modal:visible").first
-    if modal.count():
-        cand = modal.locator(f"{selector}:visible").filter(has_not=page.locator(":disabled")).first
-        try:
-            cand.wait_for(state="visible", timeout=half)
-            return cand
-        except Exception:
-            pass
-
-    # 2) גלובלי: נראה ולא disabled
-    cand = page.locator(f"{selector}:visible").filter(has_not=page.locator(":disabled")).first
-    try:
-        cand.wait_for(state="visible", timeout=half)
-        return cand
-    except Exception:
-        pass
-
-    # 3) מוצא ראשון — כרשת ביטחון
-    return page.locator(selector).first
+from pathlib import Path
+from core.artifacts import save_screenshot, async_save_screenshot
+from core.actions.resolver import resolve_element
+from core.engine import call, pause, twin
 
 
 def action_fill(page, *, selector, value, timeout_ms=7000, **_):
@@ -35,19 +10,20 @@ def action_fill(page, *, selector, value, timeout_ms=7000, **_):
     ממלא ערך בשדה. בוחר את האלמנט הנכון לפי 'נראה' ו'לא disabled',
     עם עדיפות לשדות בתוך מודאל/דיאלוג.
     """
-    target = _pick_visible_candidate(page, selector, timeout_ms)
+    target = yield from resolve_element(page, selector, timeout_ms, fallback_first=True)
     # ודא שהאלמנט באמת ניתן לעריכה (יש מצבים של contenteditable וכו')
     try:
-        target.fill(str(value), timeout=timeout_ms)
+        yield call(target.fill, str(value), timeout=timeout_ms)
         return
     except PWTimeoutError as e:
-        # נסה fallback של type() (לפעמים fill נכשל על רכיבים מותאמים)
-        target.click(timeout=min(1000, timeout_ms))
-        page.keyboard.type(str(value), delay=10)
+        # fallback לרכיבים מותאמים: insert_text שולח את כל הטקסט באירוע אחד
+        # (type() עם delay היה מקליד תו-תו – שניות לטקסט ארוך)
+        yield call(target.click, timeout=min(1000, timeout_ms))
+        yield call(page.keyboard.insert_text, str(value))
     except Exception:
         # ניסיון אחרון: evaluate ל-set value (לשדות input בלבד)
         try:
-            target.evaluate("(el, v) => { el.value = v; el.dispatchEvent(new Event('input', {bubbles:true})); }", str(value))
+            yield call(target.evaluate, "(el, v) => { el.value = v; el.dispatchEvent(new Event('input', {bubbles:true})); }", str(value))
             return
         except Exception as e:
             raise
@@ -60,11 +36,15 @@ def action_wait_for_selector(page, *, selector, value="visible", timeout_ms=7000
     state = str(value).strip().lower()
     if state not in ("visible", "attached", "hidden", "detached"):
         state = "visible"
-    page.locator(selector).first.wait_for(state=state, timeout=timeout_ms)
+    yield call(page.locator(selector).first.wait_for, state=state, timeout=timeout_ms)
 
 
-def action_screenshot(page, *, value, **_):
-    page.screenshot(path=str(value))
+def action_screenshot(page, *, value, artifacts=None, **_):
+    """
+    הצילום נלקח לזיכרון ונכתב ברקע (core/artifacts.py) – הצעד לא ממתין לדיסק.
+    בפורמט jpeg/webp הסיומת של value מוחלפת בהתאם.
+    """
+    yield twin(save_screenshot, async_save_screenshot, page, Path(str(value)), artifacts)
 def action_select_option(page, *, selector, value, timeout_ms=7000, **_):
     """
     בוחר ערך מתוך אלמנט <select>.
@@ -72,16 +52,17 @@ def action_select_option(page, *, selector, value, timeout_ms=7000, **_):
     """
     try:
         dropdown = page.locator(selector)
-        dropdown.wait_for(state="visible", timeout=timeout_ms)
+        yield call(dropdown.wait_for, state="visible", timeout=timeout_ms)
 
         # ננסה קודם לפי value
         try:
-            dropdown.select_option(value=value)
+            yield call(dropdown.select_option, value=value)
         except Exception:
             # אם לא הצליח לפי value, ננסה לפי label
-            dropdown.select_option(label=value)
+            yield call(dropdown.select_option, label=value)
     except PWTimeoutError:
-        raise AssertionError(f"Timeout waiting for select element: {selector}")
+        # timeout הוא שגיאה חולפת – נשאר TimeoutError כדי שה-retry ינסה שוב
+        raise
     except Exception as e:
         raise AssertionError(f"Failed to select option {value!r} for {selector}: {e}")
     
@@ -107,4 +88,4 @@ def action_wait(page, *, value=None, **_):
         raise ValueError(f"Invalid value for wait: {value!r}")
 
     print(f"[wait] ⏳ Waiting {delay_s:.2f} seconds...")
-    time.sleep(delay_s)
+    yield pause(delay_s)
@@ -0,0 +1,125 @@
+# core/actions/intent.py
+from __future__ import annotations
+import time
+from typing import Sequence
+
+from core.actions.resolver import MODAL_CSS, POLL_MS, _next_token
+from core.engine import call, pause
+
+# קליק לפי כוונה (בלי selector): evaluate אחד אוסף את הכפתורים/קישורים הנגישים עם השם
+# הנגיש שלהם, מדרג אותם מול alternation של מילות הכוונה ומסמן רק את המנצח (אלמנט אחד –
+# לא כל מועמד בכל סבב, כדי לא להציף MutationObserver-ים של perception / wait_for_dom_stable).
+# הגבולות של המילה Unicode-aware (\p{L}\p{N} עם הדגל u), כדי שעברית תיחשב אות.
+CAND_ATTR = "data-rpa-cand"
+
+# (cands, words, fallback) => best | null – משותף לקליק לפי כוונה ול-submit של login.
+# מילה מוקדמת ברשימה (הכוונה עצמה ראשונה) > שם זהה למילה > בתוך מודאל > כפתור על פני
+# קישור > submit; שם ארוך = כנראה לא הכפתור עצמו. fallback: הכפתור הראשון (מודאל, submit).
+RANK_JS = r"""
+(cands, words, fallback) => {
+  words = Array.from(new Set(words.map(w => String(w || '').trim().toLowerCase()).filter(Boolean)));
+  const rank = new Map(words.map((w, i) => [w, i]));
+  const esc = (w) => w.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
+  const alts = words.slice().sort((a, b) => b.length - a.length).map(esc).join('|');
+  const re = alts ? new RegExp('(?<![\\p{L}\\p{N}_])(' + alts + ')(?![\\p{L}\\p{N}_])', 'giu') : null;
+  let best = null;
+  for (const c of re ? cands : []) {
+    const name = (c.name || '').toLowerCase();
+    let word = null;
+    for (const m of name.matchAll(re)) {
+      const w = m[1].toLowerCase();
+      if (word === null || (rank.get(w) ?? words.length) < (rank.get(word) ?? words.length)) word = w;
+    }
+    if (word === null) continue;
+    let score = 100 - 3 * (rank.get(word) ?? words.length);
+    if (name.trim() === word) score += 20;
+    if (c.modal) score += 15;
+    if (c.role === 'button') score += 5;
+    if (c.submit) score += 3;
+    score -= Math.min(10, name.length / 20);
+    if (!best || score > best.score) best = Object.assign({}, c, {word, score: Math.round(score * 100) / 100});
+  }
+  if (!best && fallback) {
+    const btns = cands.filter(c => c.role === 'button');
+    const key = (c) => (c.modal ? 0 : 2) + (c.submit ? 0 : 1);
+    btns.sort((a, b) => key(a) - key(b));
+    if (btns.length) best = Object.assign({}, btns[0], {word: null, score: 0});
+  }
+  return best;
+}
+"""
+
+INTENT_JS = r"""
+(root, [attr, token, modalCss, buttonsOnly, words, fallback]) => {
+  const rankCands = %s;
+  const visible = (el) => {
+    const r = el.getBoundingClientRect();
+    if (!r.width || !r.height) return false;
+    const cs = getComputedStyle(el);
+    return cs.visibility !== 'hidden' && cs.display !== 'none';
+  };
+  const disabled = (el) => !!(el.disabled || el.getAttribute('aria-disabled') === 'true'
+                              || el.closest('fieldset[disabled]'));
+  const nameOf = (el) => {
+    const by = el.getAttribute('aria-labelledby');
+    if (by) {
+      const t = by.split(/\s+/).map(id => (document.getElementById(id) || {}).textContent || '').join(' ').trim();
+      if (t) return t;
+    }
+    return (el.getAttribute('aria-label') || el.innerText || el.value || el.getAttribute('title')
+            || el.getAttribute('alt') || '').replace(/\s+/g, ' ').trim();
+  };
+  const modals = Array.from(document.querySelectorAll(modalCss)).filter(visible);
+  const sel = buttonsOnly
+    ? "button, [role=button], input[type=submit], input[type=button]"
+    : "button, [role=button], input[type=submit], input[type=button], a[href], [role=link]";
+  const cands = [];
+  root.querySelectorAll(sel).forEach((el) => {
+    if (!visible(el) || disabled(el)) return;
+    const tag = el.tagName.toLowerCase();
+    cands.push({
+      el, name: nameOf(el).slice(0, 200),
+      role: (tag === 'a' || el.getAttribute('role') === 'link') ? 'link' : 'button',
+      submit: el.type === 'submit',
+      modal: modals.some(m => m.contains(el)),
+    });
+  });
+  const best = rankCands(cands, words, fallback);
+  if (!best) return null;
+  document.querySelectorAll('[' + attr + ']').forEach(e => { if (e !== best.el) e.removeAttribute(attr); });
+  best.el.setAttribute(attr, token);
+  return {word: best.word, score: best.score, name: best.name, role: best.role, modal: best.modal};
+}
+""" % RANK_JS.strip()
+
+
+def click_by_intent(scope, words: Sequence[str], timeout_ms: int, *, buttons_only: bool = False,
+                    fallback_words: Sequence[str] = (), fallback: bool = True):
+    """
+    flow. scope: page או locator (למשל form); buttons_only=True מתעלם מקישורים.
+    סבב אחד = evaluate אחד; עד timeout_ms מחפשים רק את words. רק אחרי ה-deadline – סבב
+    אחרון עם fallback_words (למשל מילות login/register) ואז, אם fallback, הכפתור הראשון.
+    מחזיר {word, score, name, role, modal} או None.
+    """
+    page = getattr(scope, "page", None) or scope
+    root = scope.locator(":root") if scope is page else scope
+    words = list(words)
+    token = _next_token()
+    deadline = time.monotonic() + max(0, int(timeout_ms)) / 1000.0
+    n = 0
+    while True:
+        left = deadline - time.monotonic()
+        last = left <= 0
+        args = [CAND_ATTR, token, MODAL_CSS, buttons_only,
+                words + list(fallback_words) if last else words, fallback and last]
+        try:
+            best = yield call(root.evaluate, INTENT_JS, args)
+        except Exception:
+            best = None
+        if best:
+            yield call(page.locator(f"[{CAND_ATTR}='{token}']").click, timeout=max(1000, int(left * 1000)))
+            return best
+        if last:
+            return None
+        yield pause(min(left, POLL_MS[min(n, len(POLL_MS) - 1)] / 1000.0))
+        n += 1
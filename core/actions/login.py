@@ -0,0 +1,145 @@
+# core/actions/login.py
+from __future__ import annotations
+import time
+from typing import Any, Dict, Optional
+
+from core.actions.browser_actions import LOGIN_WORDS
+from core.actions.intent import click_by_intent, RANK_JS
+from core.actions.resolver import MODAL_CSS, POLL_MS, _next_token
+from core.engine import call, pause
+from core.schema import LOGIN_USER_ALIASES, login_value_error
+
+# צעד login אחד במקום goto/wait/wait/fill/fill/click: סקריפט יחיד מזהה את שדה הסיסמה
+# (עדיפות למודאל), את שדה המשתמש שלפניו, את המכל (form / מודאל / האב הקרוב עם כפתור)
+# ואת ה-submit – מדורג באותו RANK_JS של click לפי כוונה (core/actions/intent.py).
+# רק שלושת הנבחרים מסומנים ב-data-rpa-login.
+LOGIN_ATTR = "data-rpa-login"
+
+# מילים לפתיחת טופס/מודאל לוגין כשעדיין אין שדה סיסמה (בלי continue/ok וכו')
+OPEN_WORDS = ["log in", "login", "sign in", "signin", "sign-in", "כניסה", "התחברות", "התחבר", "היכנס"]
+
+USER_HINTS = ["user", "email", "mail", "login", "phone", "tel", "שם משתמש", "מייל", "טלפון"]
+
+LOGIN_JS = """
+(root, [attr, token, modalCss, userHints, words]) => {
+  const rankCands = %s;
+  const visible = (el) => {
+    const r = el.getBoundingClientRect();
+    if (!r.width || !r.height) return false;
+    const cs = getComputedStyle(el);
+    return cs.visibility !== 'hidden' && cs.display !== 'none';
+  };
+  const usable = (el) => visible(el) && !(el.disabled || el.readOnly
+                              || el.getAttribute('aria-disabled') === 'true' || el.closest('fieldset[disabled]'));
+  const nameOf = (el) => (el.getAttribute('aria-label') || el.innerText || el.value || el.getAttribute('title')
+                          || '').replace(/\\s+/g, ' ').trim();
+  const modals = Array.from(document.querySelectorAll(modalCss)).filter(visible);
+  const inModal = (el) => modals.some(m => m.contains(el));
+
+  const pws = Array.from(root.querySelectorAll('input[type=password]')).filter(usable);
+  if (!pws.length) return null;
+  const rank = (el) => (inModal(el) ? 0 : 2) + (el.autocomplete === 'new-password' ? 1 : 0);
+  const pw = pws.slice().sort((a, b) => rank(a) - rank(b))[0];
+
+  const BTN = 'button, [role=button], input[type=submit], input[type=button]';
+  let box = pw.form || pw.closest('form');
+  if (!box || !box.querySelector(BTN)) box = modals.find(m => m.contains(pw)) || null;
+  if (!box) {
+    let p = pw.parentElement;
+    while (p && p !== document.body && !p.querySelector(BTN)) p = p.parentElement;
+    box = p || document.body;
+  }
+
+  const TEXT = 'input:not([type]), input[type=text], input[type=email], input[type=tel]';
+  const before = Array.from(box.querySelectorAll(TEXT)).filter(el => usable(el)
+                   && (el.compareDocumentPosition(pw) & Node.DOCUMENT_POSITION_FOLLOWING));
+  const hint = (el) => [el.name, el.id, el.autocomplete, el.placeholder, el.getAttribute('aria-label'), el.type]
+                         .join(' ').toLowerCase();
+  const user = before.find(el => userHints.some(h => hint(el).includes(h))) || before[before.length - 1] || null;
+
+  document.querySelectorAll('[' + attr + ']').forEach(e => e.removeAttribute(attr));
+  pw.setAttribute(attr, token + '-pw');
+  if (user) user.setAttribute(attr, token + '-user');
+  const subs = Array.from(box.querySelectorAll(BTN)).filter(usable).map(el => (
+    {el, name: nameOf(el).slice(0, 200), role: 'button', submit: el.type === 'submit', modal: inModal(el)}));
+  const best = rankCands(subs, words, true);
+  if (best) best.el.setAttribute(attr, token + '-sub');
+  return {user: !!user, modal: inModal(pw), form: !!pw.closest('form'),
+          sub: best ? {word: best.word, score: best.score, name: best.name} : null};
+}
+""" % RANK_JS.strip()
+
+
+def login_value(value: Any) -> Dict[str, Any]:
+    """
+    value של צעד login:
+      value: {user: ${USERNAME}, password: ${PASSWORD}, success: "text=Products", open: true}
+    user אפשר גם כ-username / email. success (אופציונלי) – selector שמעיד שההתחברות הצליחה;
+    open=false – לא לנסות לפתוח מודאל לוגין. מפתח לא מוכר – ValueError (ולא שם משתמש ריק בשקט).
+    """
+    err = login_value_error(value)
+    if err:
+        raise ValueError(f"login step {err}")
+    alias = next((k for k in LOGIN_USER_ALIASES if k in value), None)
+    if alias:
+        value = {**{k: v for k, v in value.items() if k != alias}, "user": value[alias]}
+    return value
+
+
+def _summary(form: Dict[str, Any], best: Optional[Dict[str, Any]], opened: bool) -> Dict[str, Any]:
+    return {"login": {
+        "user_field": form["user"], "modal": form["modal"], "opened": opened,
+        "submit": ({k: best.get(k) for k in ("word", "score", "name")} if best else "enter"),
+    }}
+
+
+def action_login(page, *, selector=None, value=None, timeout_ms=7000, **_):
+    """
+    מתחבר בצעד אחד: כל סבב = evaluate אחד שמאתר סיסמה+משתמש+submit, עד timeout_ms אחד.
+    אם אין שדה סיסמה אחרי חלון קצר – לוחץ פעם אחת על כפתור login (פותח מודאל/טופס).
+    selector (אופציונלי) מגביל את החיפוש למכל, למשל "#logInModal".
+    """
+    creds = login_value(value)
+    root = page.locator(selector).first if selector else page.locator(":root")
+    token = _next_token()
+    start = time.monotonic()
+    deadline = start + max(0, int(timeout_ms)) / 1000.0
+    grace = min(1.0, timeout_ms / 4000.0)
+    opened = False
+    n = 0
+    while True:
+        left = deadline - time.monotonic()
+        try:
+            form = yield call(root.evaluate, LOGIN_JS, [LOGIN_ATTR, token, MODAL_CSS, USER_HINTS, LOGIN_WORDS],
+                              timeout=max(1, int(left * 1000)))
+        except Exception:
+            form = None
+        if form:
+            break
+        left = deadline - time.monotonic()
+        if left <= 0:
+            raise RuntimeError("login: לא נמצא שדה סיסמה גלוי" + (f" בתוך {selector!r}" if selector else ""))
+        if not opened and creds.get("open", True) and time.monotonic() - start >= grace:
+            opened = True
+            try:
+                yield from click_by_intent(page, OPEN_WORDS, min(1500, int(left * 1000)), fallback=False)
+            except Exception:
+                pass
+            continue
+        yield pause(min(left, POLL_MS[min(n, len(POLL_MS) - 1)] / 1000.0))
+        n += 1
+
+    mark = lambda part: page.locator(f"[{LOGIN_ATTR}='{token}-{part}']")
+    if form["user"] and creds.get("user") is not None:
+        yield call(mark("user").fill, str(creds["user"]), timeout=timeout_ms)
+    yield call(mark("pw").fill, str(creds["password"]), timeout=timeout_ms)
+
+    best = form.get("sub")
+    if best:
+        yield call(mark("sub").click, timeout=timeout_ms)
+    else:
+        yield call(mark("pw").press, "Enter", timeout=timeout_ms)
+
+    if creds.get("success"):
+        yield call(page.locator(str(creds["success"])).first.wait_for, state="visible", timeout=timeout_ms)
+    return _summary(form, best, opened)
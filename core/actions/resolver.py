@@ -0,0 +1,74 @@
+# core/actions/resolver.py
+from __future__ import annotations
+import itertools, os, time
+
+from core.engine import call, pause
+
+# בוחר אלמנט בסבב אחד מול הדפדפן: סקריפט יחיד (evaluate_all) מקבל את כל ההתאמות של
+# ה-selector ומחשב יחד עדיפות מודאל, נראות ו-disabled. הנבחר מסומן ב-data-rpa-pick,
+# ומוחזר locator יציב אליו (לא nth, שמשתנה אם ה-DOM זז).
+PICK_ATTR = "data-rpa-pick"
+MODAL_CSS = "[role=dialog], [aria-modal=true], dialog[open], .modal.show, .modal"
+
+PICK_JS = """
+(els, [attr, token, modalCss]) => {
+  const visible = (el) => {
+    const r = el.getBoundingClientRect();
+    if (!r.width || !r.height) return false;
+    const cs = getComputedStyle(el);
+    return cs.visibility !== 'hidden' && cs.display !== 'none';
+  };
+  const disabled = (el) => !!(el.disabled || el.getAttribute('aria-disabled') === 'true'
+                              || el.closest('fieldset[disabled]'));
+  const modals = Array.from(document.querySelectorAll(modalCss)).filter(visible);
+  let best = -1, bestModal = false;
+  for (let i = 0; i < els.length; i++) {
+    const el = els[i];
+    if (!visible(el) || disabled(el)) continue;
+    const inModal = modals.some(m => m.contains(el));
+    if (best < 0 || (inModal && !bestModal)) { best = i; bestModal = inModal; }
+    if (bestModal || !modals.length) break;   // אין מודאל או כבר נמצא בתוכו – הראשון מנצח
+  }
+  if (best < 0) return null;
+  document.querySelectorAll('[' + attr + ']').forEach(e => e.removeAttribute(attr));
+  els[best].setAttribute(attr, token);
+  return {index: best, modal: bestModal, matches: els.length};
+}
+"""
+
+# השהיה בין סבבים – קצרה בהתחלה, וגדלה עד התקרה
+POLL_MS = (50, 100, 200, 250)
+
+_tokens = itertools.count(1)
+
+
+def _next_token() -> str:
+    return f"{os.getpid()}-{next(_tokens)}"
+
+
+def pick_locator(page, token: str):
+    return page.locator(f"[{PICK_ATTR}='{token}']")
+
+
+def resolve_element(page, selector: str, timeout_ms: int, *, fallback_first: bool = False):
+    """
+    מחזיר locator לאלמנט הראשון שגלוי ולא מושבת – עם עדיפות למודאל פתוח – או None.
+    זמן ההמתנה במקרה הגרוע חסום ב-timeout_ms אחד (לא חצי במודאל ועוד חצי בדף).
+    fallback_first=True: אם לא נמצא – מחזיר את ההתאמה הראשונה (רשת ביטחון ל-fill).
+    flow (core/engine.py): loc = yield from resolve_element(...)
+    """
+    deadline = time.monotonic() + max(0, int(timeout_ms)) / 1000.0
+    loc = page.locator(selector)
+    token = _next_token()
+    for n in itertools.count():
+        try:
+            hit = yield call(loc.evaluate_all, PICK_JS, [PICK_ATTR, token, MODAL_CSS])
+        except Exception:
+            hit = None  # ניווט באמצע / selector עדיין לא ניתן להערכה – ננסה שוב
+        if hit:
+            return pick_locator(page, token)
+        left = deadline - time.monotonic()
+        if left <= 0:
+            break
+        yield pause(min(left, POLL_MS[min(n, len(POLL_MS) - 1)] / 1000.0))
+    return loc.first if fallback_first else None
@@ -0,0 +1,120 @@
+# core/actions/wait_actions.py
+from __future__ import annotations
+import time
+from typing import Any, Dict
+
+from core.network import tracker_for, url_matcher, status_matcher
+from core.engine import call, pause
+from core.plan import parse_seconds
+
+# המתנות מבוססות-תנאי במקום sleep קבוע: הצעד מסתיים ברגע שהדף מוכן, וה-timeout_ms
+# הוא רק תקרה. הבקשות נספרות ע"י RequestTracker (core/network.py) שמותקן על ה-context.
+
+DEFAULT_IDLE_MS = 500
+DEFAULT_STABLE_MS = 300
+TICK_MS = 50
+
+# נפתר אחרי quiet ms בלי מוטציות (או ב-timeout, עם stable=false)
+DOM_STABLE_JS = """
+([quiet, timeout, sel]) => new Promise((resolve) => {
+  let target = document;
+  try { target = (sel && document.querySelector(sel)) || document; } catch (e) {}
+  const t0 = performance.now();
+  let last = t0, n = 0;
+  const mo = new MutationObserver((ms) => { last = performance.now(); n += ms.length; });
+  mo.observe(target, {subtree: true, childList: true, attributes: true, characterData: true});
+  const tick = () => {
+    const now = performance.now();
+    if (now - last >= quiet || now - t0 >= timeout) {
+      mo.disconnect();
+      resolve({stable: now - last >= quiet, waited_ms: Math.round(now - t0), mutations: n});
+    } else {
+      setTimeout(tick, Math.max(10, Math.min(quiet - (now - last), timeout - (now - t0))));
+    }
+  };
+  setTimeout(tick, quiet);
+})
+"""
+
+
+def to_ms(v: Any, default: int) -> int:
+    """"500ms" / "1.5s" / 2 (מספר = שניות, כמו בצעד wait – core/plan.py) → ms."""
+    if v is None or (isinstance(v, str) and not v.strip()):
+        return default
+    return int(parse_seconds(v, default / 1000.0) * 1000)
+
+
+def idle_spec(value: Any) -> Dict[str, int]:
+    """value של wait_for_network_idle: "500ms" או {quiet_ms, max_inflight}."""
+    if isinstance(value, dict):
+        quiet = value.get("quiet_ms")
+        # מספר תחת quiet_ms הוא כבר מילישניות (שם המפתח אומר זאת)
+        return {"quiet_ms": int(quiet) if isinstance(quiet, (int, float)) else to_ms(quiet, DEFAULT_IDLE_MS),
+                "max_inflight": int(value.get("max_inflight", 0))}
+    return {"quiet_ms": to_ms(value, DEFAULT_IDLE_MS), "max_inflight": 0}
+
+
+def action_wait_for_response(page, *, selector, value=None, timeout_ms=7000, **_):
+    """
+    selector: תבנית URL – glob ("**/api/login*"), "re:<regex>" או מחרוזת מוכלת.
+    value: סטטוס (200 / "2xx" / "200-299"), ברירת מחדל – כל סטטוס.
+    תגובה שהגיעה כבר אחרי הצעד הקודם (למשל מיד אחרי click) נחשבת – ה-tracker שומר אותה;
+    תגובות מלפני תחילת הצעד הקודם לא נחשבות (mark_step ב-core/runner.py).
+    """
+    tr = tracker_for(page)
+    url_ok, status_ok = url_matcher(selector), status_matcher(value)
+    deadline = time.monotonic() + max(0, int(timeout_ms)) / 1000.0
+    while True:
+        hit = tr.take_response(url_ok, status_ok)
+        if hit:
+            return {"response": {k: hit[k] for k in ("url", "status", "method")}}
+        left = deadline - time.monotonic()
+        if left <= 0:
+            raise TimeoutError(f"wait_for_response: no response matching {selector!r}"
+                               + (f" with status {value}" if value is not None else "") + f" within {timeout_ms}ms")
+        # pause עם page (ב-sync: wait_for_timeout, לא time.sleep) – כדי שאירועי ה-response ימשיכו להגיע
+        yield pause(min(TICK_MS / 1000.0, left), page)
+
+
+def action_wait_for_network_idle(page, *, value=None, timeout_ms=7000, **_):
+    """אין בקשות פתוחות (עד max_inflight) במשך quiet_ms ברציפות."""
+    spec = idle_spec(value)
+    tr = tracker_for(page)
+    start = time.monotonic()
+    deadline = start + max(0, int(timeout_ms)) / 1000.0
+    quiet = spec["quiet_ms"] / 1000.0
+    while True:
+        idle = tr.idle_for(spec["max_inflight"])
+        if idle >= quiet:
+            return {"idle": {"waited_ms": int((time.monotonic() - start) * 1000), "quiet_ms": spec["quiet_ms"]}}
+        left = deadline - time.monotonic()
+        if left <= 0:
+            raise TimeoutError(f"wait_for_network_idle: {len(tr.inflight)} request(s) still in flight "
+                               f"after {timeout_ms}ms (quiet window {spec['quiet_ms']}ms)")
+        yield pause(max(0.001, min(quiet - idle, left, TICK_MS / 1000.0)), page)
+
+
+def action_wait_for_dom_stable(page, *, selector=None, value=None, timeout_ms=7000, **_):
+    """
+    value: חלון שקט ("300ms"); selector (אופציונלי) מגביל את ה-MutationObserver לתת-עץ.
+    ניווט באמצע ההמתנה מאפס את ה-observer על המסמך החדש.
+    """
+    quiet = to_ms(value, DEFAULT_STABLE_MS)
+    deadline = time.monotonic() + max(0, int(timeout_ms)) / 1000.0
+    while True:
+        left_ms = int((deadline - time.monotonic()) * 1000)
+        if left_ms <= 0:
+            raise TimeoutError(f"wait_for_dom_stable: page kept navigating for {timeout_ms}ms")
+        try:
+            res = yield call(page.evaluate, DOM_STABLE_JS, [quiet, left_ms, selector])
+        except Exception:
+            try:
+                yield call(page.wait_for_load_state, "domcontentloaded", timeout=max(1, left_ms))
+                yield pause(TICK_MS / 1000.0, page)
+            except Exception:
+                pass
+            continue
+        if not res.get("stable"):
+            raise TimeoutError(f"wait_for_dom_stable: DOM still changing after {timeout_ms}ms "
+                               f"({res.get('mutations')} mutations, quiet window {quiet}ms)")
+        return {"dom": res}
@@ -0,0 +1,4 @@
+# core/aio – מנוע הרצה אסינכרוני (playwright.async_api)
+# לולאת אירועים אחת מריצה הרבה BrowserContext-ים במקביל, מוגבל ע"י semaphore.
+# הפעולות, לולאת הצעד וריצת התרחיש משותפות ל-sync (flows, core/engine.py) – כאן רק
+# דפדפן/pool ו-driver אסינכרוני (run_async).
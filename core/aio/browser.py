@@ -0,0 +1,111 @@
+# core/aio/browser.py
+from __future__ import annotations
+from pathlib import Path
+from typing import Optional, Sequence, Dict, Any, Tuple
+from playwright.async_api import async_playwright, Playwright, Browser, BrowserContext, Page
+
+from core.browser import _normalize_viewport, _browser_ctor, _server_endpoint, _launch_kwargs
+
+async def launch_on(
+    p: Playwright,
+    browser_name: str,
+    headful: bool,
+    *,
+    slow_mo: int = 0,
+    proxy: Optional[Dict[str, str]] = None,
+    server: Optional[str] = None,
+) -> Browser:
+    """
+    דפדפן בלבד על Playwright async קיים (p משותף, למשל לכל ה-pool של core/aio/runner.py).
+    בשונה מ-core.browser.launch_browser – לא מפעיל Playwright ומחזיר רק את הדפדפן.
+    """
+    ws = _server_endpoint(server, browser_name, proxy, headful)
+    if ws:
+        try:
+            return await _browser_ctor(p, browser_name).connect(ws, slow_mo=int(slow_mo or 0))
+        except Exception as e:
+            print(f"[browser] browser-server connect failed ({e}); launching locally")
+    return await _browser_ctor(p, browser_name).launch(**_launch_kwargs(headful, slow_mo, proxy))
+
+async def new_context_page(
+    browser: Browser,
+    *,
+    record_video_dir: Optional[Path] = None,
+    downloads_dir: Optional[Path] = None,
+    viewport: Optional[Sequence[int]] = None,
+    user_agent: Optional[str] = None,
+    timeout_ms: Optional[int] = None,
+    extra_context_options: Optional[Dict[str, Any]] = None,
+) -> Tuple[BrowserContext, Page]:
+    if record_video_dir: Path(record_video_dir).mkdir(parents=True, exist_ok=True)
+    if downloads_dir:    Path(downloads_dir).mkdir(parents=True, exist_ok=True)
+
+    vp = _normalize_viewport(viewport)
+    context_kwargs: Dict[str, Any] = {"accept_downloads": True}
+    if vp:
+        context_kwargs["viewport"] = vp
+    if user_agent:
+        context_kwargs["user_agent"] = str(user_agent)
+    if record_video_dir:
+        context_kwargs["record_video_dir"] = str(record_video_dir)
+        if vp:
+            context_kwargs["record_video_size"] = {"width": vp["width"], "height": vp["height"]}
+    if extra_context_options:
+        context_kwargs.update(dict(extra_context_options))
+
+    ctx: BrowserContext = await browser.new_context(**context_kwargs)
+    page: Page = await ctx.new_page()
+
+    if timeout_ms and int(timeout_ms) > 0:
+        ms = int(timeout_ms)
+        page.set_default_timeout(ms)
+        page.set_default_navigation_timeout(ms)
+
+    return ctx, page
+
+async def open_browser(
+    browser_name: str,
+    headful: bool,
+    *,
+    record_video_dir: Optional[Path] = None,
+    downloads_dir: Optional[Path] = None,
+    viewport: Optional[Sequence[int]] = None,
+    user_agent: Optional[str] = None,
+    timeout_ms: Optional[int] = None,
+    slow_mo: int = 0,
+    proxy: Optional[Dict[str, str]] = None,
+    extra_context_options: Optional[Dict[str, Any]] = None,
+    server: Optional[str] = None,
+) -> Tuple[Playwright, Browser, BrowserContext, Page]:
+    """המקבילה האסינכרונית של core.browser.open_browser."""
+    p = await async_playwright().start()
+    browser = await launch_on(p, browser_name, headful, slow_mo=slow_mo, proxy=proxy, server=server)
+    ctx, page = await new_context_page(
+        browser,
+        record_video_dir=record_video_dir,
+        downloads_dir=downloads_dir,
+        viewport=viewport,
+        user_agent=user_agent,
+        timeout_ms=timeout_ms,
+        extra_context_options=extra_context_options,
+    )
+    return p, browser, ctx, page
+
+async def close_context(ctx: BrowserContext) -> None:
+    try:
+        await ctx.close()
+    except Exception:
+        pass
+
+async def close_browser(p: Playwright, browser: Browser, ctx: Optional[BrowserContext] = None) -> None:
+    try:
+        if ctx is not None:
+            await ctx.close()
+    finally:
+        try:
+            await browser.close()
+        finally:
+            try:
+                await p.stop()
+            except Exception:
+                pass
@@ -0,0 +1,117 @@
+# core/aio/runner.py
+from __future__ import annotations
+import asyncio, time
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+from playwright.async_api import async_playwright
+
+from core.reporting import finalize_batch
+from core.batch import _reports_dir_for, _matrix_runs
+from core.engine import run_async
+from core.runner import step_flow, steps_flow, scenario_flow, compile_scenario
+from core.aio.browser import launch_on
+
+
+# לולאת הצעד וריצת התרחיש הן flows משותפים (core/runner.py) – כאן רק ה-driver האסינכרוני.
+
+async def execute_step(page, step, *, base_url, options, results, variables, reports_dir: Path):
+    """המקבילה האסינכרונית של core.runner.execute_step (אותו step_flow)."""
+    return await run_async(step_flow(page, step, base_url=base_url, options=options, results=results,
+                                     variables=variables, reports_dir=reports_dir))
+
+async def run_steps(page, steps, *, base_url, options, results, variables, reports_dir: Path):
+    return await run_async(steps_flow(page, steps, base_url=base_url, options=options, results=results,
+                                      variables=variables, reports_dir=reports_dir))
+
+async def _run_single(name: str, base_url: str, steps, options, reports_dir: Path,
+                      variables: Dict[str, Any], *, browser) -> int:
+    """מריץ תרחיש אחד ב-BrowserContext חדש על דפדפן שכבר רץ."""
+    return await run_async(scenario_flow(name, base_url, steps, options, reports_dir, variables, browser=browser))
+
+
+class _BrowserPool:
+    """דפדפן אחד לכל שילוב הגדרות launch, משותף לכל ה-contexts בלולאה."""
+    def __init__(self, p):
+        self._p = p
+        self._browsers: Dict[Tuple[Any, ...], Any] = {}
+        self._lock = asyncio.Lock()
+
+    async def get(self, options: Dict[str, Any]):
+        proxy = options.get("proxy") or {}
+        key = (options["browser"], bool(options["headful"]), int(options.get("slow_mo") or 0),
+               tuple(sorted(proxy.items())))
+        async with self._lock:
+            if key not in self._browsers:
+                self._browsers[key] = await launch_on(
+                    self._p, options["browser"], options["headful"],
+                    slow_mo=options.get("slow_mo", 0), proxy=options.get("proxy"),
+                    server=options.get("browser_server"),
+                )
+            return self._browsers[key]
+
+    async def close(self) -> None:
+        for b in self._browsers.values():
+            try:
+                await b.close()
+            except Exception:
+                pass
+
+
+async def _run_job(pool: _BrowserPool, sem: asyncio.Semaphore, path: Path, reports_dir: Path) -> List[Dict[str, Any]]:
+    started = time.time()
+    try:
+        scenario, base_options, plan = compile_scenario(path)
+    except Exception as e:
+        return [{"scenario": str(path), "browser": "-", "status": "invalid", "rc": 2,
+                 "duration": time.time() - started, "reports_dir": str(reports_dir), "error": str(e)}]
+
+    name = scenario.get("name", path.stem)
+    base_url = scenario.get("base_url") or scenario.get("url")
+    variables = dict(base_options.get("variables") or {})
+
+    runs = _matrix_runs(base_options, reports_dir)
+
+    async def _one(opts: Dict[str, Any], rdir: Path) -> Dict[str, Any]:
+        async with sem:
+            t0 = time.time()
+            error = None
+            try:
+                rc = await _run_single(name, base_url, plan, opts, rdir, variables,
+                                       browser=await pool.get(opts))
+            except Exception as e:
+                rc, error = 1, str(e)
+            print(f"[async] {path} [{opts['browser']}] -> rc={rc}")
+            return {"scenario": str(path), "browser": opts["browser"],
+                    "status": "passed" if rc == 0 else "failed", "rc": rc,
+                    "duration": time.time() - t0, "reports_dir": str(rdir), "error": error}
+
+    return list(await asyncio.gather(*(_one(o, d) for o, d in runs)))
+
+
+async def run_many(paths: Sequence[Path], *, concurrency: int = 8,
+                   reports_dir: Path = Path("reports")) -> int:
+    """
+    מריץ הרבה תרחישים בלולאת אירועים אחת: Playwright אחד, דפדפן אחד לכל סוג,
+    ו-BrowserContext לכל ריצה; semaphore מגביל כמה contexts פעילים בו-זמנית.
+    """
+    started = time.time()
+    used: Dict[str, int] = {}
+    jobs = [(path, _reports_dir_for(path, used)) for path in paths]
+    sem = asyncio.Semaphore(max(1, int(concurrency or 1)))
+
+    async with async_playwright() as p:
+        pool = _BrowserPool(p)
+        try:
+            groups = await asyncio.gather(*(_run_job(pool, sem, path, rdir) for path, rdir in jobs))
+        finally:
+            await pool.close()
+
+    rows = [r for g in groups for r in g]
+    finalize_batch(rows, started, reports_dir)
+    return max((r["rc"] for r in rows), default=0)
+
+
+# ---------- עטיפת sync דקה ----------
+
+def run_batch_async(paths: Sequence[Path], *, concurrency: int = 8) -> int:
+    return asyncio.run(run_many(paths, concurrency=concurrency))
@@ -0,0 +1,219 @@
+# core/artifacts.py
+from __future__ import annotations
+import argparse, atexit, hashlib, io, os, queue, shutil, tempfile, threading, time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+# צילומי מסך נלקחים כ-bytes בזיכרון ונכתבים לדיסק ב-thread רקע.
+# dedup: כל תוכן נשמר פעם אחת ב-store לפי sha256, והקובץ המבוקש הוא hardlink (או עותק) אליו.
+# ה-store לא מתנקה מעצמו (משותף לכל הריצות והתהליכים) – prune_store / `python -m core.artifacts prune`.
+CAS_DIR = Path(os.environ.get("ARTIFACT_STORE", "reports/.artifacts"))
+FORMATS = ("png", "jpeg", "webp")
+_SUFFIX = {"png": ".png", "jpeg": ".jpg", "webp": ".webp"}
+
+
+def _has_pillow() -> bool:
+    try:
+        import PIL.Image  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def resolve_artifacts(cfg: Any) -> Dict[str, Any]:
+    """
+    options.artifacts (dict) → הגדרות מנורמלות:
+      artifacts:
+        format: png | jpeg | webp   # jpeg מקודד בדפדפן; webp דורש Pillow (אחרת נשאר png)
+        quality: 80                 # jpeg/webp
+        dedup: true                 # store לפי hash תוכן
+    """
+    cfg = dict(cfg or {})
+    fmt = str(cfg.get("format") or "png").lower().replace("jpg", "jpeg")
+    if fmt not in FORMATS:
+        raise ValueError(f"artifacts.format must be one of {FORMATS}, got {fmt!r}")
+    if fmt == "webp" and not _has_pillow():
+        print("[artifacts] Pillow not installed – webp unavailable, keeping png")
+        fmt = "png"
+    quality = max(1, min(100, int(cfg.get("quality") or 80)))
+    return {"format": fmt, "quality": quality, "dedup": bool(cfg.get("dedup", True))}
+
+
+def screenshot_kwargs(cfg: Dict[str, Any]) -> Dict[str, Any]:
+    """פרמטרים ל-page.screenshot: jpeg מקודד ישירות בדפדפן (בלי עבודה בפייתון)."""
+    if cfg["format"] == "jpeg":
+        return {"type": "jpeg", "quality": cfg["quality"]}
+    return {"type": "png"}
+
+
+def artifact_path(dest: Path, cfg: Dict[str, Any]) -> Path:
+    """הנתיב הסופי – הסיומת תואמת לפורמט בפועל."""
+    return Path(dest).with_suffix(_SUFFIX[cfg["format"]])
+
+
+def _transcode(data: bytes, cfg: Dict[str, Any]) -> bytes:
+    if cfg["format"] != "webp":
+        return data
+    from PIL import Image
+    out = io.BytesIO()
+    Image.open(io.BytesIO(data)).save(out, format="WEBP", quality=cfg["quality"])
+    return out.getvalue()
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # שם זמני ייחודי גם בין תהליכים (ProcessPool של המטריצה כותב לאותו store)
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=path.name + ".", suffix=".tmp", delete=False) as f:
+        f.write(data)
+    try:
+        Path(f.name).replace(path)
+    except OSError:
+        Path(f.name).unlink(missing_ok=True)
+        raise
+
+
+class ArtifactWriter:
+    """thread רקע יחיד שכותב artifacts; submit מחזיר Future ל-Path הסופי."""
+
+    def __init__(self, store_dir: Path = CAS_DIR):
+        self.store_dir = Path(store_dir)
+        self._q: "queue.Queue" = queue.Queue()
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def _ensure_thread(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name="artifact-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, data: bytes, dest: Path, cfg: Dict[str, Any]) -> Future:
+        dest = Path(dest)
+        fut: Future = Future()
+        with self._lock:
+            self._pending[str(dest)] = fut
+        self._ensure_thread()
+        self._q.put((data, dest, cfg, fut))
+        return fut
+
+    def _loop(self) -> None:
+        while True:
+            data, dest, cfg, fut = self._q.get()
+            try:
+                fut.set_result(self._store(data, dest, cfg))
+            except Exception as e:
+                fut.set_exception(e)
+            finally:
+                with self._lock:
+                    if self._pending.get(str(dest)) is fut:
+                        del self._pending[str(dest)]
+                self._q.task_done()
+
+    def _store(self, data: bytes, dest: Path, cfg: Dict[str, Any]) -> Path:
+        data = _transcode(data, cfg)
+        if not cfg.get("dedup"):
+            _write_atomic(dest, data)
+            return dest
+        digest = hashlib.sha256(data).hexdigest()
+        blob = self.store_dir / digest[:2] / (digest + dest.suffix)
+        if not blob.exists():
+            _write_atomic(blob, data)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            dest.unlink()
+        except OSError:
+            pass
+        try:
+            os.link(blob, dest)
+        except OSError:
+            shutil.copyfile(blob, dest)
+        return dest
+
+    def wait(self, paths: Iterable[Any], timeout: Optional[float] = None) -> None:
+        """ממתין רק ל-artifacts המבוקשים (למשל אלה שמקושרים מהדוח של הריצה)."""
+        with self._lock:
+            futs = [self._pending.get(str(p)) for p in paths]
+        for f in futs:
+            if f is not None:
+                try:
+                    f.result(timeout)
+                except Exception as e:
+                    print(f"[artifacts] write failed: {e}")
+
+    def flush(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            self._q.join()
+
+
+WRITER = ArtifactWriter()
+atexit.register(WRITER.flush)
+
+
+def save_screenshot(page, dest: Path, cfg: Any = None) -> Path:
+    """צילום ל-bytes בזיכרון + כתיבה ברקע. מחזיר את הנתיב הסופי (הקובץ ייכתב בקרוב)."""
+    cfg = cfg if isinstance(cfg, dict) and "format" in cfg else resolve_artifacts(cfg)
+    path = artifact_path(dest, cfg)
+    WRITER.submit(page.screenshot(**screenshot_kwargs(cfg)), path, cfg)
+    return path
+
+
+async def async_save_screenshot(page, dest: Path, cfg: Any = None) -> Path:
+    cfg = cfg if isinstance(cfg, dict) and "format" in cfg else resolve_artifacts(cfg)
+    path = artifact_path(dest, cfg)
+    WRITER.submit(await page.screenshot(**screenshot_kwargs(cfg)), path, cfg)
+    return path
+
+
+def wait_for_artifacts(paths: Iterable[Any], timeout: Optional[float] = None) -> None:
+    WRITER.wait(paths, timeout)
+
+
+# ---------- ניקוי ה-store ----------
+
+def prune_store(store_dir: Path = CAS_DIR, *, older_than_s: float = 7 * 86400, dry_run: bool = False) -> Dict[str, int]:
+    """
+    מוחק blobs שאף קובץ בדוחות לא מקושר אליהם יותר (st_nlink == 1 – ה-hardlinks נמחקו
+    עם הדוחות) ושלא נכתבו ב-older_than_s האחרונות (blob של ריצה פעילה עוד לא קושר).
+    כש-hardlink לא נתמך (הועתק) אין דרך לדעת – גם הם נמחקים לפי גיל בלבד.
+    """
+    cutoff = time.time() - float(older_than_s)
+    removed = kept = freed = 0
+    for blob in Path(store_dir).glob("*/*"):
+        try:
+            st = blob.stat()
+        except OSError:
+            continue
+        if blob.suffix == ".tmp" or st.st_nlink > 1 or st.st_mtime > cutoff:
+            kept += 1
+            continue
+        if not dry_run:
+            try:
+                blob.unlink()
+            except OSError:
+                continue
+        removed += 1
+        freed += st.st_size
+    return {"removed": removed, "kept": kept, "bytes": freed}
+
+
+def build_argparser():
+    ap = argparse.ArgumentParser(description="Maintain the content-addressed artifact store")
+    ap.add_argument("--store", type=Path, default=CAS_DIR)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("prune", help="Delete stored artifacts no report links to anymore")
+    p.add_argument("--older-than-days", type=float, default=7.0)
+    p.add_argument("--dry-run", action="store_true")
+    return ap
+
+
+def main():
+    args = build_argparser().parse_args()
+    r = prune_store(args.store, older_than_s=args.older_than_days * 86400, dry_run=args.dry_run)
+    print(f"{'would remove' if args.dry_run else 'removed'} {r['removed']} blob(s), "
+          f"{r['bytes'] / 1024:.0f} KB; kept {r['kept']}")
+
+
+if __name__ == "__main__":
+    main()
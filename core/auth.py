@@ -0,0 +1,164 @@
+# core/auth.py
+from __future__ import annotations
+import asyncio, hashlib, json, os, threading, time, weakref
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from core.loader import load_scenario
+from core.network import resolve_profile, install_network_profile, async_install_network_profile
+from core.har import login_har, har_context_options, install_har_replay, async_install_har_replay
+from core.reporting import start_run
+from core.template import as_scope, substitute
+from core.engine import call, twin, run_sync, run_async
+
+# storage_state שמור לכל (base_url, user, browser) – מתחברים פעם אחת ומשתמשים שוב
+AUTH_CACHE_DIR = Path(os.environ.get("RPA_CACHE_DIR", ".rpa_cache")) / "auth"
+DEFAULT_TTL_S = 3600
+
+_locks: Dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def _lock_for(key: str) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault(key, threading.Lock())
+
+
+# ב-aio: lock לכל מפתח בתוך כל event loop (asyncio.Lock קשור ללולאה שבה הוא רץ)
+_async_locks: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _async_lock_for(key: str) -> asyncio.Lock:
+    per_loop = _async_locks.setdefault(asyncio.get_running_loop(), {})
+    return per_loop.setdefault(key, asyncio.Lock())
+
+
+def auth_key(base_url: Optional[str], user: Optional[str], browser: str) -> str:
+    raw = json.dumps([base_url or "", user or "", (browser or "chromium").lower()])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def state_path(key: str) -> Path:
+    return AUTH_CACHE_DIR / f"{key}.json"
+
+
+def cached_state(key: str, ttl_s: float) -> Optional[Path]:
+    """מחזיר נתיב storage_state אם קיים ועדיין בתוקף (לפי TTL)."""
+    p = state_path(key)
+    try:
+        if time.time() - p.stat().st_mtime < float(ttl_s):
+            return p
+    except OSError:
+        pass
+    return None
+
+
+def invalidate(key: str) -> None:
+    try:
+        state_path(key).unlink()
+    except OSError:
+        pass
+
+
+def _login_steps(auth: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """צעדי הלוגין (login_once): steps (inline) או include (קובץ YAML)."""
+    if auth.get("steps"):
+        return list(auth["steps"])
+    if auth.get("include"):
+        return list(load_scenario(Path(auth["include"]))["steps"])
+    raise ValueError("options.use_auth requires 'steps' or 'include'")
+
+
+def resolve_auth(options: Dict[str, Any], base_url: Optional[str], variables) -> Optional[Dict[str, Any]]:
+    """
+    מנרמל את options.use_auth (או None אם לא מוגדר):
+      use_auth:
+        include: scenarios/login.yaml   # או steps: [...]
+        user: ${USERNAME}               # חלק ממפתח המטמון
+        ttl_s: 3600
+        check: "text=Products"          # אופציונלי – selector שמעיד שהסשן עדיין חי
+        check_url: /inventory.html      # אופציונלי – לאן לנווט לבדיקה (ברירת מחדל: base_url)
+    """
+    auth = options.get("use_auth")
+    if not auth:
+        return None
+    scope = as_scope(variables)
+    user = substitute(str(auth.get("user") or "${USERNAME}"), scope)
+    return {
+        "steps": _login_steps(auth),
+        "user": user,
+        "ttl_s": float(auth.get("ttl_s", DEFAULT_TTL_S)),
+        "check": auth.get("check"),
+        "check_url": auth.get("check_url"),
+        "key": auth_key(base_url, user, options.get("browser", "chromium")),
+    }
+
+
+# ---------- login / בדיקת סשן (flows – core/engine.py) ----------
+
+def _context_kwargs(options: Dict[str, Any]) -> Dict[str, Any]:
+    return dict(viewport=options.get("viewport"), user_agent=options.get("user_agent"),
+                timeout_ms=options.get("timeout_ms"))
+
+
+def login_flow(browser, auth: Dict[str, Any], *, base_url, options, variables, reports_dir: Path,
+               har: Optional[Dict[str, Any]] = None):
+    """
+    מריץ את תת-תרחיש הלוגין ב-context זמני על אותו דפדפן ושומר את context.storage_state().
+    flow משותף ל-ensure_auth (sync) ול-async_ensure_auth. har (core/har.py): גם הלוגין
+    מוקלט / מוגש מ-HAR – קובץ נפרד, login_har – כך ש-replay לא יוצא לשרת.
+    """
+    from core.browser import new_context_page, close_context
+    from core.aio import browser as aio_browser
+    from core.runner import steps_flow
+
+    print(f"[auth] logging in once for user={auth['user']!r} ({options.get('browser')})")
+    har = login_har(har)
+    ctx, page = yield twin(new_context_page, aio_browser.new_context_page, browser,
+                           extra_context_options=har_context_options(har) or None, **_context_kwargs(options))
+    try:
+        yield twin(install_network_profile, async_install_network_profile, ctx,
+                   resolve_profile(options.get("network")))
+        yield twin(install_har_replay, async_install_har_replay, ctx, har)
+        results = start_run("auth-login", base_url, options.get("browser", "chromium"), False)
+        yield from steps_flow(page, auth["steps"], base_url=base_url, options=options, results=results,
+                              variables=variables, reports_dir=reports_dir)
+        out = state_path(auth["key"])
+        out.parent.mkdir(parents=True, exist_ok=True)
+        tmp = out.with_suffix(".tmp")
+        yield call(ctx.storage_state, path=str(tmp))
+        tmp.replace(out)
+        return out
+    finally:
+        yield twin(close_context, aio_browser.close_context, ctx)
+
+
+def session_alive(page, auth: Dict[str, Any], *, base_url, timeout_ms: int):
+    """flow: בדיקה זולה שהסשן ששוחזר עדיין מחובר (אם הוגדר use_auth.check)."""
+    if not auth.get("check"):
+        return True
+    from core.config import resolve_url
+    try:
+        yield call(page.goto, resolve_url(base_url, auth.get("check_url") or "/"),
+                   wait_until="domcontentloaded", timeout=timeout_ms)
+        yield call(page.locator(auth["check"]).first.wait_for, state="visible", timeout=timeout_ms)
+        return True
+    except Exception:
+        return False
+
+
+def ensure_auth(browser, auth: Dict[str, Any], *, force: bool = False, **kw) -> Path:
+    """
+    מחזיר storage_state בתוקף עבור auth; אם אין (או force) – מריץ את login_flow.
+    kw: base_url, options, variables, reports_dir, har.
+    """
+    with _lock_for(auth["key"]):
+        hit = None if force else cached_state(auth["key"], auth["ttl_s"])
+        return hit or run_sync(login_flow(browser, auth, **kw))
+
+
+async def async_ensure_auth(browser, auth: Dict[str, Any], *, force: bool = False, **kw) -> Path:
+    # כמו ב-sync: ריצות מקבילות על אותו מפתח מחכות ללוגין אחד ואז קוראות מהמטמון
+    async with _async_lock_for(auth["key"]):
+        hit = None if force else cached_state(auth["key"], auth["ttl_s"])
+        return hit or await run_async(login_flow(browser, auth, **kw))
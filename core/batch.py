@@ -0,0 +1,149 @@
+# core/batch.py
+from __future__ import annotations
+import glob, queue, threading, time
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+from core.browser import launch_browser, stop_browser
+from core.reporting import finalize_batch
+from core.runner import _run_single, compile_scenario
+
+YAML_SUFFIXES = (".yaml", ".yml")
+
+
+def expand_scenario_paths(patterns: Sequence[str]) -> List[Path]:
+    """
+    ממיר רשימת ארגומנטים (קבצים / תיקיות / globs) לרשימת קבצי YAML ייחודית וממוינת.
+    תיקייה נסרקת רקורסיבית.
+    """
+    out: List[Path] = []
+    for pat in patterns:
+        p = Path(pat)
+        if p.is_dir():
+            out += sorted(f for f in p.rglob("*") if f.suffix.lower() in YAML_SUFFIXES)
+        elif p.is_file():
+            out.append(p)
+        else:
+            out += sorted(Path(m) for m in glob.glob(pat, recursive=True)
+                          if Path(m).is_file() and Path(m).suffix.lower() in YAML_SUFFIXES)
+    return list(dict.fromkeys(out))
+
+
+def _reports_dir_for(path: Path, used: Dict[str, int]) -> Path:
+    """reports/<stem> – עם סיומת מספרית אם יש שני תרחישים עם אותו שם קובץ."""
+    stem = path.stem
+    n = used.get(stem, 0)
+    used[stem] = n + 1
+    return Path("reports") / (stem if n == 0 else f"{stem}_{n + 1}")
+
+
+def _matrix_runs(base_options: Dict[str, Any], reports_dir: Path) -> List[Tuple[Dict[str, Any], Path]]:
+    """מפרק את options.browsers לריצות (options, reports_dir) – או ריצה אחת אם אין מטריצה."""
+    browsers = base_options.get("browsers")
+    if not (isinstance(browsers, (list, tuple)) and browsers):
+        return [(base_options, reports_dir)]
+    runs: List[Tuple[Dict[str, Any], Path]] = []
+    for bname in browsers:
+        opts = dict(base_options); opts["browser"] = str(bname).lower()
+        runs.append((opts, reports_dir / opts["browser"]))
+    return runs
+
+
+class _Worker:
+    """
+    עובד אחד ב-pool: מחזיק Playwright + דפדפנים שכבר הופעלו (לפי סוג/הגדרות launch)
+    ופותח לכל תרחיש BrowserContext נקי.
+    Playwright sync אינו thread-safe, ולכן לכל thread יש מופע משלו.
+    """
+    def __init__(self):
+        self._browsers: Dict[Tuple[Any, ...], Tuple[Any, Any]] = {}
+
+    def browser_for(self, options: Dict[str, Any]):
+        proxy = options.get("proxy") or {}
+        key = (options["browser"], bool(options["headful"]), int(options.get("slow_mo") or 0),
+               tuple(sorted(proxy.items())))
+        if key not in self._browsers:
+            self._browsers[key] = launch_browser(
+                options["browser"], options["headful"],
+                slow_mo=options.get("slow_mo", 0), proxy=options.get("proxy"),
+                server=options.get("browser_server"),
+            )
+        return self._browsers[key][1]
+
+    def close(self) -> None:
+        for p, browser in self._browsers.values():
+            try:
+                stop_browser(p, browser)
+            except Exception:
+                pass
+        self._browsers.clear()
+
+
+def _run_job(worker: _Worker, path: Path, reports_dir: Path) -> List[Dict[str, Any]]:
+    """מריץ קובץ תרחיש אחד (כולל מטריצת browsers) ומחזיר שורות לסיכום."""
+    started = time.time()
+    try:
+        scenario, base_options, plan = compile_scenario(path)
+    except Exception as e:
+        return [{"scenario": str(path), "browser": "-", "status": "invalid", "rc": 2,
+                 "duration": time.time() - started, "reports_dir": str(reports_dir), "error": str(e)}]
+
+    name = scenario.get("name", path.stem)
+    base_url = scenario.get("base_url") or scenario.get("url")
+    variables = dict(base_options.get("variables") or {})
+
+    runs = _matrix_runs(base_options, reports_dir)
+
+    rows: List[Dict[str, Any]] = []
+    for opts, rdir in runs:
+        t0 = time.time()
+        error = None
+        try:
+            rc = _run_single(name, base_url, plan, opts, rdir, variables,
+                             browser=worker.browser_for(opts))
+        except Exception as e:
+            rc, error = 1, str(e)
+        rows.append({"scenario": str(path), "browser": opts["browser"],
+                     "status": "passed" if rc == 0 else "failed", "rc": rc,
+                     "duration": time.time() - t0, "reports_dir": str(rdir), "error": error})
+    return rows
+
+
+def run_batch(paths: Sequence[Path], *, workers: int = 1, reports_dir: Path = Path("reports")) -> int:
+    """
+    מריץ הרבה תרחישים בתהליך אחד על pool של N עובדים.
+    כל עובד משיק דפדפן פעם אחת ומשתמש בו שוב לכל התרחישים שלו.
+    מחזיר את קוד היציאה המקסימלי ומייצר סיכום מאוחד ב-reports/batch_summary.*
+    """
+    started = time.time()
+    jobs: "queue.Queue[Tuple[int, Path, Path]]" = queue.Queue()
+    used: Dict[str, int] = {}
+    for i, path in enumerate(paths):
+        jobs.put((i, path, _reports_dir_for(path, used)))
+
+    rows_by_index: Dict[int, List[Dict[str, Any]]] = {}
+    lock = threading.Lock()
+
+    def _loop():
+        worker = _Worker()
+        try:
+            while True:
+                try:
+                    i, path, rdir = jobs.get_nowait()
+                except queue.Empty:
+                    return
+                print(f"\n=== [batch] {path} ===\n")
+                rows = _run_job(worker, path, rdir)
+                with lock:
+                    rows_by_index[i] = rows
+        finally:
+            worker.close()
+
+    n = max(1, min(int(workers or 1), len(paths)))
+    threads = [threading.Thread(target=_loop, name=f"rpa-batch-{k}", daemon=True) for k in range(n)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+
+    rows = [r for i in sorted(rows_by_index) for r in rows_by_index[i]]
+    finalize_batch(rows, started, reports_dir)
+    return max((r["rc"] for r in rows), default=0)
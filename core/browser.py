@@ -2,6 +2,7 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Optional, Sequence, Dict, Any, Tuple
 from playwright.sync_api import sync_playwright, Playwright, Browser, BrowserContext, Page
+from core.browser_server import resolve_ws_endpoint
 
 def _normalize_viewport(viewport: Optional[Sequence[int]]) -> Optional[Dict[str, int]]:
     if not viewport:
@@ -21,32 +22,58 @@ def _browser_ctor(p: Playwright, name: str):
     if name in ("webkit", "safari"):    return p.webkit
     return p.chromium
 
-def open_browser(
+def _server_endpoint(server: Optional[str], browser_name: str, proxy: Optional[Dict[str, str]],
+                     headful: bool) -> Optional[str]:
+    # proxy ו-headful הם הגדרות launch: עם proxy, או כשהשרת רץ במצב אחר, משיקים רגיל
+    return resolve_ws_endpoint(server, browser_name, headful) if (server and not proxy) else None
+
+def _launch_kwargs(headful: bool, slow_mo: int, proxy: Optional[Dict[str, str]]) -> Dict[str, Any]:
+    launch_kwargs: Dict[str, Any] = {"headless": not bool(headful)}
+    if slow_mo and int(slow_mo) > 0:
+        launch_kwargs["slow_mo"] = int(slow_mo)
+    if proxy:
+        launch_kwargs["proxy"] = proxy
+    return launch_kwargs
+
+def launch_browser(
     browser_name: str,
     headful: bool,
     *,
-    record_video_dir: Optional[Path] = None,
-    downloads_dir: Optional[Path] = None,
-    viewport: Optional[Sequence[int]] = None, #גודל החלון
-    user_agent: Optional[str] = None, #טקסט שמגדיר את סוג הדפדפן/מכשיר מול האתר
-    timeout_ms: Optional[int] = None, #כמה זמן לחכות לטעינה לפני שיזרק שגיאה
     slow_mo: int = 0,
-    proxy: Optional[Dict[str, str]] = None,   # {"server": "http://host:port", "username": "...", "password": "..."}
-    extra_context_options: Optional[Dict[str, Any]] = None,
-) -> Tuple[Playwright, Browser, BrowserContext, Page]:
-    if record_video_dir: Path(record_video_dir).mkdir(parents=True, exist_ok=True)
-    if downloads_dir:    Path(downloads_dir).mkdir(parents=True, exist_ok=True)
-
+    proxy: Optional[Dict[str, str]] = None,
+    server: Optional[str] = None,
+) -> Tuple[Playwright, Browser]:
+    """
+    מפעיל Playwright + דפדפן בלבד (בלי context) – לשימוש חוזר בין תרחישים.
+    אם server מוגדר (browser-server, ראה core/browser_server.py) ויש endpoint חי –
+    מתחברים אליו במקום להשיק דפדפן חדש.
+    """
     p = sync_playwright().start()
     browser_type = _browser_ctor(p, browser_name)
 
-    launch_kwargs: Dict[str, Any] = {"headless": not bool(headful)}
-    if slow_mo and int(slow_mo) > 0:
-        launch_kwargs["slow_mo"] = int(slow_mo)
-    if proxy:
-        launch_kwargs["proxy"] = proxy
+    ws = _server_endpoint(server, browser_name, proxy, headful)
+    if ws:
+        try:
+            return p, browser_type.connect(ws, slow_mo=int(slow_mo or 0))
+        except Exception as e:
+            print(f"[browser] browser-server connect failed ({e}); launching locally")
 
-    browser: Browser = browser_type.launch(**launch_kwargs)
+    browser: Browser = browser_type.launch(**_launch_kwargs(headful, slow_mo, proxy))
+    return p, browser
+
+def new_context_page(
+    browser: Browser,
+    *,
+    record_video_dir: Optional[Path] = None,
+    downloads_dir: Optional[Path] = None,
+    viewport: Optional[Sequence[int]] = None,
+    user_agent: Optional[str] = None,
+    timeout_ms: Optional[int] = None,
+    extra_context_options: Optional[Dict[str, Any]] = None,
+) -> Tuple[BrowserContext, Page]:
+    """פותח BrowserContext נקי + Page על דפדפן קיים."""
+    if record_video_dir: Path(record_video_dir).mkdir(parents=True, exist_ok=True)
+    if downloads_dir:    Path(downloads_dir).mkdir(parents=True, exist_ok=True)
 
     vp = _normalize_viewport(viewport)
     context_kwargs: Dict[str, Any] = {"accept_downloads": True}
@@ -69,6 +96,32 @@ def open_browser(
         page.set_default_timeout(ms)
         page.set_default_navigation_timeout(ms)
 
+    return ctx, page
+
+def open_browser(
+    browser_name: str,
+    headful: bool,
+    *,
+    record_video_dir: Optional[Path] = None,
+    downloads_dir: Optional[Path] = None,
+    viewport: Optional[Sequence[int]] = None, #גודל החלון
+    user_agent: Optional[str] = None, #טקסט שמגדיר את סוג הדפדפן/מכשיר מול האתר
+    timeout_ms: Optional[int] = None, #כמה זמן לחכות לטעינה לפני שיזרק שגיאה
+    slow_mo: int = 0,
+    proxy: Optional[Dict[str, str]] = None,   # {"server": "http://host:port", "username": "...", "password": "..."}
+    extra_context_options: Optional[Dict[str, Any]] = None,
+    server: Optional[str] = None,  # browser-server: ws:// או קובץ מצב; None = השקה רגילה
+) -> Tuple[Playwright, Browser, BrowserContext, Page]:
+    p, browser = launch_browser(browser_name, headful, slow_mo=slow_mo, proxy=proxy, server=server)
+    ctx, page = new_context_page(
+        browser,
+        record_video_dir=record_video_dir,
+        downloads_dir=downloads_dir,
+        viewport=viewport,
+        user_agent=user_agent,
+        timeout_ms=timeout_ms,
+        extra_context_options=extra_context_options,
+    )
     return p, browser, ctx, page
 
 def close_browser(p: Playwright, browser: Browser, ctx: BrowserContext) -> None:
@@ -82,3 +135,18 @@ def close_browser(p: Playwright, browser: Browser, ctx: BrowserContext) -> None:
                 p.stop()
             except Exception:
                 pass
+
+def close_context(ctx: BrowserContext) -> None:
+    try:
+        ctx.close()
+    except Exception:
+        pass
+
+def stop_browser(p: Playwright, browser: Browser) -> None:
+    try:
+        browser.close()
+    finally:
+        try:
+            p.stop()
+        except Exception:
+            pass
@@ -0,0 +1,223 @@
+# core/browser_server.py
+from __future__ import annotations
+import argparse, json, os, socket, subprocess, threading, time
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+# קובץ מצב שבו השרת רושם את ה-ws endpoint של כל דפדפן; הלקוחות (open_browser) קוראים ממנו
+DEFAULT_STATE_FILE = Path("reports/.browser_server.json")
+
+# launchServer קיים רק ב-API של Node, לכן מריצים אותו דרך ה-driver שמגיע עם חבילת playwright
+_NODE_SCRIPT = r"""
+const pw = require(process.argv[1]);
+const [name, headless, port] = [process.argv[2], process.argv[3] === '1', Number(process.argv[4]) || 0];
+pw[name].launchServer({ headless, port }).then(server => {
+  console.log(server.wsEndpoint());
+  const bye = () => server.close().finally(() => process.exit(0));
+  process.on('SIGTERM', bye); process.on('SIGINT', bye);
+}).catch(err => { console.error(String(err)); process.exit(1); });
+"""
+
+
+def _canonical(name: str) -> str:
+    name = (name or "chromium").strip().lower()
+    if name in ("chrome",):  return "chromium"
+    if name in ("ff",):      return "firefox"
+    if name in ("safari",):  return "webkit"
+    return name if name in ("chromium", "firefox", "webkit") else "chromium"
+
+
+def _driver_paths():
+    from playwright._impl._driver import compute_driver_executable
+    node, cli = compute_driver_executable()
+    return str(node), str(Path(cli).parent)
+
+
+def _drain(stream) -> None:
+    """קורא ומשליך את שארית ה-stdout של תהליך launchServer עד שהוא נסגר."""
+    try:
+        for _ in stream:
+            pass
+    except Exception:
+        pass
+
+
+def _endpoint_alive(ws_endpoint: str, timeout: float = 0.5) -> bool:
+    """בדיקת חיים זולה: האם הפורט של ה-endpoint מקבל חיבור TCP."""
+    u = urlparse(ws_endpoint)
+    try:
+        with socket.create_connection((u.hostname or "127.0.0.1", u.port or 80), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+# ---------- צד לקוח ----------
+
+def resolve_ws_endpoint(server: Optional[str], browser_name: str, headful: Optional[bool] = None) -> Optional[str]:
+    """
+    server יכול להיות:
+      - ws://... – endpoint ישיר (לדפדפן אחד)
+      - נתיב לקובץ מצב של browser-server, או "1"/"auto" לקובץ ברירת המחדל
+    מחזיר endpoint חי עבור browser_name או None (ואז open_browser משיק כרגיל).
+    headful: הדפדפן בשרת רץ במצב שבו השרת הופעל – אם קובץ המצב אומר מצב אחר, לא מתחברים.
+    ב-ws:// ישיר המצב לא ידוע – מתחברים ומדפיסים שהגדרות ה-launch של הלקוח לא חלות.
+    """
+    if not server:
+        return None
+    server = str(server).strip()
+    if server.startswith(("ws://", "wss://")):
+        if not _endpoint_alive(server):
+            return None
+        print(f"[browser] using browser-server {server}: headful/launch options come from the server")
+        return server
+
+    state_file = DEFAULT_STATE_FILE if server.lower() in ("1", "auto", "true") else Path(server)
+    try:
+        state = json.loads(state_file.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    ws = (state.get("endpoints") or {}).get(_canonical(browser_name))
+    if not ws or not _endpoint_alive(ws):
+        return None
+    if "headful" not in state:
+        print(f"[browser] using browser-server {ws}: headful/launch options come from the server")
+    elif headful is not None and bool(state["headful"]) != bool(headful):
+        print(f"[browser] browser-server runs {'headful' if state['headful'] else 'headless'}, "
+              f"requested {'headful' if headful else 'headless'} – launching locally")
+        return None
+    return ws
+
+
+# ---------- צד שרת ----------
+
+class BrowserServer:
+    """
+    מחזיק תהליך launchServer לכל סוג דפדפן, כותב את ה-endpoints לקובץ מצב,
+    ומפעיל מחדש אוטומטית תהליך שמת או שהפורט שלו לא עונה.
+    """
+    def __init__(self, browsers: List[str], *, headful: bool = False,
+                 state_file: Path = DEFAULT_STATE_FILE, base_port: int = 0):
+        self.browsers = list(dict.fromkeys(_canonical(b) for b in browsers)) or ["chromium"]
+        self.headful = bool(headful)
+        self.state_file = Path(state_file)
+        self.base_port = int(base_port or 0)
+        self.procs: Dict[str, subprocess.Popen] = {}
+        self.endpoints: Dict[str, str] = {}
+        self.restarts: Dict[str, int] = {b: 0 for b in self.browsers}
+
+    def log_path(self, name: str) -> Path:
+        return self.state_file.parent / f"browser_server_{name}.log"
+
+    def _spawn(self, name: str) -> None:
+        node, pkg = _driver_paths()
+        port = (self.base_port + self.browsers.index(name)) if self.base_port else 0
+        # stderr לקובץ לוג ו-stdout מנוקז ברקע: pipe שאף אחד לא קורא מתמלא ותוקע את התהליך
+        log = self.log_path(name)
+        log.parent.mkdir(parents=True, exist_ok=True)
+        with open(log, "a", encoding="utf-8") as err_fh:
+            proc = subprocess.Popen(
+                [node, "-e", _NODE_SCRIPT, pkg, name, "0" if self.headful else "1", str(port)],
+                stdout=subprocess.PIPE, stderr=err_fh, text=True,
+            )
+        line = (proc.stdout.readline() or "").strip()
+        if not line.startswith("ws"):
+            try:
+                proc.wait(timeout=2)
+            except Exception:
+                proc.kill()
+            err = log.read_text(encoding="utf-8", errors="replace").strip().splitlines()[-1:] if log.exists() else []
+            raise RuntimeError(f"browser-server: failed to launch {name}: {(err or [line])[0] or 'no endpoint'} "
+                               f"(log: {log})")
+        threading.Thread(target=_drain, args=(proc.stdout,), name=f"browser-server-{name}-stdout",
+                         daemon=True).start()
+        self.procs[name] = proc
+        self.endpoints[name] = line
+        print(f"[browser-server] {name} → {line}")
+
+    def _write_state(self) -> None:
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        state = {"pid": os.getpid(), "updated": time.time(), "headful": self.headful, "endpoints": self.endpoints}
+        tmp = self.state_file.with_suffix(".tmp")
+        tmp.write_text(json.dumps(state, indent=2), encoding="utf-8")
+        tmp.replace(self.state_file)
+
+    def healthy(self, name: str) -> bool:
+        proc = self.procs.get(name)
+        ws = self.endpoints.get(name)
+        return bool(proc and proc.poll() is None and ws and _endpoint_alive(ws))
+
+    def start(self) -> None:
+        for name in self.browsers:
+            self._spawn(name)
+        self._write_state()
+
+    def ensure(self) -> None:
+        """בדיקת בריאות לכל הדפדפנים + הפעלה מחדש למי שנפל."""
+        changed = False
+        for name in self.browsers:
+            if self.healthy(name):
+                continue
+            print(f"[browser-server] {name} is down – restarting")
+            self._kill(name)
+            try:
+                self._spawn(name)
+                self.restarts[name] += 1
+            except Exception as e:
+                print(f"[browser-server] restart of {name} failed: {e}")
+                self.endpoints.pop(name, None)
+            changed = True
+        if changed:
+            self._write_state()
+
+    def _kill(self, name: str) -> None:
+        proc = self.procs.pop(name, None)
+        if proc and proc.poll() is None:
+            proc.terminate()
+            try:
+                proc.wait(timeout=5)
+            except Exception:
+                proc.kill()
+
+    def stop(self) -> None:
+        for name in list(self.procs):
+            self._kill(name)
+        self.endpoints.clear()
+        try:
+            self.state_file.unlink()
+        except Exception:
+            pass
+
+    def serve_forever(self, interval_s: float = 2.0) -> None:
+        self.start()
+        try:
+            while True:
+                time.sleep(interval_s)
+                self.ensure()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+
+def build_argparser():
+    ap = argparse.ArgumentParser(description="RPA browser-server (keeps browsers alive for fast CLI runs)")
+    ap.add_argument("--browsers", default="chromium", help="Comma separated: chromium,firefox,webkit")
+    ap.add_argument("--headful", action="store_true")
+    ap.add_argument("--state-file", type=Path, default=DEFAULT_STATE_FILE)
+    ap.add_argument("--port", type=int, default=0, help="First port (one per browser); 0 = random")
+    ap.add_argument("--health-interval", type=float, default=2.0)
+    return ap
+
+def main():
+    args = build_argparser().parse_args()
+    server = BrowserServer(
+        [b for b in args.browsers.split(",") if b.strip()],
+        headful=args.headful, state_file=args.state_file, base_port=args.port,
+    )
+    print(f"[browser-server] state file: {server.state_file} (set BROWSER_SERVER=1 to use it)")
+    server.serve_forever(args.health_interval)
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,12 @@
 
 from __future__ import annotations
-import os, random, string
+import os
 from typing import Optional, Any, Dict, Sequence
+from core.template import substitute
+from core.tracing import parse_retain_mode
+from core.artifacts import resolve_artifacts
+from core.reporting import parse_report_mode
+from core.network import merge_env_network
 
 def _parse_viewport(v) -> Optional[Sequence[int]]:
     if not v: return None
@@ -12,8 +17,9 @@ def _parse_viewport(v) -> Optional[Sequence[int]]:
             return [int(parts[0]), int(parts[1])]
     return None
 
-def _rand_token(n: int = 6) -> str:
-    return "".join(random.choice(string.ascii_lowercase + string.digits) for _ in range(n))
+def _opt_int(v) -> Optional[int]:
+    if v is None or v == "": return None
+    return int(v)
 
 def load_options(scenario: dict, env=os.environ) -> Dict[str, Any]:
     opts = scenario.get("options", {}) or {}
@@ -27,8 +33,17 @@ def load_options(scenario: dict, env=os.environ) -> Dict[str, Any]:
     variables = dict(scenario.get("variables", {}) or {})
     if isinstance(opts.get("variables"), dict):
         variables.update(opts["variables"])
-    # הזרקת ${RAND} כברירת מחדל – שימושי לחשבונות/שמות ייחודיים
-    variables.setdefault("RAND", _rand_token())
+
+    # פרופיל רשת (חסימת משאבים) – מהתרחיש, ודגלי CLI/env מתווספים עליו
+    network = merge_env_network(opts.get("network"), env)
+
+    # צילומי מסך: פורמט/איכות/dedup (core/artifacts.py); env גובר על ברירות המחדל בלבד
+    artifacts = dict(opts.get("artifacts") or {})
+    for k in ("format", "quality", "dedup"):
+        if k not in artifacts and env.get(f"ARTIFACT_{k.upper()}"):
+            artifacts[k] = env[f"ARTIFACT_{k.upper()}"]
+    if isinstance(artifacts.get("dedup"), str):
+        artifacts["dedup"] = artifacts["dedup"].strip().lower() not in ("0", "false", "no")
 
     proxy = None
     if env.get("PROXY_SERVER"):
@@ -41,14 +56,32 @@ def load_options(scenario: dict, env=os.environ) -> Dict[str, Any]:
         "browser": str(opts.get("browser", env.get("BROWSER", "chromium"))).lower(),
         "timeout_ms": int(opts.get("timeout_ms", env.get("TIMEOUT_MS", 7000))),
         "speed_s": float(opts.get("speed_s", env.get("SPEED_S", 0.0))),
-        "tracing": bool(opts.get("tracing", env.get("TRACING", "1") == "1")),
-        "video": bool(opts.get("video", env.get("VIDEO", "0") == "1")),
+        # off | on | retain-on-failure (TRACING=1 / VIDEO=1 = on); ברירת מחדל: trace רק לכישלונות
+        "tracing": parse_retain_mode(opts.get("tracing", env.get("TRACING")), "retain-on-failure"),
+        "video": parse_retain_mode(opts.get("video", env.get("VIDEO")), "off"),
         "viewport": viewport,
         "user_agent": opts.get("user_agent") or env.get("USER_AGENT"),
         "browsers": browsers,
+        # מספר דפדפנים שירוצו במקביל מתוך browsers (0/1 = אחד אחרי השני)
+        "parallel": int(opts.get("parallel", env.get("PARALLEL", 0))),
         "variables": variables,
         "slow_mo": int(opts.get("slow_mo", env.get("SLOW_MO", 0))),
         "proxy": proxy,
+        # use_auth: לוגין פעם אחת + storage_state משותף (core/auth.py)
+        "use_auth": opts.get("use_auth") or None,
+        "network": network,
+        "artifacts": resolve_artifacts(artifacts),
+        # auto | single | paged – דוח HTML מחולק לעמודים לריצות גדולות (core/report_paged.py)
+        "report_mode": parse_report_mode(opts.get("report", env.get("REPORT_MODE"))),
+        # HAR: record שומר תעבורה, replay מגיש ממנה בלי רשת (core/har.py)
+        "network_mode": str(opts.get("network_mode", env.get("NETWORK_MODE", "live"))).lower(),
+        "har_path": opts.get("har_path") or env.get("HAR_PATH") or None,
+        "har_not_found": str(opts.get("har_not_found", env.get("HAR_NOT_FOUND", "abort"))).lower(),
+        "har_url": opts.get("har_url") or None,
+        # כמה retries מותרים בסך הכול לריצה (None = ללא הגבלה); נגמר → נכשלים מהר
+        "retry_budget": _opt_int(opts.get("retry_budget", env.get("RETRY_BUDGET"))),
+        # browser-server: ws endpoint או קובץ מצב ("1" = ברירת מחדל); ריק = השקה רגילה
+        "browser_server": opts.get("browser_server") or env.get("BROWSER_SERVER") or None,
     }
 
 def resolve_url(base_url: Optional[str], sel: str) -> str:
@@ -61,8 +94,5 @@ def resolve_url(base_url: Optional[str], sel: str) -> str:
     return sel
 
 def substitute_vars(value: Any, variables: dict):
-    if not isinstance(value, str): return value
-    out = value
-    for k, v in (variables or {}).items():
-        out = out.replace(f"${{{k}}}", str(v))
-    return out
+    # מעבר regex יחיד במקום str.replace לכל משתנה (ראה core/template.py)
+    return substitute(value, variables)
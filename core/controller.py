@@ -1,11 +1,17 @@
 from __future__ import annotations
 from pathlib import Path
 from typing import Any, Dict, List
-import json, time, traceback, inspect
+import json, os, time, traceback, inspect
 
-from core.browser import open_browser, close_browser
+from core.browser import launch_browser, close_browser, stop_browser
+from core.network import merge_env_network
+from core.har import slug
+from core.tracing import (parse_retain_mode, start_tracing, start_chunk, stop_chunk, stop_tracing,
+                          video_paths, settle_videos)
 from core import reporting
-from core.runner import run_steps
+from core.runner import run_steps, setup_context_flow
+from core.engine import run_sync
+from core.template import as_scope
 from agents.planner_llm import build_suite_from_graph_llm
 
 REPORTS_DIR = Path("reports/ai")
@@ -57,9 +63,10 @@ def _write_json(path: Path, obj: Any) -> None:
 # ---------- NORMALIZATION FIX ----------
 
 ALLOWED_TYPES = {
-    "goto", "click", "fill", "press", "select_option",
+    "goto", "click", "fill", "press", "select_option", "login", "fill_form",
     "wait", "wait_for_selector", "screenshot",
-    "assert_text", "assert_url_contains"
+    "wait_for_response", "wait_for_network_idle", "wait_for_dom_stable",
+    "assert_text", "assert_url_contains", "assert_all"
 }
 
 def _normalize_suite(suite: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -163,7 +170,7 @@ def run_suite(options: Dict[str, Any]) -> None:
     url          = options.get("url") or ""
     browser_name = options.get("browser", "chromium")
     headful      = bool(options.get("headful"))
-    video        = bool(options.get("video"))
+    video_mode   = parse_retain_mode(options.get("video"), "off")
     timeout_ms   = int(options.get("timeout_ms") or 20000)
     viewport     = options.get("viewport") or (1366, 900)
     model_name   = options.get("ollama_model", "llama3")
@@ -172,7 +179,8 @@ def run_suite(options: Dict[str, Any]) -> None:
     variables = dict(options.get("variables") or {})
     variables.setdefault("USERNAME", "standard_user")
     variables.setdefault("PASSWORD", "secret_sauce")
-    options["variables"] = variables
+    # scope אחד לכל ה-suite – ${RAND} יציב בין הבדיקות (core/template.py)
+    options["variables"] = as_scope(variables)
 
     _ensure_graph_exists(url)
 
@@ -200,47 +208,97 @@ def run_suite(options: Dict[str, Any]) -> None:
         print(f"[DEBUG] first step → type={first.get('type')} selector={first.get('selector')} url={first.get('url')}")
 
     # 3) דוח
+    report_mode = reporting.parse_report_mode(options.get("report") or os.environ.get("REPORT_MODE"))
     results = reporting.start_run(name="AI LLM Suite", base_url=url,
-                                  browser=browser_name, headful=headful)
+                                  browser=browser_name, headful=headful, log_dir=REPORTS_DIR)
+    results["report_mode"] = report_mode
     started_ts = time.time()
 
-    # 4) פתיחת דפדפן
-    p, browser, ctx, page = open_browser(
-        browser_name=browser_name,
-        headful=headful,
-        record_video_dir=(REPORTS_DIR / "video") if video else None,
-        downloads_dir=(REPORTS_DIR / "downloads"),
-        viewport=viewport,
-        timeout_ms=timeout_ms,
-        slow_mo=int(options.get("slow_mo") or 0),
-        proxy=options.get("proxy"),
-        extra_context_options=None,
-        user_agent=options.get("user_agent"),
-    )
-
+    # 4) פתיחת דפדפן + context – בתוך ה-try, כדי שכישלון בהשקה/לוגין/context לא ישאיר
+    # דפדפן פתוח וה-run_end עדיין ייכתב
+    status, error = "passed", None
+    p = browser = ctx = har = None
+    trace_mode, videos = "off", []
     try:
+        p, browser = launch_browser(
+            browser_name,
+            headful,
+            slow_mo=int(options.get("slow_mo") or 0),
+            proxy=options.get("proxy"),
+            server=options.get("browser_server") or os.environ.get("BROWSER_SERVER"),
+        )
+
+        run_opts = {**options, "browser": browser_name, "timeout_ms": timeout_ms, "viewport": viewport}
+        # options.network + NETWORK_PROFILE/BLOCK/DENY/ALLOW (כמו ב-load_options)
+        run_opts["network"] = merge_env_network(options.get("network"))
+        # network_mode=record|replay: אותה סוויטה מול תעבורה מוקלטת (core/har.py)
+        run_opts["network_mode"] = options.get("network_mode") or os.environ.get("NETWORK_MODE")
+        run_opts["har_not_found"] = options.get("har_not_found") or os.environ.get("HAR_NOT_FOUND")
+
+        context_kwargs = dict(
+            record_video_dir=(REPORTS_DIR / "video") if video_mode != "off" else None,
+            downloads_dir=(REPORTS_DIR / "downloads"),
+            viewport=viewport,
+            timeout_ms=timeout_ms,
+            user_agent=options.get("user_agent"),
+        )
+        # HAR + use_auth + פרופיל רשת – אותו flow כמו בריצת תרחיש (core/runner.py)
+        ctx, page, net_stats, har = run_sync(setup_context_flow(
+            browser, "AI LLM Suite", url, run_opts, REPORTS_DIR, options["variables"], context_kwargs))
+        if net_stats is not None:
+            results["network"] = net_stats
+
+        # tracing: chunk לכל טסט בסוויטה; retain-on-failure שומר רק את ה-chunk של הטסט שנכשל
+        mode = parse_retain_mode(options.get("tracing") or os.environ.get("TRACING"), "retain-on-failure")
+        trace_mode = mode if start_tracing(ctx, mode) else "off"
+
         # 5) הרצה בפועל
-        for test in suite:
+        for i, test in enumerate(suite, start=1):
             steps = test.get("steps", [])
-            _call_run_steps_safely(
-                steps,
-                url=url,
-                options=options,
-                results_obj=results,
-                page=page,
-                ctx=ctx,
-            )
-
-        reporting.finalize_run(results, status="passed",
-                               error=None, started_ts=started_ts, reports_dir=REPORTS_DIR)
+            title = str(test.get("name") or f"test_{i}")
+            if trace_mode != "off":
+                start_chunk(ctx, title=title)
+            reporting.start_test(results, title)
+            continued_before = results.get("continued_failures", 0)
+            failed = True
+            try:
+                _call_run_steps_safely(
+                    steps,
+                    url=url,
+                    options=options,
+                    results_obj=results,
+                    page=page,
+                    ctx=ctx,
+                )
+                failed = False
+            finally:
+                reporting.end_test(results, title, "failed" if failed else "passed")
+                if trace_mode != "off":
+                    # צעד continue_on_fail שנכשל – הטסט עובר, אבל ה-trace שלו נשמר ב-retain-on-failure
+                    continued = results.get("continued_failures", 0) > continued_before
+                    kept = stop_chunk(ctx, trace_mode, failed or continued,
+                                      REPORTS_DIR / f"trace_{i:02d}_{slug(title)}.zip")
+                    if kept:
+                        reporting.attach_artifact(results, "trace", kept)
 
     except Exception as e:
-        reporting.finalize_run(results, status="failed",
-                               error=str(e), started_ts=started_ts, reports_dir=REPORTS_DIR)
+        status, error = "failed", str(e)
         print("[controller] run failed:\n", traceback.format_exc())
         raise
     finally:
-        close_browser(p, browser, ctx)
+        if ctx is not None:
+            if trace_mode != "off":
+                stop_tracing(ctx)
+            videos = video_paths(ctx)
+            close_browser(p, browser, ctx)
+        elif browser is not None:
+            stop_browser(p, browser)
+        for v in settle_videos(videos, video_mode, status != "passed"):
+            reporting.attach_artifact(results, "video", v)
+        if har and har["mode"] == "record":
+            print(f"[har] recorded: {har['path']}")
+        reporting.finalize_run(results, status=status,
+                               error=error, started_ts=started_ts, reports_dir=REPORTS_DIR)
 
 
 def run_ai(options: Dict[str, Any]) -> None:
@@ -0,0 +1,133 @@
+# core/engine.py
+from __future__ import annotations
+import asyncio, functools, inspect, time
+from typing import Any, Callable, Generator
+
+# מימוש אחד לשני המנועים (playwright.sync_api / playwright.async_api): פעולות, לולאת הצעד
+# וה-runner כתובים כ-generators ש"מבקשים" כל I/O ב-yield, ו-driver לכל מנוע מבצע את הבקשה
+# ומחזיר לתוך ה-generator את התוצאה (או זורק אליו את החריגה – כך try/except/finally עובדים
+# כרגיל). יצירת locator (page.locator / .first) ו-page.url אינן I/O ונעשות ישירות.
+#
+#   def action_x(page, *, selector, timeout_ms=7000, **_):
+#       n = yield call(page.locator(selector).count)
+#       yield pause(0.1)
+#       return {"count": n}
+#
+#   run_sync(action_x(page, ...))            # sync page
+#   await run_async(action_x(page, ...))     # async page
+#   flow משנה: r = yield from other_flow(...)
+
+Flow = Generator[Any, Any, Any]
+
+
+class _Call:
+    __slots__ = ("fn", "args", "kwargs")
+
+    def __init__(self, fn, args, kwargs):
+        self.fn, self.args, self.kwargs = fn, args, kwargs
+
+
+class _Pause:
+    __slots__ = ("seconds", "page")
+
+    def __init__(self, seconds, page):
+        self.seconds, self.page = seconds, page
+
+
+class _Twin:
+    __slots__ = ("sync_fn", "async_fn", "args", "kwargs")
+
+    def __init__(self, sync_fn, async_fn, args, kwargs):
+        self.sync_fn, self.async_fn, self.args, self.kwargs = sync_fn, async_fn, args, kwargs
+
+
+def call(fn: Callable, *args, **kwargs) -> _Call:
+    """קריאת Playwright (מתודה קשורה): sync – כמו שהיא; async – הקריאה + await."""
+    return _Call(fn, args, kwargs)
+
+
+def pause(seconds: float, page=None) -> _Pause:
+    """
+    המתנה: async – asyncio.sleep; sync – time.sleep, או page.wait_for_timeout כשמועבר page
+    (כדי שאירועי Playwright, למשל response, ימשיכו להגיע בזמן ההמתנה).
+    """
+    return _Pause(max(0.0, float(seconds)), page)
+
+
+def twin(sync_fn: Callable, async_fn: Callable, *args, **kwargs) -> _Twin:
+    """עוזר שיש לו שתי גרסאות (למשל save_screenshot / async_save_screenshot) – כל מנוע את שלו."""
+    return _Twin(sync_fn, async_fn, args, kwargs)
+
+
+def _do_sync(req):
+    if isinstance(req, _Call):
+        return req.fn(*req.args, **req.kwargs)
+    if isinstance(req, _Pause):
+        if req.page is not None:
+            return req.page.wait_for_timeout(max(1, req.seconds * 1000))
+        return time.sleep(req.seconds)
+    if isinstance(req, _Twin):
+        return req.sync_fn(*req.args, **req.kwargs)
+    raise TypeError(f"engine: unknown request {req!r}")
+
+
+async def _do_async(req):
+    if isinstance(req, _Call):
+        out = req.fn(*req.args, **req.kwargs)
+    elif isinstance(req, _Pause):
+        out = asyncio.sleep(req.seconds)
+    elif isinstance(req, _Twin):
+        out = req.async_fn(*req.args, **req.kwargs)
+    else:
+        raise TypeError(f"engine: unknown request {req!r}")
+    return (await out) if inspect.isawaitable(out) else out
+
+
+def run_sync(flow: Any) -> Any:
+    """מריץ flow מול sync_api ומחזיר את ערך ה-return שלו (ערך שאינו generator מוחזר כמו שהוא)."""
+    if not inspect.isgenerator(flow):
+        return flow
+    send, exc = None, None
+    while True:
+        try:
+            req = flow.throw(exc) if exc is not None else flow.send(send)
+        except StopIteration as stop:
+            return stop.value
+        send, exc = None, None
+        try:
+            send = _do_sync(req)
+        except BaseException as e:   # גם KeyboardInterrupt – כדי שה-finally של ה-flow ירוץ
+            exc = e
+
+
+async def run_async(flow: Any) -> Any:
+    """המקבילה האסינכרונית של run_sync (גם CancelledError נזרק לתוך ה-flow)."""
+    if not inspect.isgenerator(flow):
+        return flow
+    send, exc = None, None
+    while True:
+        try:
+            req = flow.throw(exc) if exc is not None else flow.send(send)
+        except StopIteration as stop:
+            return stop.value
+        send, exc = None, None
+        try:
+            send = await _do_async(req)
+        except BaseException as e:
+            exc = e
+
+
+def sync_fn(flow_fn: Callable) -> Callable:
+    """פונקציה רגילה מעל flow – לקוד sync שקורא לפעולה ישירות."""
+    @functools.wraps(flow_fn)
+    def _wrapper(*args, **kwargs):
+        return run_sync(flow_fn(*args, **kwargs))
+    return _wrapper
+
+
+def async_fn(flow_fn: Callable) -> Callable:
+    """coroutine function מעל flow."""
+    @functools.wraps(flow_fn)
+    async def _wrapper(*args, **kwargs):
+        return await run_async(flow_fn(*args, **kwargs))
+    return _wrapper
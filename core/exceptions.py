@@ -9,3 +9,6 @@ class ActionExecutionError(RPARuntimeError):
 
 class IncludeNotFoundError(RPARuntimeError):
     """Raised when an include file is missing."""
+
+class IncludeCycleError(RPARuntimeError):
+    """Raised when include files reference each other in a cycle."""
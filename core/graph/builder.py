@@ -8,6 +8,7 @@ from collections import deque
 from playwright.sync_api import Page
 from core.graph.graph import PageGraph, Node, Edge, save_graph
 from core.perception import perceive
+from core.network import resolve_profile, merge_env_network, install_network_profile
 
 
 # --------- עוזרים לכתובות ---------
@@ -81,16 +82,21 @@ def _extract_links(page: Page, base_url: str, limit: int = 50) -> List[Tuple[str
 
 
 # --------- בניית גרף (BFS) ---------
-def build_graph(page: Page, start_url: str, *, max_pages: int = 10, max_depth: int = 2) -> PageGraph:
+def build_graph(page: Page, start_url: str, *, max_pages: int = 10, max_depth: int = 2,
+                network: Any = None) -> PageGraph:
     """
     סורק את האתר ב-BFS מוגבל:
     - מתחיל מ-start_url (חייב להיות באותו origin עם ה-base_url שנגזר ממנו).
     - לא יוצא מה-origin.
     - עומק ורוחב מוגבלים כדי לא להסתבך באתרי ענק/אינסוף.
     - עבור כל דף: יוצר Node עם snapshot מ-perceive, ומוסיף קשתות לכל קישור שנמצא.
+    network – פרופיל חסימה (למשל "fast", או dict כמו options.network) שמותקן על ה-context
+    של page; NETWORK_PROFILE/BLOCK/DENY/ALLOW מה-env מתווספים עליו.
+    לאתרים גדולים: core.graph.crawler.crawl – אותם כללים עם N דפים במקביל.
     """
     base_origin = f"{urlparse(start_url).scheme}://{urlparse(start_url).netloc}"
     graph = PageGraph(base_origin)
+    install_network_profile(page.context, resolve_profile(merge_env_network(network)))
 
     # תור BFS: (url, depth)
     q = deque([(start_url, 0)])
@@ -136,11 +142,11 @@ def build_graph(page: Page, start_url: str, *, max_pages: int = 10, max_depth: i
 
 # --------- פונקציית עזר לשימוש חיצוני ---------
 def explore_and_save(page: Page, start_url: str, *, reports_dir: Path = Path("reports/ai"),
-                     max_pages: int = 10, max_depth: int = 2) -> Path:
+                     max_pages: int = 10, max_depth: int = 2, network: Any = None) -> Path:
     """
     מריץ build_graph ושומר JSON ב-reports/ai/site_graph.json.
     מחזיר את הנתיב לקובץ.
     """
-    graph = build_graph(page, start_url, max_pages=max_pages, max_depth=max_depth)
+    graph = build_graph(page, start_url, max_pages=max_pages, max_depth=max_depth, network=network)
     out = reports_dir / "site_graph.json"
     return save_graph(graph, out)
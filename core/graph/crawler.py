@@ -0,0 +1,246 @@
+# core/graph/crawler.py
+from __future__ import annotations
+import argparse, asyncio, time
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+from playwright.async_api import async_playwright
+
+from core.graph.graph import PageGraph, Node, Edge, save_graph
+from core.graph.builder import _strip_hash, _same_origin, _normalize, _node_id_from_url
+from core.perception import async_perceive
+from core.network import resolve_profile, merge_env_network, async_install_network_profile
+from core.aio.browser import launch_on, new_context_page, close_context
+
+# סורק BFS מקבילי: N דפים (או contexts) מושכים מ-frontier משותף עם dedup, כל אחד מנווט,
+# מריץ perceive ומחלץ קישורים בעצמו, והתוצאות נכנסות לאותו PageGraph. לולאת אירועים אחת
+# (playwright.async_api) – אין צורך ב-lock סביב הגרף, כי אין await באמצע עדכון.
+# לכל origin: semaphore (כמה ניווטים בו-זמנית) + מרווח מינימלי בין ניווטים (rps).
+
+LINKS_JS = """
+(limit) => {
+  const out = [];
+  for (const a of document.querySelectorAll('a[href]')) {
+    out.push([a.getAttribute('href') || '', (a.innerText || '').trim()]);
+    if (out.length >= limit) break;
+  }
+  return out;
+}
+"""
+
+
+class Frontier:
+    """
+    תור BFS משותף: כל URL נכנס פעם אחת (dedup לפי URL בלי #). max_pages סופר צמתים
+    שנוספו לגרף (+ מה שבתור/בעבודה) – לא ניסיונות: דף שנכשל מפנה את המקום שלו ל-URL הבא
+    שהמתין ב-_spill. get() מחזיר None כשהתור ריק ואין דף בעבודה שעוד עשוי להוסיף קישורים.
+    """
+    def __init__(self, start_url: str, *, max_pages: int, max_depth: int):
+        self.max_pages = max(1, int(max_pages))
+        self.max_depth = max(0, int(max_depth))
+        self.pages = 0
+        self._q: Deque[Tuple[str, int]] = deque()
+        self._spill: Deque[Tuple[str, int]] = deque()   # נמצאו כשהמכסה הייתה תפוסה
+        self._seen: Set[str] = set()
+        self._busy = 0
+        self._cond = asyncio.Condition()
+        self.add(start_url, 0)
+
+    def _room(self) -> bool:
+        return self.pages + self._busy + len(self._q) < self.max_pages
+
+    def add(self, url: str, depth: int) -> bool:
+        url = _strip_hash(url)
+        if url in self._seen or depth > self.max_depth:
+            return False
+        self._seen.add(url)
+        (self._q if self._room() and not self._spill else self._spill).append((url, depth))
+        return True
+
+    async def get(self) -> Optional[Tuple[str, int]]:
+        async with self._cond:
+            while not self._q and self._busy:
+                await self._cond.wait()
+            if not self._q:
+                return None
+            self._busy += 1
+            return self._q.popleft()
+
+    async def done(self, links: List[Tuple[str, int]], ok: bool = True) -> None:
+        """הדף שנלקח ב-get() הסתיים (ok – נוסף לגרף); links – (url, depth) להוספה."""
+        async with self._cond:
+            self._busy -= 1
+            self.pages += 1 if ok else 0
+            while self._spill and self._room():
+                self._q.append(self._spill.popleft())
+            for url, depth in links:
+                self.add(url, depth)
+            self._cond.notify_all()
+
+
+class OriginLimiter:
+    """לכל origin: עד concurrency ניווטים במקביל, ולא יותר מ-rps ניווטים לשנייה (0 = בלי הגבלה)."""
+    def __init__(self, concurrency: int = 4, rps: float = 0.0):
+        self.concurrency = max(1, int(concurrency))
+        self.interval = 1.0 / rps if rps and rps > 0 else 0.0
+        self._sems: Dict[str, asyncio.Semaphore] = {}
+        self._next: Dict[str, float] = {}
+
+    def _origin(self, url: str) -> str:
+        p = urlparse(url)
+        return f"{p.scheme}://{p.netloc}"
+
+    async def acquire(self, url: str) -> str:
+        origin = self._origin(url)
+        sem = self._sems.setdefault(origin, asyncio.Semaphore(self.concurrency))
+        await sem.acquire()
+        if self.interval:
+            # שומרים משבצת זמן לפני ה-await, כך שעובדים מקבילים מקבלים משבצות עוקבות
+            now = time.monotonic()
+            slot = max(now, self._next.get(origin, 0.0))
+            self._next[origin] = slot + self.interval
+            if slot > now:
+                try:
+                    await asyncio.sleep(slot - now)
+                except BaseException:   # ביטול באמצע ההמתנה – לא משאירים את ה-semaphore תפוס
+                    sem.release()
+                    raise
+        return origin
+
+    def release(self, origin: str) -> None:
+        self._sems[origin].release()
+
+
+def new_crawl_stats() -> Dict[str, Any]:
+    return {"pages": 0, "errors": 0, "edges": 0, "workers": 0, "elapsed_s": 0.0, "pages_per_s": 0.0}
+
+
+async def _visit(page, url: str, depth: int, *, base_origin: str, graph: PageGraph, frontier: Frontier,
+                 limiter: OriginLimiter, stats: Dict[str, Any], nav_timeout_ms: int, link_limit: int) -> None:
+    links: List[Tuple[str, int]] = []
+    ok = False
+    # done תמיד – גם בשגיאה וגם בביטול – אחרת get() של שאר העובדים ימתין לנצח
+    try:
+        try:
+            origin = await limiter.acquire(url)
+            try:
+                await page.goto(url, wait_until="domcontentloaded", timeout=nav_timeout_ms)
+            finally:
+                limiter.release(origin)
+            obs = await async_perceive(page)
+            raw = await page.evaluate(LINKS_JS, link_limit) if depth < frontier.max_depth else []
+        except Exception:
+            stats["errors"] += 1   # ניווט/דף שנכשל – מדלגים, כמו ב-build_graph
+            return
+
+        node_id = _node_id_from_url(url)
+        graph.add_node(Node(id=node_id, url=url, title=obs.title, snapshot=obs.model_dump()))
+        stats["pages"] += 1
+        ok = True
+        for href, label in raw:
+            absu = _normalize(base_origin, href)
+            if not absu or not _same_origin(base_origin, absu):
+                continue
+            graph.add_edge(Edge(src=node_id, dst=_node_id_from_url(absu), kind="link", label=(label or None)))
+            links.append((absu, depth + 1))
+    finally:
+        await frontier.done(links, ok)
+
+
+async def crawl(start_url: str, *, max_pages: int = 10, max_depth: int = 2, workers: int = 4,
+                per_origin: int = 4, rps: float = 0.0, isolate: bool = False,
+                browser=None, browser_name: str = "chromium", headful: bool = False,
+                network: Any = None, nav_timeout_ms: int = 20000,
+                link_limit: int = 80) -> Tuple[PageGraph, Dict[str, Any]]:
+    """
+    המקבילה המקבילית של build_graph: אותם כללים (אותו origin, max_depth, max_pages, אותם
+    מזהי צמתים), אבל workers דפים עובדים בו-זמנית. isolate=True – BrowserContext לכל worker
+    (בלי עוגיות משותפות); אחרת דפים באותו context. network – פרופיל חסימה (למשל "fast"),
+    ו-NETWORK_PROFILE/BLOCK/DENY/ALLOW מה-env מתווספים עליו.
+    מחזיר (graph, stats) עם pages_per_s.
+    """
+    base_origin = f"{urlparse(start_url).scheme}://{urlparse(start_url).netloc}"
+    graph = PageGraph(base_origin)
+    frontier = Frontier(start_url, max_pages=max_pages, max_depth=max_depth)
+    limiter = OriginLimiter(per_origin, rps)
+    stats = new_crawl_stats()
+    n = stats["workers"] = max(1, min(int(workers), int(max_pages)))
+    profile = resolve_profile(merge_env_network(network))
+
+    p = None
+    if browser is None:
+        p = await async_playwright().start()
+        browser = await launch_on(p, browser_name, headful)
+    contexts = []
+    started = time.monotonic()
+    try:
+        pages = []
+        for i in range(n):
+            if isolate or not contexts:
+                ctx, page = await new_context_page(browser)
+                await async_install_network_profile(ctx, profile)
+                contexts.append(ctx)
+            else:
+                page = await contexts[0].new_page()
+            pages.append(page)
+
+        async def _worker(page) -> None:
+            while True:
+                item = await frontier.get()
+                if item is None:
+                    return
+                await _visit(page, *item, base_origin=base_origin, graph=graph, frontier=frontier,
+                             limiter=limiter, stats=stats, nav_timeout_ms=nav_timeout_ms, link_limit=link_limit)
+
+        await asyncio.gather(*(_worker(pg) for pg in pages))
+    finally:
+        for ctx in contexts:
+            await close_context(ctx)
+        if p is not None:
+            try:
+                await browser.close()
+            finally:
+                await p.stop()
+
+    stats["elapsed_s"] = round(time.monotonic() - started, 2)
+    stats["pages_per_s"] = round(stats["pages"] / max(stats["elapsed_s"], 0.001), 2)
+    stats["edges"] = len(graph.edges)
+    return graph, stats
+
+
+def crawl_and_save(start_url: str, *, reports_dir: Path = Path("reports/ai"), **kw) -> Tuple[Path, Dict[str, Any]]:
+    """עטיפת sync: מריץ crawl ושומר ב-reports/ai/site_graph.json (כמו explore_and_save)."""
+    graph, stats = asyncio.run(crawl(start_url, **kw))
+    return save_graph(graph, reports_dir / "site_graph.json"), stats
+
+
+def build_argparser():
+    ap = argparse.ArgumentParser(description="Concurrent BFS site crawler -> reports/ai/site_graph.json")
+    ap.add_argument("url")
+    ap.add_argument("--max-pages", type=int, default=50)
+    ap.add_argument("--max-depth", type=int, default=2)
+    ap.add_argument("--workers", type=int, default=4, help="pages crawling in parallel")
+    ap.add_argument("--per-origin", type=int, default=4, help="max concurrent navigations per origin")
+    ap.add_argument("--rps", type=float, default=0.0, help="max navigations per second per origin (0 = unlimited)")
+    ap.add_argument("--isolate", action="store_true", help="one BrowserContext per worker")
+    ap.add_argument("--network", default=None, help="network profile, e.g. 'fast'")
+    ap.add_argument("--browser", default="chromium")
+    ap.add_argument("--headful", action="store_true")
+    ap.add_argument("--reports-dir", default="reports/ai")
+    return ap
+
+
+def main():
+    args = build_argparser().parse_args()
+    out, stats = crawl_and_save(args.url, reports_dir=Path(args.reports_dir), max_pages=args.max_pages,
+                                max_depth=args.max_depth, workers=args.workers, per_origin=args.per_origin,
+                                rps=args.rps, isolate=args.isolate, network=args.network,
+                                browser_name=args.browser, headful=args.headful)
+    print(f"[crawl] {stats['pages']} pages ({stats['errors']} failed), {stats['edges']} edges "
+          f"in {stats['elapsed_s']}s – {stats['pages_per_s']} pages/s with {stats['workers']} workers -> {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -33,6 +33,7 @@ class PageGraph:
         self.base_url = base_url.rstrip("/")
         self.nodes: Dict[str, Node] = {}
         self.edges: List[Edge] = []
+        self._edge_keys: set = set()   # מניעת כפילויות ב-O(1) – בסריקה גדולה יש עשרות אלפי קשתות
         self.created_at = int(time.time())
 
     def add_node(self, node: Node) -> None:
@@ -41,9 +42,10 @@ class PageGraph:
 
     def add_edge(self, edge: Edge) -> None:
         # הימנע מכפילויות בסיסיות
-        for e in self.edges:
-            if e.src == edge.src and e.dst == edge.dst and e.kind == edge.kind and e.label == edge.label:
-                return
+        key = (edge.src, edge.dst, edge.kind, edge.label)
+        if key in self._edge_keys:
+            return
+        self._edge_keys.add(key)
         self.edges.append(edge)
 
     def has_node(self, node_id: str) -> bool:
@@ -0,0 +1,87 @@
+# core/har.py
+from __future__ import annotations
+import re
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# network_mode:
+#   live    – רשת אמיתית (ברירת מחדל)
+#   record  – רשת אמיתית + שמירת כל התעבורה ל-HAR (נכתב בסגירת ה-context)
+#   replay  – תשובות מוגשות מה-HAR (routeFromHAR), בלי גישה לשרת
+NETWORK_MODES = ("live", "record", "replay")
+NOT_FOUND_MODES = ("abort", "fallback")
+HAR_ROOT = Path("reports")
+
+
+def slug(name: str) -> str:
+    """שם בטוח לקובץ/תיקייה (גם לשמות trace של טסטים ב-controller)."""
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", str(name or "scenario")).strip("_") or "scenario"
+
+
+def default_har_path(name: str, browser: str) -> Path:
+    """reports/<name>/network_<browser>.har – קבוע בין ריצות, כך ש-replay מוצא את מה ש-record שמר."""
+    return HAR_ROOT / slug(name) / f"network_{(browser or 'chromium').lower()}.har"
+
+
+def resolve_har(options: Dict[str, Any], name: str) -> Optional[Dict[str, Any]]:
+    """
+    מנרמל את הגדרות ה-HAR מתוך options (או None במצב live):
+      network_mode: record | replay | live
+      har_path: reports/login/network.har   # אופציונלי
+      har_not_found: abort | fallback        # replay: בקשה שלא ב-HAR – לחסום או לשלוח לרשת
+      har_url: "**/api/**"                   # אופציונלי – להקליט/להגיש רק URL-ים תואמים
+    """
+    mode = str(options.get("network_mode") or "live").lower()
+    if mode not in NETWORK_MODES:
+        raise ValueError(f"network_mode must be one of {NETWORK_MODES}, got {mode!r}")
+    if mode == "live":
+        return None
+    not_found = str(options.get("har_not_found") or "abort").lower()
+    if not_found not in NOT_FOUND_MODES:
+        raise ValueError(f"har_not_found must be one of {NOT_FOUND_MODES}, got {not_found!r}")
+    path = Path(options["har_path"]) if options.get("har_path") else \
+        default_har_path(name, options.get("browser", "chromium"))
+    if mode == "replay" and not path.is_file():
+        raise FileNotFoundError(f"network_mode=replay but HAR not found: {path} (run once with network_mode=record)")
+    return {"mode": mode, "path": path, "not_found": not_found, "url": options.get("har_url") or None}
+
+
+def login_har(har: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    ה-HAR של context הלוגין (use_auth): קובץ נפרד לצד ה-HAR של הריצה (<name>.login.har),
+    כי record כותב את הקובץ בסגירת ה-context וה-context הראשי היה דורס אותו.
+    """
+    if not har:
+        return None
+    path = har["path"].with_name(har["path"].stem + ".login.har")
+    if har["mode"] == "replay" and not path.is_file():
+        raise FileNotFoundError(f"network_mode=replay but login HAR not found: {path} "
+                                f"(run once with network_mode=record and a fresh use_auth login)")
+    return {**har, "path": path}
+
+
+def har_context_options(har: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """אפשרויות new_context להקלטה (record בלבד); גוף התשובות נשמר בתוך ה-HAR."""
+    if not har or har["mode"] != "record":
+        return {}
+    har["path"].parent.mkdir(parents=True, exist_ok=True)
+    opts = {"record_har_path": str(har["path"]), "record_har_content": "embed"}
+    if har.get("url"):
+        opts["record_har_url_filter"] = har["url"]
+    return opts
+
+
+def install_har_replay(ctx, har: Optional[Dict[str, Any]]) -> None:
+    """
+    replay: מגיש תשובות מה-HAR. נרשם אחרי פרופיל החסימה (core.network), ולכן גובר עליו;
+    עם not_found=fallback בקשה שלא הוקלטה ממשיכה ל-route הקודם/לרשת.
+    """
+    if not har or har["mode"] != "replay":
+        return
+    ctx.route_from_har(str(har["path"]), not_found=har["not_found"], url=har.get("url"))
+
+
+async def async_install_har_replay(ctx, har: Optional[Dict[str, Any]]) -> None:
+    if not har or har["mode"] != "replay":
+        return
+    await ctx.route_from_har(str(har["path"]), not_found=har["not_found"], url=har.get("url"))
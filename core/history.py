@@ -0,0 +1,325 @@
+# core/history.py
+from __future__ import annotations
+import argparse, os, sqlite3, time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+# היסטוריית ריצות מצטברת (report_summary נדרס בכל ריצה – כאן שום דבר לא נמחק).
+# כל ריצה נקלטת מה-results.jsonl שלה בסוף finalize_run. RPA_HISTORY=0 מכבה.
+DEFAULT_DB = Path(os.environ.get("RPA_HISTORY_DB", "reports/history.sqlite3"))
+
+# טסט "מתנדנד" (flaky) בריצה: עבר, אבל לפחות צעד אחד נזקק ל-retry.
+# אחרי QUARANTINE_AFTER ריצות כאלה מתוך QUARANTINE_WINDOW האחרונות – נכנס להסגר,
+# ויוצא ממנו אחרי QUARANTINE_RELEASE ריצות רצופות נקיות (עבר בלי retry).
+QUARANTINE_AFTER = int(os.environ.get("RPA_QUARANTINE_AFTER", 3))
+QUARANTINE_WINDOW = int(os.environ.get("RPA_QUARANTINE_WINDOW", 20))
+QUARANTINE_RELEASE = int(os.environ.get("RPA_QUARANTINE_RELEASE", 5))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id          INTEGER PRIMARY KEY,
+    scenario    TEXT NOT NULL,
+    browser     TEXT,
+    base_url    TEXT,
+    started     REAL,
+    duration    REAL,
+    status      TEXT,
+    error       TEXT,
+    reports_dir TEXT
+);
+CREATE TABLE IF NOT EXISTS tests (
+    id       INTEGER PRIMARY KEY,
+    run_id   INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    scenario TEXT NOT NULL,
+    name     TEXT NOT NULL,
+    started  REAL,
+    duration REAL,
+    status   TEXT,
+    retries  INTEGER DEFAULT 0,
+    flaky    INTEGER DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS steps (
+    id          INTEGER PRIMARY KEY,
+    run_id      INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    test_id     INTEGER REFERENCES tests(id) ON DELETE CASCADE,
+    idx         INTEGER,
+    type        TEXT,
+    selector    TEXT,
+    started     REAL,
+    duration    REAL,
+    status      TEXT,
+    attempts    INTEGER,
+    error_class TEXT,
+    error       TEXT
+);
+CREATE TABLE IF NOT EXISTS quarantine (
+    scenario   TEXT NOT NULL,
+    test       TEXT NOT NULL,
+    since      REAL,
+    flaky_runs INTEGER,
+    PRIMARY KEY (scenario, test)
+);
+-- שחרור אחרון מההסגר: ריצות מתנדנדות עד run_id הזה כבר לא נספרות לכניסה חוזרת
+CREATE TABLE IF NOT EXISTS quarantine_released (
+    scenario TEXT NOT NULL,
+    test     TEXT NOT NULL,
+    run_id   INTEGER,
+    PRIMARY KEY (scenario, test)
+);
+CREATE INDEX IF NOT EXISTS ix_runs_scenario ON runs(scenario, started);
+CREATE INDEX IF NOT EXISTS ix_tests_name    ON tests(scenario, name, run_id);
+CREATE INDEX IF NOT EXISTS ix_steps_run     ON steps(run_id);
+CREATE INDEX IF NOT EXISTS ix_steps_sel     ON steps(selector);
+CREATE INDEX IF NOT EXISTS ix_steps_dur     ON steps(duration);
+"""
+
+
+def connect(db: Optional[Path] = None) -> sqlite3.Connection:
+    db = Path(db or DEFAULT_DB)
+    db.parent.mkdir(parents=True, exist_ok=True)
+    # batch/process-pool כותבים במקביל – WAL + timeout במקום נעילה משלנו
+    conn = sqlite3.connect(str(db), timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def enabled() -> bool:
+    return os.environ.get("RPA_HISTORY", "1") != "0"
+
+
+# ---------- קליטה ----------
+
+def ingest_log(log_path: Path, reports_dir: Optional[Path] = None, *, db: Optional[Path] = None) -> int:
+    """
+    קולט results.jsonl אחד (גם חלקי) ל-DB. צעדים משויכים לטסט הפתוח (test_start/test_end);
+    ריצה בלי אירועי test נחשבת טסט יחיד בשם התרחיש. מחזיר את run_id.
+    """
+    from core.reporting import scan_meta, iter_events
+
+    log_path = Path(log_path)
+    meta = scan_meta(log_path)
+    scenario = str(meta["name"])
+    conn = connect(db)
+    try:
+        with conn:
+            run_id = conn.execute(
+                "INSERT INTO runs(scenario, browser, base_url, started, duration, status, error, reports_dir)"
+                " VALUES (?,?,?,?,?,?,?,?)",
+                (scenario, meta["browser"], meta["base_url"], meta["started"], meta["duration"],
+                 meta["status"], meta["error"], str(reports_dir or log_path.parent)),
+            ).lastrowid
+
+            tests: Dict[str, Dict[str, Any]] = {}
+            current: Optional[str] = None
+            pending: Dict[Any, Dict[str, Any]] = {}
+
+            def _test(name: str, started: Optional[float]) -> Dict[str, Any]:
+                if name not in tests:
+                    tid = conn.execute("INSERT INTO tests(run_id, scenario, name, started) VALUES (?,?,?,?)",
+                                       (run_id, scenario, name, started)).lastrowid
+                    tests[name] = {"id": tid, "started": started, "retries": 0, "failed": False}
+                return tests[name]
+
+            def _step(rec: Dict[str, Any]) -> None:
+                t = _test(rec.get("_test") or scenario, rec.get("started"))
+                attempts = int(rec.get("attempts") or 0)
+                if attempts > 1:
+                    t["retries"] += attempts - 1
+                if rec.get("status") in ("failed", "interrupted"):
+                    t["failed"] = True
+                dur = (rec.get("ended") or rec.get("started") or 0) - (rec.get("started") or 0)
+                conn.execute(
+                    "INSERT INTO steps(run_id, test_id, idx, type, selector, started, duration, status,"
+                    " attempts, error_class, error) VALUES (?,?,?,?,?,?,?,?,?,?,?)",
+                    (run_id, t["id"], rec.get("index"), rec.get("type"), rec.get("selector"), rec.get("started"),
+                     dur, rec.get("status"), attempts, rec.get("error_class"), rec.get("error")),
+                )
+
+            last_ts = None
+            for e in iter_events(log_path):
+                ev, last_ts = e.get("ev"), e.get("ts")
+                if ev == "test_start":
+                    current = e.get("name")
+                    _test(current, e.get("ts"))
+                elif ev == "test_end":
+                    t = _test(e.get("name"), e.get("ts"))
+                    t["status"] = e.get("status")
+                    t["ended"] = e.get("ts")
+                    current = None
+                elif ev == "step_start":
+                    pending[e.get("index")] = dict(e, _test=current)
+                elif ev == "step_end":
+                    rec = pending.pop(e.get("index"), {"_test": current})
+                    rec.update(e)
+                    _step(rec)
+            for rec in pending.values():
+                rec.update(ended=last_ts, status="interrupted")
+                _step(rec)
+
+            if not tests:
+                _test(scenario, meta["started"])
+            for name, t in tests.items():
+                status = t.get("status") or ("failed" if t["failed"] else
+                                             ("passed" if meta["status"] == "passed" else meta["status"]))
+                ended = t.get("ended") or last_ts or t["started"]
+                flaky = int(status == "passed" and t["retries"] > 0)
+                conn.execute("UPDATE tests SET status=?, duration=?, retries=?, flaky=? WHERE id=?",
+                             (status, (ended or 0) - (t["started"] or 0), t["retries"], flaky, t["id"]))
+            _update_quarantine(conn, scenario, list(tests))
+        return run_id
+    finally:
+        conn.close()
+
+
+def _update_quarantine(conn: sqlite3.Connection, scenario: str, names: Iterable[str]) -> None:
+    for name in names:
+        recent = conn.execute(
+            "SELECT run_id, status, flaky FROM tests WHERE scenario=? AND name=? ORDER BY run_id DESC LIMIT ?",
+            (scenario, name, max(QUARANTINE_WINDOW, QUARANTINE_RELEASE)),
+        ).fetchall()
+        if not recent:
+            continue
+        row = conn.execute("SELECT run_id FROM quarantine_released WHERE scenario=? AND test=?",
+                           (scenario, name)).fetchone()
+        released = row[0] if row else 0
+        # רק ריצות אחרי השחרור האחרון – אחרת ריצה מתנדנדת אחת מחזירה מיד להסגר
+        flaky_runs = sum(fl or 0 for rid, _, fl in recent[:QUARANTINE_WINDOW] if rid > released)
+        clean = recent[:QUARANTINE_RELEASE]
+        if len(clean) >= QUARANTINE_RELEASE and all(st == "passed" and not fl for _, st, fl in clean):
+            cur = conn.execute("DELETE FROM quarantine WHERE scenario=? AND test=?", (scenario, name))
+            if cur.rowcount:
+                conn.execute(
+                    "INSERT INTO quarantine_released(scenario, test, run_id) VALUES (?,?,?)"
+                    " ON CONFLICT(scenario, test) DO UPDATE SET run_id=excluded.run_id",
+                    (scenario, name, recent[0][0]),
+                )
+        elif flaky_runs >= QUARANTINE_AFTER:
+            conn.execute(
+                "INSERT INTO quarantine(scenario, test, since, flaky_runs) VALUES (?,?,?,?)"
+                " ON CONFLICT(scenario, test) DO UPDATE SET flaky_runs=excluded.flaky_runs",
+                (scenario, name, time.time(), flaky_runs),
+            )
+        else:
+            # עדיין בהסגר (אם היה) – רק מעדכנים את הספירה
+            conn.execute("UPDATE quarantine SET flaky_runs=? WHERE scenario=? AND test=?",
+                         (flaky_runs, scenario, name))
+
+
+def record_run(log_path: Path, reports_dir: Optional[Path] = None) -> Optional[int]:
+    """נקרא מ-finalize_run; כשל בהיסטוריה לא מפיל את הריצה."""
+    if not enabled():
+        return None
+    try:
+        return ingest_log(log_path, reports_dir)
+    except Exception as e:
+        print(f"[history] failed to record run: {e}")
+        return None
+
+
+# ---------- שאילתות ----------
+
+def _percentile(sorted_vals: Sequence[float], q: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    k = (len(sorted_vals) - 1) * q
+    lo, hi = int(k), min(int(k) + 1, len(sorted_vals) - 1)
+    return sorted_vals[lo] + (sorted_vals[hi] - sorted_vals[lo]) * (k - lo)
+
+
+def slowest_steps(conn: sqlite3.Connection, limit: int = 20, scenario: Optional[str] = None) -> List[Dict[str, Any]]:
+    sql = ("SELECT r.scenario, s.type, s.selector, COUNT(*) AS n, AVG(s.duration) AS avg_s, MAX(s.duration) AS max_s"
+           " FROM steps s JOIN runs r ON r.id = s.run_id"
+           + (" WHERE r.scenario = ?" if scenario else "") +
+           " GROUP BY r.scenario, s.type, s.selector ORDER BY avg_s DESC LIMIT ?")
+    args = ((scenario,) if scenario else ()) + (limit,)
+    cols = ("scenario", "type", "selector", "n", "avg_s", "max_s")
+    return [dict(zip(cols, row)) for row in conn.execute(sql, args)]
+
+
+def scenario_durations(conn: sqlite3.Connection, scenario: Optional[str] = None) -> List[Dict[str, Any]]:
+    """p50/p95 של משך ריצה לכל תרחיש (SQLite בלי percentile – מחשבים בפייתון)."""
+    sql = "SELECT scenario, duration FROM runs WHERE duration IS NOT NULL" + (" AND scenario = ?" if scenario else "")
+    by: Dict[str, List[float]] = {}
+    for name, dur in conn.execute(sql, (scenario,) if scenario else ()):
+        by.setdefault(name, []).append(float(dur))
+    out = []
+    for name, vals in sorted(by.items()):
+        vals.sort()
+        out.append({"scenario": name, "runs": len(vals), "p50_s": _percentile(vals, 0.5),
+                    "p95_s": _percentile(vals, 0.95), "max_s": vals[-1]})
+    return out
+
+
+def flaky_selectors(conn: sqlite3.Connection, limit: int = 20, min_runs: int = 3) -> List[Dict[str, Any]]:
+    """
+    שיעור flakiness לכל selector: צעדים שעברו רק אחרי retry, או נכשלו בשגיאה חולפת,
+    מתוך כל הביצועים של ה-selector.
+    """
+    sql = ("SELECT selector, COUNT(*) AS n,"
+           " SUM(CASE WHEN (status = 'passed' AND attempts > 1)"
+           "           OR (status != 'passed' AND error_class = 'transient') THEN 1 ELSE 0 END) AS flaky"
+           " FROM steps WHERE selector IS NOT NULL AND selector != ''"
+           " GROUP BY selector HAVING n >= ? ORDER BY CAST(flaky AS REAL) / n DESC, n DESC LIMIT ?")
+    return [{"selector": sel, "n": n, "flaky": fl, "rate": (fl / n if n else 0.0)}
+            for sel, n, fl in conn.execute(sql, (min_runs, limit)) if fl]
+
+
+def quarantined(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+    cols = ("scenario", "test", "since", "flaky_runs")
+    return [dict(zip(cols, row)) for row in
+            conn.execute("SELECT scenario, test, since, flaky_runs FROM quarantine ORDER BY since DESC")]
+
+
+# ---------- CLI ----------
+
+def _print_rows(rows: List[Dict[str, Any]]) -> None:
+    if not rows:
+        print("(no data)")
+        return
+    for r in rows:
+        print("  " + "  ".join(f"{k}={v:.3f}" if isinstance(v, float) else f"{k}={v}" for k, v in r.items()))
+
+
+def build_argparser():
+    ap = argparse.ArgumentParser(description="Query the RPA run history (SQLite)")
+    ap.add_argument("--db", type=Path, default=DEFAULT_DB)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("slowest-steps", help="Slowest steps by average duration")
+    p.add_argument("--limit", type=int, default=20)
+    p.add_argument("--scenario", default=None)
+    p = sub.add_parser("durations", help="p50/p95 run duration per scenario")
+    p.add_argument("--scenario", default=None)
+    p = sub.add_parser("flaky-selectors", help="Flakiness rate per selector")
+    p.add_argument("--limit", type=int, default=20)
+    p.add_argument("--min-runs", type=int, default=3)
+    sub.add_parser("quarantined", help=f"Tests auto-quarantined after {QUARANTINE_AFTER} flaky runs "
+                                       f"(released after {QUARANTINE_RELEASE} clean runs in a row)")
+    p = sub.add_parser("ingest", help="Import results.jsonl log(s) into the history")
+    p.add_argument("logs", nargs="+", type=Path)
+    return ap
+
+
+def main():
+    args = build_argparser().parse_args()
+    if args.cmd == "ingest":
+        for log in args.logs:
+            print(f"{log} -> run_id={ingest_log(log, db=args.db)}")
+        return
+    conn = connect(args.db)
+    try:
+        if args.cmd == "slowest-steps":
+            rows = slowest_steps(conn, args.limit, args.scenario)
+        elif args.cmd == "durations":
+            rows = scenario_durations(conn, args.scenario)
+        elif args.cmd == "flaky-selectors":
+            rows = flaky_selectors(conn, args.limit, args.min_runs)
+        else:
+            rows = quarantined(conn)
+    finally:
+        conn.close()
+    _print_rows(rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# core/loader.py
+from __future__ import annotations
+import hashlib, json, os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.exceptions import IncludeNotFoundError, IncludeCycleError
+from core.schema import validate_scenario
+from utils.yaml_io import read_yaml
+
+# מטמון על הדיסק לתרחישים מאומתים ושטוחים (include כבר פתור)
+CACHE_DIR = Path(os.environ.get("RPA_CACHE_DIR", ".rpa_cache")) / "scenarios"
+CACHE_VERSION = 2
+
+# מטמון בזיכרון – לטעינות חוזרות באותו תהליך (batch, include שחוזר על עצמו)
+_MEMO: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+
+
+def _stat_sig(path: Path) -> List[Any]:
+    st = path.stat()
+    return [str(path), st.st_mtime_ns, st.st_size]
+
+
+def _deps_fresh(deps: List[List[Any]]) -> bool:
+    try:
+        return all(_stat_sig(Path(d[0])) == d for d in deps)
+    except OSError:
+        return False
+
+
+def _cache_file(path: Path) -> Path:
+    return CACHE_DIR / (hashlib.sha1(str(path).encode("utf-8")).hexdigest() + ".json")
+
+
+def _flatten(steps: List[Dict[str, Any]], base_url: Optional[str], stack: List[Path],
+             deps: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """
+    פותח include-ים רקורסיבית לרשימת צעדים אחת.
+    base_url של תת-תרחיש נשמר על כל צעד שלו ב-'_base_url' (כמו sub.get("base_url", base_url) בזמן ריצה).
+    """
+    out: List[Dict[str, Any]] = []
+    for st in steps:
+        if "include" not in st:
+            if base_url is not None and "_base_url" not in st:
+                st = dict(st); st["_base_url"] = base_url
+            out.append(st)
+            continue
+        include = st["include"]
+        include_files = include if isinstance(include, list) else [include]
+        for inc in include_files:
+            inc_path = Path(str(inc))
+            key = inc_path.resolve()
+            if key in stack:
+                chain = " -> ".join(str(p) for p in stack + [key])
+                raise IncludeCycleError(f"Include cycle detected: {chain}")
+            if not inc_path.is_file():
+                raise IncludeNotFoundError(f"Include file not found: {inc}")
+            deps.setdefault(str(key), _stat_sig(key))
+            sub = read_yaml(inc_path)
+            validate_scenario(sub)
+            sub_base = sub.get("base_url", base_url)
+            out += _flatten(sub["steps"], sub_base, stack + [key], deps)
+    return out
+
+
+def _compile(path: Path) -> Tuple[Dict[str, Any], List[List[Any]]]:
+    deps: Dict[str, List[Any]] = {str(path): _stat_sig(path)}
+    scenario = read_yaml(path)
+    validate_scenario(scenario)
+    flat = dict(scenario)
+    flat["steps"] = _flatten(scenario["steps"], None, [path], deps)
+    return flat, list(deps.values())
+
+
+def load_scenario(path: Path, *, use_cache: bool = True) -> Dict[str, Any]:
+    """
+    טוען תרחיש YAML, מאמת אותו ופותח את כל ה-include מראש (כולל זיהוי מעגלים).
+    התוצאה נשמרת במטמון (זיכרון + דיסק) לפי נתיב + mtime/גודל של כל קבצי התלות,
+    כך שתרחיש שלא השתנה נטען בלי פירוק YAML ובלי אימות מחדש.
+    """
+    path = Path(path).resolve()
+    if not path.is_file():
+        raise IncludeNotFoundError(f"Scenario file not found: {path}")
+    use_cache = use_cache and os.environ.get("RPA_NO_CACHE") != "1"
+
+    if use_cache:
+        memo = _MEMO.get(str(path))
+        if memo and _deps_fresh(json.loads(memo[0])):
+            return memo[1]
+
+        cf = _cache_file(path)
+        try:
+            entry = json.loads(cf.read_text(encoding="utf-8"))
+            # הרשומה שייכת לקובץ הזה (ולא רק ל-hash של שם הקובץ) ולגרסת המטמון הנוכחית
+            if entry.get("v") == CACHE_VERSION and entry.get("path") == str(path) \
+                    and _deps_fresh(entry["deps"]):
+                _MEMO[str(path)] = (json.dumps(entry["deps"]), entry["scenario"])
+                return entry["scenario"]
+        except Exception:
+            pass
+
+    flat, deps = _compile(path)
+
+    if use_cache:
+        _MEMO[str(path)] = (json.dumps(deps), flat)
+        try:
+            cf = _cache_file(path)
+            cf.parent.mkdir(parents=True, exist_ok=True)
+            entry = {"v": CACHE_VERSION, "path": str(path), "deps": deps, "scenario": flat}
+            tmp = cf.with_suffix(".tmp")
+            tmp.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+            tmp.replace(cf)
+        except Exception:
+            pass
+    return flat
@@ -0,0 +1,281 @@
+# core/network.py
+from __future__ import annotations
+import fnmatch, os, re, time, weakref
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, FrozenSet, Optional, Sequence, Tuple
+
+# סוגי משאבים של Playwright (request.resource_type)
+RESOURCE_TYPES = {
+    "document", "stylesheet", "image", "media", "font", "script", "texttrack",
+    "xhr", "fetch", "eventsource", "websocket", "manifest", "other",
+}
+
+# דומיינים נפוצים של analytics/פרסום – נחסמים ב-block_analytics
+ANALYTICS_GLOBS = (
+    "*google-analytics.com/*", "*googletagmanager.com/*", "*doubleclick.net/*",
+    "*googlesyndication.com/*", "*facebook.net/*", "*connect.facebook.com/*",
+    "*hotjar.com/*", "*segment.io/*", "*segment.com/*", "*mixpanel.com/*",
+    "*clarity.ms/*", "*newrelic.com/*", "*nr-data.net/*", "*sentry.io/*",
+)
+
+PROFILES: Dict[str, Dict[str, Any]] = {
+    "none":    {},
+    "fast":    {"block": ["image", "font", "media"], "block_analytics": True},
+    "minimal": {"block": ["image", "font", "media", "stylesheet"], "block_analytics": True},
+}
+
+# אי אפשר לדעת כמה בתים בקשה חסומה הייתה מורידה – הערכה שמרנית לפי סוג, לדוח בלבד
+_EST_BYTES = {"image": 30_000, "font": 40_000, "media": 500_000, "stylesheet": 20_000,
+              "script": 25_000}
+_EST_DEFAULT = 5_000
+
+
+def _globs_to_re(globs: Sequence[str]) -> Optional[re.Pattern]:
+    globs = [g for g in (globs or []) if g]
+    if not globs:
+        return None
+    return re.compile("|".join(fnmatch.translate(g) for g in globs), re.I)
+
+
+def _as_list(v) -> Tuple[str, ...]:
+    if not v:
+        return ()
+    if isinstance(v, str):
+        return tuple(x.strip() for x in v.split(",") if x.strip())
+    return tuple(str(x).strip() for x in v if str(x).strip())
+
+
+@dataclass(frozen=True)
+class NetworkProfile:
+    block_types: FrozenSet[str] = frozenset()
+    deny: Tuple[str, ...] = ()
+    allow: Tuple[str, ...] = ()
+    deny_re: Optional[re.Pattern] = field(default=None, compare=False)
+    allow_re: Optional[re.Pattern] = field(default=None, compare=False)
+
+    def verdict(self, url: str, resource_type: str, is_navigation: bool) -> bool:
+        """True = לחסום. ניווט של מסמך ראשי ו-allow גוברים תמיד."""
+        if is_navigation:
+            return False
+        if self.allow_re is not None and self.allow_re.match(url):
+            return False
+        if resource_type in self.block_types:
+            return True
+        return self.deny_re is not None and bool(self.deny_re.match(url))
+
+
+def resolve_profile(cfg: Any) -> Optional[NetworkProfile]:
+    """
+    options.network יכול להיות שם פרופיל ("fast") או dict:
+      network:
+        profile: fast              # בסיס (אופציונלי)
+        block: [image, font, media]
+        deny: ["*://*.ads.example/*"]
+        allow: ["*://cdn.example.com/logo.png"]
+        block_analytics: true
+    מחזיר None אם אין מה לחסום (ואז לא מתקינים route בכלל).
+    """
+    if not cfg:
+        return None
+    if isinstance(cfg, str):
+        cfg = {"profile": cfg}
+    base = dict(PROFILES.get(str(cfg.get("profile") or "none").lower(), {}))
+    block = set(_as_list(base.get("block"))) | set(_as_list(cfg.get("block")))
+    unknown = block - RESOURCE_TYPES
+    if unknown:
+        raise ValueError(f"network.block: unknown resource types {sorted(unknown)}")
+    deny = list(_as_list(base.get("deny"))) + list(_as_list(cfg.get("deny")))
+    if cfg.get("block_analytics", base.get("block_analytics")):
+        deny += list(ANALYTICS_GLOBS)
+    allow = _as_list(cfg.get("allow"))
+    if not block and not deny:
+        return None
+    return NetworkProfile(frozenset(block), tuple(deny), allow, _globs_to_re(deny), _globs_to_re(allow))
+
+
+def merge_env_network(network: Any, env=os.environ) -> Any:
+    """
+    options.network + דגלי CLI/env (NETWORK_PROFILE / NETWORK_BLOCK / NETWORK_DENY / NETWORK_ALLOW)
+    שמתווספים עליו – ערך מוכן ל-resolve_profile. משותף ל-load_options, ל-controller ולסורקים.
+    """
+    network = network or None
+    env_net = {k: env.get(f"NETWORK_{k.upper()}") for k in ("profile", "block", "deny", "allow")}
+    if any(env_net.values()):
+        network = {"profile": network} if isinstance(network, str) else dict(network or {})
+        if env_net["profile"]:
+            network["profile"] = env_net["profile"]
+        for k in ("block", "deny", "allow"):
+            if env_net[k]:
+                cur = network.get(k) or []
+                cur = [cur] if isinstance(cur, str) else list(cur)
+                network[k] = cur + [x.strip() for x in env_net[k].split(",") if x.strip()]
+    return network
+
+
+def new_stats() -> Dict[str, Any]:
+    return {"blocked": 0, "by_type": {}, "bytes_saved_est": 0}
+
+
+def _count(stats: Dict[str, Any], resource_type: str) -> None:
+    stats["blocked"] += 1
+    stats["by_type"][resource_type] = stats["by_type"].get(resource_type, 0) + 1
+    stats["bytes_saved_est"] += _EST_BYTES.get(resource_type, _EST_DEFAULT)
+
+
+def _is_navigation(req) -> bool:
+    try:
+        return req.is_navigation_request() and req.frame == req.frame.page.main_frame
+    except Exception:
+        return req.resource_type == "document"
+
+
+def install_network_profile(ctx, profile: Optional[NetworkProfile]) -> Optional[Dict[str, Any]]:
+    """מתקין route על ה-BrowserContext (כל הדפים שלו). מחזיר dict סטטיסטיקה שמתעדכן חי."""
+    if profile is None:
+        return None
+    stats = new_stats()
+
+    def _handler(route, request):
+        rt = request.resource_type
+        if profile.verdict(request.url, rt, _is_navigation(request)):
+            _count(stats, rt)
+            route.abort("blockedbyclient")
+        else:
+            route.continue_()
+
+    ctx.route("**/*", _handler)
+    return stats
+
+
+async def async_install_network_profile(ctx, profile: Optional[NetworkProfile]) -> Optional[Dict[str, Any]]:
+    if profile is None:
+        return None
+    stats = new_stats()
+
+    async def _handler(route, request):
+        rt = request.resource_type
+        if profile.verdict(request.url, rt, _is_navigation(request)):
+            _count(stats, rt)
+            await route.abort("blockedbyclient")
+        else:
+            await route.continue_()
+
+    await ctx.route("**/*", _handler)
+    return stats
+
+
+# ---------- מעקב בקשות (לצעדי wait_for_response / wait_for_network_idle) ----------
+
+def url_matcher(pattern: str):
+    """
+    "re:<regex>" = חיפוש regex; עם * או ? = glob על ה-URL המלא (** חוצה '/', * לא);
+    אחרת = מחרוזת שמוכלת ב-URL.
+    """
+    p = str(pattern or "").strip()
+    if p.startswith("re:"):
+        rx = re.compile(p[3:])
+        return lambda url: rx.search(url) is not None
+    if "*" in p or "?" in p:
+        out, i = [], 0
+        while i < len(p):
+            if p.startswith("**", i):
+                out.append(".*"); i += 2
+            elif p[i] == "*":
+                out.append("[^/]*"); i += 1
+            elif p[i] == "?":
+                out.append("."); i += 1
+            else:
+                out.append(re.escape(p[i])); i += 1
+        rx = re.compile("^" + "".join(out) + "$")
+        return lambda url: rx.match(url) is not None
+    return lambda url: p in url
+
+
+def status_matcher(spec: Any):
+    """None = כל סטטוס; 200 / "2xx" / "200-299" / "200,201"."""
+    if spec is None or str(spec).strip() in ("", "*", "any"):
+        return lambda s: True
+    parts = [x.strip().lower() for x in str(spec).split(",") if x.strip()]
+
+    def one(part):
+        if part.endswith("xx") and part[:-2].isdigit():
+            return lambda s: s // 100 == int(part[:-2])
+        if "-" in part:
+            lo, hi = (int(x) for x in part.split("-", 1))
+            return lambda s: lo <= s <= hi
+        return lambda s: s == int(part)
+    fns = [one(x) for x in parts]
+    return lambda s: any(f(s) for f in fns)
+
+
+class RequestTracker:
+    """
+    סופר בקשות פתוחות ב-context ושומר חלון של התגובות האחרונות. ה-callbacks סינכרוניים,
+    ולכן אותו tracker משרת גם את ה-runner הסינכרוני וגם את ה-aio.
+    תגובה שכבר "נצרכה" ע"י wait_for_response לא תספק המתנה נוספת, וגם לא תגובה שהגיעה
+    לפני הצעד הקודם (mark_step בתחילת כל צעד) – רק מה שהצעד הקודם או הנוכחי עוררו.
+    """
+    def __init__(self, keep: int = 500):
+        self.inflight: Dict[int, str] = {}
+        self.last_activity = time.monotonic()
+        self.responses: Deque[Dict[str, Any]] = deque(maxlen=keep)
+        self._seq = 0
+        self._mark = 0     # seq בתחילת הצעד הנוכחי
+        self._since = 0    # seq בתחילת הצעד הקודם – תגובות ישנות ממנו לא נחשבות
+
+    def mark_step(self) -> None:
+        self._since, self._mark = self._mark, self._seq
+
+    def _on_request(self, req) -> None:
+        self.inflight[id(req)] = req.url
+        self.last_activity = time.monotonic()
+
+    def _on_done(self, req) -> None:
+        self.inflight.pop(id(req), None)
+        self.last_activity = time.monotonic()
+
+    def _on_response(self, resp) -> None:
+        self._seq += 1
+        self.responses.append({"seq": self._seq, "url": resp.url, "status": resp.status,
+                               "method": resp.request.method, "consumed": False})
+        self.last_activity = time.monotonic()
+
+    def take_response(self, url_ok, status_ok) -> Optional[Dict[str, Any]]:
+        for r in self.responses:
+            if r["seq"] > self._since and not r["consumed"] and url_ok(r["url"]) and status_ok(r["status"]):
+                r["consumed"] = True
+                return r
+        return None
+
+    def idle_for(self, max_inflight: int = 0) -> float:
+        """כמה שניות הרשת שקטה (0 אם יש יותר מ-max_inflight בקשות פתוחות)."""
+        if len(self.inflight) > max_inflight:
+            return 0.0
+        return time.monotonic() - self.last_activity
+
+
+_TRACKERS: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def track_requests(ctx) -> RequestTracker:
+    """מתקין (פעם אחת) tracker על ה-BrowserContext – כדאי מיד בפתיחה, כדי לא לפספס תגובות."""
+    tr = _TRACKERS.get(ctx)
+    if tr is None:
+        tr = _TRACKERS[ctx] = RequestTracker()
+        ctx.on("request", tr._on_request)
+        ctx.on("requestfinished", tr._on_done)
+        ctx.on("requestfailed", tr._on_done)
+        ctx.on("response", tr._on_response)
+    return tr
+
+
+def tracker_for(page) -> RequestTracker:
+    return track_requests(page.context)
+
+
+def mark_step(page) -> None:
+    """תחילת צעד: מזיז את חלון התגובות של wait_for_response (רק אם יש tracker על ה-context)."""
+    tr = _TRACKERS.get(page.context)
+    if tr is not None:
+        tr.mark_step()
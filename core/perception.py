@@ -1,9 +1,396 @@
 # core/perception.py
 from __future__ import annotations
-from typing import List, Dict, Any
+import argparse, time, weakref
+from typing import List, Dict, Any, Optional
 from playwright.sync_api import Page
 from agents.schemas import Observation, ElementMini
 
+# תמונת מצב של הדף ב-page.evaluate אחד: כפתורים, שדות, דגלים, טקסטים ורמזי selector
+# חוזרים כ-payload מובנה אחד, וה-Observation נבנה כאן בלי IPC לכל אלמנט.
+# (המימוש הישן – loc.nth(i) + 5–7 get_attribute לכל אלמנט – נשמר ל-benchmark בלבד.)
+#
+# אינקרמנטלי: בקריאה הראשונה מוזרק MutationObserver (window.__rpaPerception) שסופר
+# "דור" ושומר את תתי-העצים שהשתנו. בקריאה הבאה: אותו דור = ה-Observation מהמטמון;
+# אחרת נסרקים רק האזורים המלוכלכים – querySelectorAll בתוכם בלבד מול רשימת האלמנטים
+# השמורה, ו-innerText/באנרים רק לילדי body שמכילים אותם. אלמנט שלא השתנה מגיע כמזהה
+# בלבד (pid) וממוזג כאן מול ה-Observation הקודם. מסמך חדש (ניווט) = סריקה מלאה.
+MAX_BUTTONS = 80
+MAX_INPUTS = 100
+MAX_TEXTS = 80
+MAX_DIRTY_ROOTS = 50   # יותר מזה – זול יותר לסרוק הכול
+MAX_DIRTY = 500        # תקרת אזורים מלוכלכים שנאספים בין קריאות; מעבר לזה – סריקה מלאה
+
+PERCEIVE_JS = r"""
+([maxButtons, maxInputs, maxTexts, maxRoots, known, maxDirty, track]) => {
+  const norm = (s) => (s || '').replace(/\s+/g, ' ').trim();
+  const attr = (el, a) => el.getAttribute(a);
+  const hint = (el) => {
+    const id = attr(el, 'id'), name = attr(el, 'name'), tid = attr(el, 'data-testid');
+    if (id) return '#' + id;
+    if (name) return "[name='" + name + "']";
+    if (tid) return "[data-testid='" + tid + "']";
+    return null;
+  };
+  const mini = (el, role, text) => ({
+    role, text: text ? norm(text).slice(0, 300) || null : null,
+    id: attr(el, 'id'), name: attr(el, 'name'), aria_label: attr(el, 'aria-label'),
+    data_testid: attr(el, 'data-testid'), selector_hint: hint(el),
+  });
+  const visible = (el) => {
+    const r = el.getBoundingClientRect();
+    if (!r.width || !r.height) return false;
+    const cs = getComputedStyle(el);
+    return cs.visibility !== 'hidden' && cs.display !== 'none';
+  };
+
+  let st = window.__rpaPerception;
+  if (!st) {
+    st = window.__rpaPerception = {doc: Math.random().toString(36).slice(2), gen: 1, dirty: [],
+                                   ids: new WeakMap(), next: 1, lists: {}, parts: new WeakMap()};
+    const add = (t) => { if (st.dirty.length < st.cap) st.dirty.push(t); else st.overflow = true; };
+    st.mo = new MutationObserver((ms) => {
+      let hit = false;
+      for (const m of ms) {
+        // סימוני data-rpa-* של הפעולות עצמן (resolver/intent) אינם שינוי בדף
+        if (m.type === 'attributes' && (m.attributeName || '').startsWith('data-rpa-')) continue;
+        const t = m.target.nodeType === 1 ? m.target : m.target.parentElement;
+        if (!t) continue;
+        hit = true;
+        // תקרה: דף "רועש" לא מנפח את הרשימה (והסינון הריבועי למטה) – מסמנים סריקה מלאה
+        if (t === document.body && m.type === 'childList') {
+          // ילד שנוסף ישירות ל-body (למשל modal) – רק הוא מלוכלך, לא כל הדף;
+          // ילד שהוסר פשוט לא יופיע בסריקה הבאה
+          for (const n of m.addedNodes) {
+            if (n.nodeType === 1) add(n); else if (n.nodeType === 3) add(t);
+          }
+        } else add(t);
+      }
+      if (hit) st.gen++;
+    });
+    st.mo.observe(document.documentElement, {subtree: true, childList: true, attributes: true, characterData: true});
+  }
+  st.cap = maxDirty;
+  // track=false (סריקה חד-פעמית, בלי מטמון): לא נוגעים במצב שהמטמון של perceive תלוי בו –
+  // לא מרוקנים את dirty, לא מקצים מזהים ולא משתמשים ברשימות/טקסטים השמורים
+  if (track) {
+    const fresh = !known || known.doc !== st.doc;
+    if (!fresh && known.gen === st.gen) return {doc: st.doc, gen: st.gen, same: true};
+  }
+
+  // אזורים מלוכלכים: רק השורשים (בלי צאצאים של שורש אחר), ורק מה שעדיין במסמך
+  let roots = null;
+  if (track && known && known.doc === st.doc && !st.overflow) {
+    const ds = Array.from(new Set(st.dirty)).filter(n => n.isConnected);
+    roots = ds.filter(n => !ds.some(o => o !== n && o.contains(n)));
+    if (roots.length > maxRoots) roots = null;
+  }
+  if (track) { st.dirty = []; st.overflow = false; }
+
+  // ---- אלמנטים: רשימה שמורה לכל role בסדר המסמך. אינקרמנטלי = querySelectorAll רק בתוך
+  // שורש מלוכלך (+ אבות תואמים שלו, שה-innerText שלהם אולי השתנה); השאר נשארים כמו שהם ----
+  let tmp = 1;
+  const idOf = (el) => {
+    if (!track) return tmp++;
+    let id = st.ids.get(el);
+    if (id === undefined) { id = st.next++; st.ids.set(el, id); }
+    return id;
+  };
+  const before = (a, b) => a === b || !!(a.compareDocumentPosition(b) & Node.DOCUMENT_POSITION_FOLLOWING);
+  const scoped = (key, sel, max) => {
+    // null = אי אפשר להשלים מהרשימה השמורה – סורקים את כל הדף
+    const prev = st.lists[key];
+    if (!prev) return null;
+    const found = new Set();
+    for (const r of roots) {
+      if (r.matches(sel)) found.add(r);
+      for (const el of r.querySelectorAll(sel)) found.add(el);
+      for (let a = r.parentElement && r.parentElement.closest(sel); a; a = a.parentElement && a.parentElement.closest(sel)) {
+        found.add(a);
+      }
+    }
+    const all = new Set(prev.els.filter(el => el.isConnected && !roots.some(r => r.contains(el))));
+    found.forEach(el => all.add(el));
+    let els = Array.from(all).sort((a, b) => (a === b ? 0 : before(a, b) ? -1 : 1));
+    if (prev.truncated) {
+      // מעבר למגבלה יש אלמנטים שלא נסרקו – תקף רק עד האחרון שהיה ברשימה
+      const last = prev.els[prev.els.length - 1];
+      if (!last.isConnected) return null;
+      els = els.filter(el => before(el, last));
+      if (els.length < max) return null;
+    }
+    return {els: els.slice(0, max), truncated: prev.truncated || els.length > max, found};
+  };
+  const collect = (key, sel, max, role, textOf) => {
+    const upserts = {};
+    let list = roots === null ? null : scoped(key, sel, max);
+    if (list === null) {
+      const nodes = document.querySelectorAll(sel);
+      list = {els: Array.from(nodes).slice(0, max), truncated: nodes.length > max, found: null};
+    }
+    const order = list.els.map((el) => {
+      const seen = track && st.ids.has(el), id = idOf(el);
+      if (!seen || !list.found || list.found.has(el)) upserts[id] = mini(el, role, textOf(el));
+      return id;
+    });
+    if (track) st.lists[key] = {els: list.els, truncated: list.truncated};
+    return {order, upserts};
+  };
+  const buttons = collect('buttons', 'button, [role=button], input[type=submit], a', maxButtons, 'button',
+                          el => el.innerText || el.value);
+  const inputs = collect('inputs', 'input, textarea, [role=textbox], select', maxInputs, 'input',
+                         el => attr(el, 'placeholder') || attr(el, 'aria-label') || attr(el, 'name')
+                               || attr(el, 'id') || attr(el, 'type'));
+
+  // ---- טקסטים ובאנרים: לכל ילד של body בנפרד (innerText / TreeWalker שלו), שמורים ב-parts;
+  // מחושב מחדש רק ילד שמכיל שורש מלוכלך. שורש שהוא body עצמו (או html) – הכול מחדש ----
+  const body = document.body;
+  let parts = track ? st.parts : new WeakMap();
+  if (track) {
+    if (roots === null) parts = st.parts = new WeakMap();
+    else for (const r of roots) {
+      if (!body || r === body || r.contains(body)) { parts = st.parts = new WeakMap(); break; }
+      let c = r;
+      while (c.parentElement && c.parentElement !== body) c = c.parentElement;
+      parts.delete(c);
+    }
+  }
+  const partOf = (n) => { let p = parts.get(n); if (!p) { p = {}; parts.set(n, p); } return p; };
+  const skipText = (n) => /^(SCRIPT|STYLE|NOSCRIPT|TEMPLATE)$/.test(n.parentElement && n.parentElement.tagName);
+
+  // באנר שגיאה/הצלחה: צומת הטקסט הראשון שמתאים (כמו text=/.../i), והטקסט של ההורה שלו
+  const bannerIn = (root, re) => {
+    const w = document.createTreeWalker(root, NodeFilter.SHOW_TEXT, {
+      acceptNode: (n) => skipText(n) ? NodeFilter.FILTER_REJECT : NodeFilter.FILTER_ACCEPT,
+    });
+    for (let n = w.nextNode(); n; n = w.nextNode()) {
+      if (re.test(n.nodeValue)) return norm(n.parentElement.innerText || n.nodeValue).slice(0, 300);
+    }
+    return null;
+  };
+  const banner = (key, re) => {
+    if (!body) return null;
+    for (const n of body.childNodes) {
+      if (n.nodeType === 3) {
+        if (re.test(n.nodeValue)) return norm(body.innerText || n.nodeValue).slice(0, 300);
+        continue;
+      }
+      if (n.nodeType !== 1) continue;
+      const p = partOf(n);
+      if (p[key] === undefined) p[key] = bannerIn(n, re);
+      if (p[key] !== null) return p[key];
+    }
+    return null;
+  };
+  const flags = {
+    modal_open: Array.from(document.querySelectorAll('[role=dialog], .modal')).some(visible),
+    has_password: !!document.querySelector("input[type='password']"),
+    has_form: !!document.querySelector('form'),
+    error_banner: banner('err', /error|invalid|failed|wrong|שגיאה|נכשל/i),
+    success_banner: banner('ok', /success|welcome|הצלחה|בוצע|נשמר|נשלח/i),
+  };
+
+  // שורות טקסט גלויות: innerText לכל ילד של body (ילד מוסתר – כלום; שורות כמו ב-body.innerText
+  // פרט לילדים inline סמוכים, שנספרים כשורות נפרדות)
+  const linesOf = (n) => {
+    if (n.nodeType === 3) return [n.nodeValue];
+    const p = partOf(n);
+    if (!p.lines) p.lines = getComputedStyle(n).display === 'none' ? [] : (n.innerText || '').split('\n');
+    return p.lines;
+  };
+  const texts = [];
+  if (body) outer: for (const n of body.childNodes) {
+    if (n.nodeType !== 1 && n.nodeType !== 3) continue;
+    for (const line of linesOf(n)) {
+      const t = norm(line);
+      if (t.length >= 3 && t.length <= 150) texts.push(t);
+      if (texts.length >= maxTexts) break outer;
+    }
+  }
+  return {doc: st.doc, gen: st.gen, same: false, full: roots === null, dirty_roots: roots ? roots.length : null,
+          title: document.title, buttons, inputs, flags, visible_texts: texts};
+}
+"""
+
+
+class _PerceptionCache:
+    """המצב בצד Python לדף אחד: pid → ElementMini, והתצפית האחרונה."""
+    def __init__(self):
+        self.doc: Optional[str] = None
+        self.gen = 0
+        self.buttons: Dict[int, ElementMini] = {}
+        self.inputs: Dict[int, ElementMini] = {}
+        self.obs: Optional[Observation] = None
+        self.delta: Dict[str, Any] = {}
+        self.stats = {"cached": 0, "incremental": 0, "full": 0}
+
+    def merge(self, res: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        ממזג payload (מלא או חלקי) ומחזיר את שדות ה-Observation. None = ה-payload מפנה
+        ל-pid שאין כאן (אלמנט שיצא מהמגבלה וחזר בלי שינוי) – צריך סריקה מלאה.
+        """
+        if res.get("full") or res.get("doc") != self.doc:
+            self.buttons, self.inputs = {}, {}
+        out = {}
+        missing = False
+        for key, table in (("buttons", self.buttons), ("inputs", self.inputs)):
+            part = res.get(key) or {}
+            for pid, m in (part.get("upserts") or {}).items():
+                table[int(pid)] = ElementMini(**m)
+            order = [int(pid) for pid in part.get("order") or []]
+            missing = missing or any(pid not in table for pid in order)
+            live = set(order)
+            for pid in [p for p in table if p not in live]:
+                del table[pid]   # הוסר מה-DOM / יצא מהמגבלה
+            out[key] = [table[pid] for pid in order if pid in table]
+        self.doc, self.gen = res.get("doc"), res.get("gen", 0)
+        return None if missing else out
+
+
+_CACHES: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _args(known: Optional[Dict[str, Any]], track: bool) -> List[Any]:
+    return [MAX_BUTTONS, MAX_INPUTS, MAX_TEXTS, MAX_DIRTY_ROOTS, known, MAX_DIRTY, track]
+
+
+def _evaluate(page: Page, known: Optional[Dict[str, Any]], track: bool = True) -> Dict[str, Any]:
+    try:
+        return page.evaluate(PERCEIVE_JS, _args(known, track))
+    except Exception:
+        # ניווט באמצע – מנסים פעם נוספת אחרי שהמסמך החדש נטען (ואז זו סריקה מלאה)
+        try:
+            page.wait_for_load_state("domcontentloaded", timeout=3000)
+            return page.evaluate(PERCEIVE_JS, _args(None, track))
+        except Exception:
+            return {}
+
+
+def perceive(page: Page,
+             history: List[Dict[str, Any]] | None = None,
+             memory: Dict[str, Any] | None = None,
+             *, incremental: bool = True) -> Observation:
+    """
+    קורא את הדף הנוכחי ומחזיר תיאור תמציתי (Observation) – evaluate אחד לכל הדף.
+    incremental=True: בלי שינוי מאז הקריאה הקודמת – מהמטמון; עם שינוי – רק האזורים שהשתנו.
+    השינוי מול התצפית הקודמת זמין ב-last_delta(page).
+    """
+    cache = _CACHES.get(page) if incremental else None
+    if cache is None:
+        cache = _PerceptionCache()
+        if incremental:
+            _CACHES[page] = cache
+    known = {"doc": cache.doc, "gen": cache.gen} if cache.obs is not None else None
+    res = _evaluate(page, known, incremental)
+    prev = cache.obs
+
+    if res.get("same") and prev is not None:
+        cache.stats["cached"] += 1
+        url, memory, history = page.url, memory or {}, history or []
+        # prev כמו שהוא רק אם גם history/memory זהים – אחרת תצפית חדשה עם הנוכחיים
+        same = url == prev.url and prev.memory == memory and prev.history == history
+        obs = prev if same else Observation(**{**_fields(prev), "url": url, "memory": memory, "history": history})
+    else:
+        parts = cache.merge(res)
+        if parts is None:
+            res = _evaluate(page, None, incremental)
+            parts = cache.merge(res) or {"buttons": [], "inputs": []}
+        cache.stats["full" if res.get("full", True) else "incremental"] += 1
+        obs = Observation(
+            url=page.url,
+            title=res.get("title"),
+            visible_texts=res.get("visible_texts") or [],
+            buttons=parts["buttons"],
+            inputs=parts["inputs"],
+            flags=res.get("flags") or {},
+            memory=memory or {},
+            history=history or [],
+        )
+    cache.delta = observation_delta(prev, obs)
+    cache.obs = obs
+    return obs
+
+
+async def async_perceive(page,
+                         history: List[Dict[str, Any]] | None = None,
+                         memory: Dict[str, Any] | None = None) -> Observation:
+    """המקבילה האסינכרונית של perceive – תמיד סריקה מלאה (evaluate אחד), בלי מטמון."""
+    args = _args(None, False)
+    try:
+        res = await page.evaluate(PERCEIVE_JS, args)
+    except Exception:
+        try:
+            await page.wait_for_load_state("domcontentloaded", timeout=3000)
+            res = await page.evaluate(PERCEIVE_JS, args)
+        except Exception:
+            res = {}
+    parts = _PerceptionCache().merge(res) or {"buttons": [], "inputs": []}
+    return Observation(
+        url=page.url,
+        title=res.get("title"),
+        visible_texts=res.get("visible_texts") or [],
+        buttons=parts["buttons"],
+        inputs=parts["inputs"],
+        flags=res.get("flags") or {},
+        memory=memory or {},
+        history=history or [],
+    )
+
+
+def last_delta(page: Page) -> Dict[str, Any]:
+    """השינוי שחושב ב-perceive האחרון על הדף ({} = לא השתנה כלום)."""
+    cache = _CACHES.get(page)
+    return cache.delta if cache else {}
+
+
+def _fields(obs: Observation) -> Dict[str, Any]:
+    return {"url": obs.url, "title": obs.title, "visible_texts": obs.visible_texts,
+            "buttons": obs.buttons, "inputs": obs.inputs, "flags": obs.flags}
+
+
+def _key(e: ElementMini):
+    return (e.role, e.selector_hint, e.text, e.id, e.name, e.aria_label)
+
+
+def _mini_dict(e: ElementMini) -> Dict[str, Any]:
+    return {k: v for k, v in (("text", e.text), ("selector_hint", e.selector_hint),
+                              ("id", e.id), ("name", e.name), ("aria_label", e.aria_label)) if v}
+
+
+def observation_delta(prev: Optional[Observation], cur: Observation) -> Dict[str, Any]:
+    """
+    מה השתנה בין שתי תצפיות – רק מפתחות שיש בהם שינוי ({} = זהות). זול (השוואת קבוצות),
+    ומתאים לפרומפט של LLM במקום ה-Observation המלא. prev=None → {"initial": True}.
+    """
+    if prev is None:
+        return {"initial": True}
+    d: Dict[str, Any] = {}
+    if cur.url != prev.url:
+        d["url"] = cur.url
+    if cur.title != prev.title:
+        d["title"] = cur.title
+    flags = {k: v for k, v in cur.flags.items() if prev.flags.get(k) != v}
+    if flags:
+        d["flags"] = flags
+    for name in ("buttons", "inputs"):
+        before = {_key(e): e for e in getattr(prev, name)}
+        after = {_key(e): e for e in getattr(cur, name)}
+        added = [_mini_dict(after[k]) for k in after if k not in before]
+        removed = [_mini_dict(before[k]) for k in before if k not in after]
+        if added:
+            d[f"{name}_added"] = added
+        if removed:
+            d[f"{name}_removed"] = removed
+    texts_before, texts_after = set(prev.visible_texts), set(cur.visible_texts)
+    added_t = [t for t in cur.visible_texts if t not in texts_before]
+    removed_t = [t for t in prev.visible_texts if t not in texts_after]
+    if added_t:
+        d["texts_added"] = added_t
+    if removed_t:
+        d["texts_removed"] = removed_t
+    return d
+
+
+# ----------------------------- baseline (legacy) -----------------------------
 
 def _safe_text(s: str) -> str:
     """ניקוי טקסטים מיותרים, רווחים, תווים נסתרים."""
@@ -77,10 +464,10 @@ def _build_selector_hint(el) -> str | None:
     return None
 
 
-def perceive(page: Page,
-             history: List[Dict[str, Any]] | None = None,
-             memory: Dict[str, Any] | None = None) -> Observation:
-    """קורא את הדף הנוכחי ומחזיר תיאור תמציתי (Observation)"""
+def _perceive_per_element(page: Page,
+                           history: List[Dict[str, Any]] | None = None,
+                           memory: Dict[str, Any] | None = None) -> Observation:
+    """המימוש הקודם (אלמנט-אלמנט, מאות round trips) – נשמר רק כ-baseline ל---bench."""
     url = page.url
     try:
         title = page.title()
@@ -144,3 +531,74 @@ def perceive(page: Page,
         memory=memory or {},
         history=history or []
     )
+
+
+# ----------------------------- benchmark -----------------------------
+
+# שינוי קטן אחד לפני כל מדידת dirty: div בסוף body שהטקסט שלו מתחלף
+_BENCH_MUTATE_JS = """() => {
+  let el = document.getElementById('__rpa_bench');
+  if (!el) { el = document.createElement('div'); el.id = '__rpa_bench'; document.body.appendChild(el); }
+  el.textContent = 'bench ' + Date.now();
+}"""
+
+def bench(urls: List[str], *, runs: int = 3, browser_name: str = "chromium",
+          network: Any = None) -> List[Dict[str, Any]]:
+    """
+    משווה, לכל דף, את המימוש הישן מול perceive מלא (evaluate אחד, incremental=False),
+    מול perceive אינקרמנטלי על דף שלא השתנה (מהמטמון) ועל דף עם שינוי קטן אחד (dirty –
+    סריקה של האזור המלוכלך בלבד). מחזיר ms ממוצעים ויחס.
+    network – פרופיל חסימה לטעינת הדפים (כמו options.network; env מתווסף עליו).
+    """
+    from core.browser import launch_browser, new_context_page, close_browser
+    from core.network import resolve_profile, merge_env_network, install_network_profile
+    p, browser = launch_browser(browser_name, False)
+    ctx, page = new_context_page(browser)
+    install_network_profile(ctx, resolve_profile(merge_env_network(network)))
+    rows = []
+    try:
+        for url in urls:
+            page.goto(url, wait_until="load")
+            t = {}
+            for label, fn, prep in (("legacy", _perceive_per_element, None),
+                                    ("single", lambda pg: perceive(pg, incremental=False), None),
+                                    ("cached", perceive, None),
+                                    ("dirty", perceive, _BENCH_MUTATE_JS)):
+                fn(page)  # חימום
+                total = 0.0
+                for _ in range(runs):
+                    if prep:
+                        page.evaluate(prep)   # שינוי קטן בדף – לא נמדד
+                    start = time.perf_counter()
+                    obs = fn(page)
+                    total += time.perf_counter() - start
+                t[label] = total * 1000 / runs
+                t[label + "_elems"] = len(obs.buttons) + len(obs.inputs)
+            rows.append({"url": url, "legacy_ms": round(t["legacy"], 1), "single_ms": round(t["single"], 1),
+                         "cached_ms": round(t["cached"], 1), "dirty_ms": round(t["dirty"], 1),
+                         "speedup": round(t["legacy"] / max(t["single"], 0.001), 1),
+                         "elements": t["single_elems"], "legacy_elements": t["legacy_elems"]})
+    finally:
+        close_browser(p, browser, ctx)
+    return rows
+
+
+def build_argparser():
+    ap = argparse.ArgumentParser(description="Benchmark perceive(): per-element calls vs single evaluate vs incremental cache")
+    ap.add_argument("urls", nargs="+")
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--browser", default="chromium")
+    ap.add_argument("--network", default=None, help="network profile, e.g. 'fast'")
+    return ap
+
+
+def main():
+    args = build_argparser().parse_args()
+    for r in bench(args.urls, runs=args.runs, browser_name=args.browser, network=args.network):
+        print(f"{r['url']}\n  legacy {r['legacy_ms']:>8.1f} ms   single {r['single_ms']:>7.1f} ms   "
+              f"cached {r['cached_ms']:>6.1f} ms   dirty {r['dirty_ms']:>6.1f} ms   x{r['speedup']}   "
+              f"({r['elements']} elements, legacy saw {r['legacy_elements']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# core/plan.py
+from __future__ import annotations
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from core.template import compile_template, render_template, Template
+from core.loader import load_scenario
+from core.retry import backoff_delay_ms
+
+
+def parse_seconds(v: Any, default: float = 0.5) -> float:
+    """משך זמן בשניות: 2 / "2" / "1.5s" (שניות), "500ms" (מילישניות); לא תקין → default."""
+    if isinstance(v, (int, float)): return float(v)
+    s = str(v).strip().lower()
+    scale = 1.0
+    if s.endswith("ms"):
+        s, scale = s[:-2], 0.001
+    elif s.endswith("s"):
+        s = s[:-1]
+    try:
+        return float(s.strip()) * scale
+    except Exception:
+        return default
+
+
+def _parse_wait_value(v: Any) -> float:
+    return parse_seconds(v, 0.5)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_retry: int = 0
+    delay_ms: int = 500          # השהיה בסיסית לניסיון הראשון
+    backoff: float = 2.0         # מכפיל אקספוננציאלי בין ניסיונות
+    max_delay_ms: int = 5000     # תקרת השהיה לניסיון בודד
+
+    def delay_for(self, attempt: int) -> float:
+        return backoff_delay_ms(attempt, self.delay_ms, self.backoff, self.max_delay_ms)
+
+
+@dataclass(frozen=True)
+class CompiledStep:
+    """
+    צעד מקומפל ובלתי ניתן לשינוי: כל מה שאפשר לחשב לפני הריצה כבר מחושב,
+    והלולאה של ה-runner רק מבצעת.
+    """
+    type: str
+    selector: Optional[str]
+    value: Any                       # ערך גולמי או Template מפוצל מראש
+    action: Optional[Callable]       # None = סוג לא מוכר (נכשל בזמן ריצה, כמו קודם)
+    wait_s: Optional[float]          # ל-type=wait עם ערך קבוע – מפורק מראש
+    retry: RetryPolicy
+    continue_on_fail: bool
+    base_url: Optional[str]          # base_url של include (None = של התרחיש)
+    raw: Mapping[str, Any]
+
+    def render_value(self, variables: Mapping[str, Any]) -> Any:
+        # wait מקבל ערך טיפוסי (מספר) כשהוא הפניה יחידה כמו "${DELAY}"
+        return render_template(self.value, variables, typed=(self.type == "wait"))
+
+    def wait_seconds(self, value: Any) -> float:
+        return self.wait_s if self.wait_s is not None else _parse_wait_value(value)
+
+
+Plan = Tuple[CompiledStep, ...]
+
+
+def compile_step(step: Dict[str, Any], registry: Mapping[str, Callable]) -> CompiledStep:
+    t = (step.get("type") or "").strip().lower()
+    value = compile_template(step.get("value"))
+    return CompiledStep(
+        type=t,
+        selector=step.get("selector"),
+        value=value,
+        action=registry.get(t),
+        wait_s=(_parse_wait_value(value) if t == "wait" and not isinstance(value, Template) else None),
+        retry=RetryPolicy(
+            int(step.get("retry", 0)),
+            int(step.get("retry_delay_ms", 500)),
+            float(step.get("retry_backoff", 2.0)),
+            int(step.get("retry_max_delay_ms", 5000)),
+        ),
+        continue_on_fail=bool(step.get("continue_on_fail", False)),
+        base_url=step.get("_base_url"),
+        raw=step,
+    )
+
+
+def compile_steps(steps: Sequence[Any], registry: Mapping[str, Callable],
+                  base_url: Optional[str] = None) -> Plan:
+    """
+    ממיר רשימת צעדים (dict) לתוכנית הרצה. include נפתח כאן (דרך load_scenario, עם מטמון),
+    כך שבזמן ריצה אין יותר קריאת קבצים. צעדים שכבר מקומפלים עוברים כמו שהם.
+    """
+    out: List[CompiledStep] = []
+    for st in steps:
+        if isinstance(st, CompiledStep):
+            out.append(st)
+            continue
+        if "include" in st:
+            include = st["include"]
+            for inc in (include if isinstance(include, list) else [include]):
+                sub = load_scenario(Path(inc))
+                sub_base = sub.get("base_url", st.get("_base_url", base_url))
+                out += compile_steps(sub["steps"], registry, sub_base)
+            continue
+        cs = compile_step(st, registry)
+        if cs.base_url is None and base_url is not None:
+            cs = replace(cs, base_url=base_url)
+        out.append(cs)
+    return tuple(out)
+
+
+def _source(v: Any) -> Any:
+    if isinstance(v, dict):
+        return {k: _source(x) for k, x in v.items()}
+    if isinstance(v, list):
+        return [_source(x) for x in v]
+    return v.source if isinstance(v, Template) else v
+
+
+def format_plan(plan: Plan) -> str:
+    """ייצוג טקסטואלי של התוכנית – ל---dry-run."""
+    lines = []
+    for i, cs in enumerate(plan, start=1):
+        action = "sleep" if cs.type == "wait" else (getattr(cs.action, "__name__", None) or "<UNKNOWN>")
+        val = _source(cs.value)
+        extra = []
+        if cs.wait_s is not None:
+            extra.append(f"wait={cs.wait_s:.3f}s")
+        if cs.retry.max_retry:
+            extra.append(f"retry={cs.retry.max_retry}x{cs.retry.delay_ms}ms")
+        if cs.continue_on_fail:
+            extra.append("continue_on_fail")
+        if cs.base_url:
+            extra.append(f"base_url={cs.base_url}")
+        lines.append(f"  [{i}] {cs.type:<18} -> {action:<26} sel={cs.selector!r} val={val!r}"
+                     + (("  " + " ".join(extra)) if extra else ""))
+    return "\n".join(lines)
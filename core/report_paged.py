@@ -0,0 +1,259 @@
+# core/report_paged.py
+from __future__ import annotations
+import hashlib, html, json, os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+# דוח לריצות גדולות: report_summary.html הוא עמוד אינדקס קטן, והצעדים נשמרים
+# ב-report_data/steps_NNNN.js (chunk לכל PAGE_SIZE צעדים). ה-chunks נטענים עם <script>
+# (עובד גם מ-file://, בניגוד ל-fetch), ורק כשצריך אותם לעמוד/לפילטר הנוכחי.
+PAGE_SIZE = int(os.environ.get("REPORT_PAGE_SIZE", 500))
+THUMB_WIDTH = 320
+DATA_DIR = "report_data"
+_IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg", ".gif", ".webp")
+
+
+def _thumbnail(src: Path, dest: Path, width: int = THUMB_WIDTH) -> bool:
+    """thumbnail אמיתי (Pillow, אופציונלי). בלי Pillow – הדוח מציג את המקור עם loading=lazy."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return False
+    try:
+        with Image.open(src) as im:
+            im.thumbnail((width, width * 4))
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            im.convert("RGB").save(dest, format="JPEG", quality=70)
+        return True
+    except Exception:
+        return False
+
+
+class PagedReport:
+    """מקבל צעדים אחד-אחד (מהמעבר הזורם על הלוג) וכותב chunk כל PAGE_SIZE צעדים."""
+
+    def __init__(self, reports_dir: Path, meta: Dict[str, Any], page_size: int = PAGE_SIZE):
+        self.reports_dir = Path(reports_dir)
+        self.data_dir = self.reports_dir / DATA_DIR
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        for old in self.data_dir.glob("steps_*.js"):
+            old.unlink()
+        self.meta = meta
+        self.page_size = max(1, int(page_size))
+        self._buf: List[Dict[str, Any]] = []
+        self._chunks: List[Dict[str, Any]] = []
+        self._totals: Dict[str, Dict[str, int]] = {"status": {}, "type": {}}
+        # thumbnails נוצרים ברקע בזמן שה-chunks נכתבים
+        self._thumbs = ThreadPoolExecutor(max_workers=2, thread_name_prefix="thumbs")
+        self._artifacts = [self._artifact(a) for a in meta.get("artifacts", [])]
+
+    def _rel(self, p: str) -> str:
+        try:
+            return os.path.relpath(os.path.abspath(p), os.path.abspath(self.reports_dir)).replace(os.sep, "/")
+        except ValueError:
+            return p
+
+    def _artifact(self, a: Dict[str, Any]) -> Dict[str, Any]:
+        src = str(a.get("path") or "")
+        out = {"type": a.get("type"), "path": self._rel(src), "thumb": None}
+        if src.lower().endswith(_IMAGE_SUFFIXES):
+            name = hashlib.sha1(src.encode("utf-8")).hexdigest()[:16] + ".jpg"
+            dest = self.data_dir / "thumbs" / name
+            out["thumb"] = out["path"]
+            out["_fut"] = (self._thumbs.submit(_thumbnail, Path(src), dest), f"{DATA_DIR}/thumbs/{name}")
+        return out
+
+    def add(self, s: Dict[str, Any], duration: float, detail: str = "") -> None:
+        """detail – שורת הפירוט של הצעד (_detail_line ב-core/reporting.py), כמו בדוח הרגיל."""
+        row = {"i": s.get("index"), "t": s.get("type"), "sel": s.get("selector"), "v": s.get("value"),
+               "d": round(duration, 3), "st": s.get("status"), "e": s.get("error"),
+               "a": s.get("attempts") or 0, "dt": detail or None}
+        self._buf.append(row)
+        if len(self._buf) >= self.page_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._buf:
+            return
+        n = len(self._chunks) + 1
+        name = f"steps_{n:04d}.js"
+        # ספירה משותפת סטטוס×סוג – כך שמספר השורות התואמות לכל פילטר ידוע בלי לטעון את ה-chunk
+        counts: Dict[str, Dict[str, int]] = {}
+        for r in self._buf:
+            st, t = str(r["st"]), str(r["t"])
+            by_type = counts.setdefault(st, {})
+            by_type[t] = by_type.get(t, 0) + 1
+            for key, val in (("status", st), ("type", t)):
+                self._totals[key][val] = self._totals[key].get(val, 0) + 1
+        with open(self.data_dir / name, "w", encoding="utf-8") as fh:
+            fh.write(f"window.__rpaChunk({n},")
+            json.dump(self._buf, fh, ensure_ascii=False, default=str)
+            fh.write(");\n")
+        self._chunks.append({"file": f"{DATA_DIR}/{name}", "n": len(self._buf), "counts": counts})
+        self._buf = []
+
+    def close(self) -> Path:
+        self._flush()
+        self._thumbs.shutdown(wait=True)
+        for a in self._artifacts:
+            fut = a.pop("_fut", None)
+            if fut and fut[0].result():
+                a["thumb"] = fut[1]
+        m = self.meta
+        manifest = {
+            "meta": {k: m.get(k) for k in ("name", "base_url", "browser", "headful", "status", "error", "duration")},
+            "network": m.get("network"),
+            "chunks": self._chunks,
+            "totals": self._totals,
+            "artifacts": self._artifacts,
+        }
+        with open(self.data_dir / "manifest.js", "w", encoding="utf-8") as fh:
+            fh.write("window.__rpaManifest = ")
+            json.dump(manifest, fh, ensure_ascii=False, default=str)
+            fh.write(";\n")
+        out = self.reports_dir / "report_summary.html"
+        out.write_text(_INDEX.replace("__TITLE__", html.escape(str(m.get("name")))).replace("__DATA__", DATA_DIR),
+                       encoding="utf-8")
+        return out
+
+
+_INDEX = r"""<!doctype html>
+<html lang="en"><head>
+<meta charset="utf-8"/>
+<title>RPA Report – __TITLE__</title>
+<style>
+ body{font-family:Arial,Helvetica,sans-serif;margin:24px}
+ table{border-collapse:collapse;width:100%}
+ th,td{border:1px solid #e5e7eb;padding:6px 8px;text-align:left;vertical-align:top}
+ th{background:#f3f4f6}
+ code{background:#f3f4f6;padding:1px 4px;border-radius:4px}
+ .meta div{margin-bottom:4px}
+ .badge{color:#fff;border-radius:8px;padding:2px 8px;font-size:12px}
+ .bar{display:flex;gap:12px;align-items:center;flex-wrap:wrap;margin:12px 0}
+ .arts{display:flex;flex-wrap:wrap;gap:12px}
+ .arts figure{margin:0;width:320px}
+ .arts img{max-width:320px;border:1px solid #ddd}
+</style>
+<script src="__DATA__/manifest.js"></script>
+</head><body>
+<h2>RPA Report – __TITLE__</h2>
+<div class="meta" id="meta"></div>
+<h3>Steps</h3>
+<div class="bar">
+  <span id="status-filters"></span>
+  <label>Type <select id="type-filter"><option value="">(all)</option></select></label>
+  <button id="prev">&laquo; Prev</button><span id="pageinfo"></span><button id="next">Next &raquo;</button>
+</div>
+<table>
+  <thead><tr><th>#</th><th>Type</th><th>Selector</th><th>Value</th><th>Time</th><th>Status</th><th>Error</th></tr></thead>
+  <tbody id="rows"><tr><td colspan="7">Loading…</td></tr></tbody>
+</table>
+<h3>Artifacts</h3>
+<div class="arts" id="arts"></div>
+<script>
+(function () {
+  var M = window.__rpaManifest, PAGE = 100, COLORS = {passed:"#16a34a", failed:"#dc2626",
+      "failed-continued":"#f59e0b", "soft-failed":"#f59e0b", running:"#2563eb", interrupted:"#6b7280", incomplete:"#6b7280"};
+  var cache = {}, waiting = {}, order = [], page = 0, gen = 0;
+  function esc(s) { return String(s == null ? "" : s).replace(/[&<>"']/g, function (c) {
+    return {"&":"&amp;","<":"&lt;",">":"&gt;",'"':"&quot;","'":"&#39;"}[c]; }); }
+  function badge(s) { return '<span class="badge" style="background:' + (COLORS[s] || "#6b7280") + '">' + esc(s) + "</span>"; }
+
+  // chunk נטען פעם אחת; שומרים רק את האחרונים בזיכרון
+  window.__rpaChunk = function (n, rows) {
+    cache[n] = rows; order.push(n);
+    while (order.length > 8) { delete cache[order.shift()]; }
+    (waiting[n] || []).forEach(function (cb) { cb(rows); }); delete waiting[n];
+  };
+  function load(n, cb) {
+    if (cache[n]) return cb(cache[n]);
+    if (waiting[n]) return waiting[n].push(cb);
+    waiting[n] = [cb];
+    var s = document.createElement("script"); s.src = M.chunks[n - 1].file; document.body.appendChild(s);
+  }
+
+  function selected() {
+    var st = {}; document.querySelectorAll("#status-filters input:checked").forEach(function (i) { st[i.value] = 1; });
+    return {status: st, type: document.getElementById("type-filter").value};
+  }
+  function chunkCount(c, f) {
+    // כמה שורות תואמות ב-chunk – מדויק, לפי ספירות סטטוס×סוג ב-manifest, בלי לטעון אותו
+    var s = 0;
+    for (var k in c.counts) {
+      if (!f.status[k]) continue;
+      if (f.type) { s += c.counts[k][f.type] || 0; continue; }
+      for (var t in c.counts[k]) s += c.counts[k][t];
+    }
+    return s;
+  }
+  function match(r, f) { return f.status[r.st] && (!f.type || r.t === f.type); }
+
+  function render() {
+    // דור לכל render – callback של chunk שנטען אחרי render חדש יותר לא מצייר
+    var my = ++gen, f = selected(), want = page * PAGE, out = [], ci = 0, skipped = 0;
+    var cands = M.chunks.map(function (c, i) { return {n: i + 1, max: chunkCount(c, f)}; })
+                        .filter(function (c) { return c.max > 0; });
+    var total = cands.reduce(function (a, c) { return a + c.max; }, 0);
+    var pages = Math.max(1, Math.ceil(total / PAGE));
+    if (page >= pages) { page = pages - 1; want = page * PAGE; }
+    document.getElementById("pageinfo").textContent = " page " + (page + 1) + " / " + pages + " ";
+    function next() {
+      if (my !== gen) return;
+      // הספירות מדויקות – מדלגים על chunks שלמים בלי לטעון אותם
+      while (out.length === 0 && ci < cands.length && skipped + cands[ci].max <= want) {
+        skipped += cands[ci++].max;
+      }
+      if (out.length >= PAGE || ci >= cands.length) return paint(out);
+      load(cands[ci++].n, function (rows) {
+        for (var i = 0; i < rows.length && out.length < PAGE; i++) {
+          if (!match(rows[i], f)) continue;
+          if (skipped < want) { skipped++; continue; }
+          out.push(rows[i]);
+        }
+        next();
+      });
+    }
+    next();
+  }
+  function paint(rows) {
+    document.getElementById("rows").innerHTML = rows.length ? rows.map(function (r) {
+      return "<tr><td>" + esc(r.i) + "</td><td><code>" + esc(r.t) + "</code></td><td><code>" + esc(r.sel) +
+        "</code></td><td><code>" + esc(r.v) + "</code>" +
+        (r.dt ? '<div style="color:#6b7280;font-size:12px">' + esc(r.dt) + "</div>" : "") +
+        "</td><td>" + Number(r.d).toFixed(2) + "s" +
+        (r.a > 1 ? " ×" + r.a : "") + "</td><td>" + badge(r.st) + "</td><td>" + esc(r.e) + "</td></tr>";
+    }).join("") : '<tr><td colspan="7">No matching steps</td></tr>';
+  }
+
+  var m = M.meta, net = M.network;
+  document.getElementById("meta").innerHTML =
+    "<div><b>Base URL:</b> " + esc(m.base_url) + "</div>" +
+    "<div><b>Browser:</b> " + esc(m.browser) + " | <b>Headful:</b> " + esc(m.headful) + "</div>" +
+    "<div><b>Status:</b> " + badge(m.status) + "</div>" +
+    "<div><b>Error:</b> " + esc(m.error || "-") + "</div>" +
+    "<div><b>Duration:</b> " + Number(m.duration || 0).toFixed(2) + "s</div>" +
+    (net ? "<div><b>Network:</b> blocked " + esc(net.blocked) + " requests (~" +
+           Math.round((net.bytes_saved_est || 0) / 1024) + " KB saved, est.)</div>" : "") +
+    "<div><b>Steps:</b> " + M.chunks.reduce(function (a, c) { return a + c.n; }, 0) + "</div>";
+  document.getElementById("status-filters").innerHTML = Object.keys(M.totals.status).map(function (s) {
+    return '<label><input type="checkbox" value="' + esc(s) + '" checked/> ' + esc(s) + " (" + M.totals.status[s] + ")</label>";
+  }).join(" ");
+  var tf = document.getElementById("type-filter");
+  Object.keys(M.totals.type).sort().forEach(function (t) {
+    var o = document.createElement("option"); o.value = t; o.textContent = t + " (" + M.totals.type[t] + ")"; tf.appendChild(o);
+  });
+  document.getElementById("status-filters").addEventListener("change", function () { page = 0; render(); });
+  tf.addEventListener("change", function () { page = 0; render(); });
+  document.getElementById("prev").onclick = function () { if (page > 0) { page--; render(); } };
+  document.getElementById("next").onclick = function () { page++; render(); };
+  document.getElementById("arts").innerHTML = M.artifacts.length ? M.artifacts.map(function (a) {
+    return "<figure><a href=\"" + esc(a.path) + "\" target=\"_blank\">" +
+      (a.thumb ? '<img loading="lazy" src="' + esc(a.thumb) + '"/>' : esc(a.path)) +
+      "</a><figcaption>" + esc(a.type) + "</figcaption></figure>";
+  }).join("") : "No artifacts";
+  render();
+})();
+</script>
+</body></html>
+"""
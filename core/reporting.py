@@ -1,35 +1,98 @@
 # core/reporting.py
 from __future__ import annotations
-import time, html
+import contextlib, json, os, threading, time, html
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional
+from core.artifacts import wait_for_artifacts
+from core.history import record_run
 
-def start_run(name: str, base_url: Optional[str], browser: str, headful: bool) -> Dict[str, Any]:
-    return {
+# כל ריצה נכתבת בזמן אמת ל-results.jsonl (שורה לכל אירוע, append+flush) –
+# הדוחות מרונדרים מהלוג במעבר זורם, ולכן גם ריצה שנהרגה באמצע משאירה דוח.
+RESULTS_LOG = "results.jsonl"
+
+
+class RunLog:
+    """קובץ JSON Lines פתוח לריצה אחת."""
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh = open(self.path, "w", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def event(self, ev: str, **data: Any) -> None:
+        line = json.dumps({"ev": ev, "ts": time.time(), **data}, ensure_ascii=False, default=str)
+        with self._lock:
+            if self._fh.closed:
+                return
+            self._fh.write(line + "\n")
+            self._fh.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._fh.closed:
+                self._fh.close()
+
+
+class _StepRecord(dict):
+    """רשומת צעד; _log (אם יש) מאפשר ל-finish_step לכתוב את סיום הצעד ללוג."""
+    _log: Optional[RunLog] = None
+
+
+def start_run(name: str, base_url: Optional[str], browser: str, headful: bool,
+              *, log_dir: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    log_dir: תיקייה ל-results.jsonl. עם לוג, צעדים שהסתיימו לא נשמרים בזיכרון
+    (steps נשאר ריק והזיכרון קבוע); בלי לוג – ההתנהגות הישנה (הכול ב-results).
+    """
+    results = {
         "name": name,
         "base_url": base_url,
         "browser": browser,
         "headful": headful,
         "started": time.time(),
         "steps": [],
+        "step_count": 0,
         "artifacts": [],
         "status": "running",
         "error": None,
     }
+    if log_dir is not None:
+        log = RunLog(Path(log_dir) / RESULTS_LOG)
+        results["_log"] = log
+        log.event("run_start", name=name, base_url=base_url, browser=browser, headful=headful,
+                  started=results["started"])
+    return results
+
+def next_step_index(results: Dict[str, Any]) -> int:
+    results["step_count"] = results.get("step_count", 0) + 1
+    return results["step_count"]
+
+def _redact(value: Any) -> Any:
+    """value מובנה (למשל של login) – סיסמאות לא נכנסות ללוג/לדוח."""
+    if isinstance(value, dict):
+        return {k: ("***" if "pass" in str(k).lower() and v else v) for k, v in value.items()}
+    return value
 
 def record_step(results: Dict[str, Any], idx: int, t: str, selector: Optional[str], value: Any) -> Dict[str, Any]:
-    rec = {
-        "index": idx,
-        "type": t,
-        "selector": selector,
-        "value": value,
-        "started": time.time(),
-        "ended": None,
-        "status": "running",
-        "error": None,
-        "continue_on_fail": False,
-    }
-    results["steps"].append(rec)
+    rec = _StepRecord(
+        index=idx,
+        type=t,
+        selector=selector,
+        value=_redact(value),
+        started=time.time(),
+        ended=None,
+        status="running",
+        error=None,
+        continue_on_fail=False,
+        attempts=0,
+        error_class=None,  # transient / permanent (core/retry.py)
+    )
+    log = results.get("_log")
+    if log is not None:
+        rec._log = log
+        log.event("step_start", **{k: rec[k] for k in ("index", "type", "selector", "value", "started")})
+    else:
+        results["steps"].append(rec)
     return rec
 
 def finish_step(rec: Dict[str, Any], status: str = "passed", error: Optional[str] = None) -> None:
@@ -37,101 +100,342 @@ def finish_step(rec: Dict[str, Any], status: str = "passed", error: Optional[str
     rec["status"] = status
     if error:
         rec["error"] = error
+    log = getattr(rec, "_log", None)
+    if log is not None:
+        log.event("step_end", **{k: rec.get(k) for k in ("index", "ended", "status", "error", "attempts",
+                                                          "error_class", "continue_on_fail", "detail")})
+
+def start_test(results: Dict[str, Any], name: str) -> None:
+    """גבול טסט בתוך ריצה (למשל טסט בסוויטה של run_suite) – להיסטוריה ולפילוח."""
+    if results.get("_log") is not None:
+        results["_log"].event("test_start", name=name)
+
+def end_test(results: Dict[str, Any], name: str, status: str) -> None:
+    if results.get("_log") is not None:
+        results["_log"].event("test_end", name=name, status=status)
 
 def attach_artifact(results: Dict[str, Any], kind: str, path: Path) -> None:
     results["artifacts"].append({"type": kind, "path": str(path)})
+    if results.get("_log") is not None:
+        results["_log"].event("artifact", type=kind, path=str(path))
 
 def _status_badge(s: str) -> str:
-    color = {"passed":"#16a34a","failed":"#dc2626","failed-continued":"#f59e0b","running":"#2563eb"}.get(s, "#6b7280")
+    color = {"passed":"#16a34a","failed":"#dc2626","failed-continued":"#f59e0b","soft-failed":"#f59e0b","running":"#2563eb"}.get(s, "#6b7280")
     return f'<span style="background:{color};color:#fff;border-radius:8px;padding:2px 8px;font-size:12px">{html.escape(s)}</span>'
 
+def _network_line(stats: Optional[Dict[str, Any]]) -> Optional[str]:
+    """סיכום חסימת משאבים (core.network); הבתים שנחסכו הם הערכה בלבד."""
+    if not stats:
+        return None
+    by_type = ", ".join(f"{t}={n}" for t, n in sorted(stats.get("by_type", {}).items()))
+    kb = stats.get("bytes_saved_est", 0) / 1024.0
+    return f"blocked {stats.get('blocked', 0)} requests (~{kb:.0f} KB saved, est.)" + (f" [{by_type}]" if by_type else "")
+
+
 def finalize_run(results: Dict[str, Any], status: str, error: Optional[str], started_ts: float, reports_dir: Path) -> None:
     results["status"] = status
     results["error"]  = error
+    # הדוח מקשר לצילומים – ממתינים רק לכתיבה של ה-artifacts של הריצה הזו
+    wait_for_artifacts(a["path"] for a in results["artifacts"])
+
+    log = results.get("_log")
+    if log is None:
+        # ריצה בלי לוג (קריאה ישנה) – כותבים את מה שבזיכרון ללוג ומרנדרים באותה דרך
+        log = RunLog(Path(reports_dir) / RESULTS_LOG)
+        log.event("run_start", name=results["name"], base_url=results.get("base_url"),
+                  browser=results["browser"], headful=results["headful"], started=started_ts)
+        for rec in results["steps"]:
+            log.event("step_start", **{k: rec.get(k) for k in ("index", "type", "selector", "value", "started")})
+            log.event("step_end", **{k: rec.get(k) for k in ("index", "ended", "status", "error", "attempts",
+                                                              "error_class", "continue_on_fail", "detail")})
+        for a in results["artifacts"]:
+            log.event("artifact", **a)
+    log.event("run_end", status=status, error=error, duration=time.time() - started_ts,
+              network=results.get("network"))
+    log.close()
+    render_report(log.path, reports_dir, mode=results.get("report_mode"))
+    record_run(log.path, reports_dir)
+
+
+# ---------- רינדור זורם מהלוג ----------
+
+def iter_events(log_path: Path) -> Iterator[Dict[str, Any]]:
+    """קורא אירועים שורה-שורה; שורה חתוכה (ריצה שנהרגה באמצע כתיבה) מדולגת."""
+    with open(log_path, "r", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def scan_meta(log_path: Path) -> Dict[str, Any]:
+    """
+    מעבר ראשון על results.jsonl: רק נתוני הריצה וה-artifacts (קטנים) – הצעדים לא נשמרים.
+    ציבורי – גם core/history.py קולט ריצות דרכו.
+    """
+    meta: Dict[str, Any] = {"name": "?", "base_url": None, "browser": "?", "headful": False,
+                            "started": None, "last_ts": None, "status": None, "error": None,
+                            "duration": None, "network": None, "artifacts": [], "steps": 0}
+    for e in iter_events(log_path):
+        meta["last_ts"] = e.get("ts")
+        ev = e.get("ev")
+        if ev == "run_start":
+            for k in ("name", "base_url", "browser", "headful"):
+                meta[k] = e.get(k)
+            meta["started"] = e.get("started") or e.get("ts")
+        elif ev == "step_start":
+            meta["steps"] += 1
+        elif ev == "artifact":
+            meta["artifacts"].append({"type": e.get("type"), "path": e.get("path")})
+        elif ev == "run_end":
+            for k in ("status", "error", "duration", "network"):
+                meta[k] = e.get(k)
+    if meta["status"] is None:
+        # אין run_end – הריצה נקטעה
+        meta["status"] = "incomplete"
+        meta["error"] = "run did not finish (log ends before run_end)"
+    if meta["duration"] is None and meta["started"] and meta["last_ts"]:
+        meta["duration"] = meta["last_ts"] - meta["started"]
+    return meta
+
+
+def iter_steps(log_path: Path) -> Iterator[Dict[str, Any]]:
+    """מעבר שני: מאחד step_start+step_end לרשומה אחת ומחזיר כל צעד ברגע שהסתיים."""
+    pending: Dict[Any, Dict[str, Any]] = {}
+    last_ts = None
+    for e in iter_events(log_path):
+        last_ts = e.get("ts")
+        ev = e.get("ev")
+        if ev == "step_start":
+            pending[e.get("index")] = {k: v for k, v in e.items() if k not in ("ev", "ts")}
+        elif ev == "step_end":
+            rec = pending.pop(e.get("index"), {"index": e.get("index"), "type": "?", "started": e.get("ended")})
+            rec.update({k: v for k, v in e.items() if k not in ("ev", "ts")})
+            yield rec
+    for rec in pending.values():
+        rec.update(ended=last_ts, status="interrupted")
+        yield rec
+
+
+def _detail_line(s: Dict[str, Any]) -> str:
+    """שורת פירוט לצעד (detail שהפעולה החזירה): קליק לפי כוונה, login, המתנות, assert_all, fill_form."""
+    d = s.get("detail") or {}
+    if d.get("match"):
+        m = d["match"]
+        word = m.get("word") or "<fallback>"
+        return f"match word={word!r} score={m.get('score')} name={m.get('name')!r}" + (" [modal]" if m.get("modal") else "")
+    if d.get("login"):
+        lg = d["login"]
+        sub = lg.get("submit")
+        how = f"submit={sub.get('name')!r}" if isinstance(sub, dict) else f"submit={sub}"
+        return f"login {how} user_field={lg.get('user_field')} modal={lg.get('modal')} opened={lg.get('opened')}"
+    if d.get("response"):
+        r = d["response"]
+        return f"response {r.get('status')} {r.get('method')} {r.get('url')}"
+    if d.get("idle") or d.get("dom"):
+        w = d.get("idle") or d.get("dom")
+        return f"{'network idle' if d.get('idle') else 'dom stable'} after {w.get('waited_ms')}ms"
+    if d.get("checks"):
+        cs = d["checks"]
+        return f"checks {sum(1 for c in cs if c.get('ok'))}/{len(cs)} passed"
+    if d.get("fields"):
+        fs = d["fields"]
+        kinds: Dict[str, int] = {}
+        for f in fs:
+            kinds[f.get("kind") or "?"] = kinds.get(f.get("kind") or "?", 0) + 1
+        return f"fields {sum(1 for f in fs if f.get('ok'))}/{len(fs)} set [" + ", ".join(f"{k}={n}" for k, n in kinds.items()) + "]"
+    return ""
+
+
+def _step_duration(s: Dict[str, Any]) -> float:
+    return float((s.get("ended") or s.get("started") or 0) - (s.get("started") or 0))
+
+
+_HTML_HEAD = """<!doctype html>
+<html lang="en"><head>
+<meta charset="utf-8"/>
+<title>RPA Report – {name}</title>
+<style>
+ body{{font-family:Arial,Helvetica,sans-serif;margin:24px}}
+ table{{border-collapse:collapse;width:100%}}
+ th,td{{border:1px solid #e5e7eb;padding:8px;text-align:left}}
+ th{{background:#f3f4f6}}
+ code{{background:#f3f4f6;padding:1px 4px;border-radius:4px}}
+ .meta div{{margin-bottom:4px}}
+</style>
+</head><body>
+<h2>RPA Report – {name}</h2>
+"""
+
+
+# auto: מעל הסף הזה (צעדים או artifacts) הדוח נכתב כאינדקס + chunks (core/report_paged.py)
+REPORT_PAGED_THRESHOLD = 1000
+REPORT_MODES = ("auto", "single", "paged")
+
+
+def parse_report_mode(v: Any) -> str:
+    """"auto" / "single" / "paged" (ריק → auto); ערך אחר → ValueError."""
+    mode = str(v or "auto").strip().lower()
+    if mode not in REPORT_MODES:
+        raise ValueError(f"report mode must be one of {REPORT_MODES}, got {v!r}")
+    return mode
+
+
+def _report_mode(mode: Optional[str], meta: Dict[str, Any]) -> str:
+    mode = parse_report_mode(mode or os.environ.get("REPORT_MODE"))
+    if mode == "auto":
+        big = meta.get("steps", 0) > REPORT_PAGED_THRESHOLD or len(meta["artifacts"]) > REPORT_PAGED_THRESHOLD // 5
+        return "paged" if big else "single"
+    return mode
+
+
+def render_report(log_path: Path, reports_dir: Optional[Path] = None, *, mode: Optional[str] = None) -> Path:
+    """
+    בונה report_summary.txt + report_summary.html מלוג JSONL (גם חלקי).
+    שני מעברים זורמים על הקובץ; ה-HTML נכתב בחתיכות – שורה לכל צעד.
+    mode: single (טבלה אחת) / paged (אינדקס + chunks) / auto (לפי גודל הריצה).
+    """
+    log_path = Path(log_path)
+    reports_dir = Path(reports_dir) if reports_dir is not None else log_path.parent
+    reports_dir.mkdir(parents=True, exist_ok=True)
+    meta = scan_meta(log_path)
+    net = _network_line(meta.get("network"))
+    duration = meta.get("duration") or 0.0
+    paged = None
+    if _report_mode(mode, meta) == "paged":
+        from core.report_paged import PagedReport
+        paged = PagedReport(reports_dir, meta)
+
+    with open(reports_dir / "report_summary.txt", "w", encoding="utf-8") as txt, \
+         (contextlib.nullcontext() if paged else open(reports_dir / "report_summary.html", "w", encoding="utf-8")) as out:
+        # TXT
+        txt.write("\n".join([
+            f"Run: {meta['name']}",
+            f"Base URL: {meta.get('base_url')}",
+            f"Browser: {meta['browser']} | Headful: {meta['headful']}",
+            f"Status: {meta['status']}",
+            f"Error: {meta['error'] or '-'}",
+            f"Duration: {duration:.2f}s",
+        ]) + "\n")
+        if net:
+            txt.write(f"Network: {net}\n")
+        txt.write("\nSteps:\n")
+
+        # HTML
+        if not paged:
+            out.write(_HTML_HEAD.format(name=html.escape(str(meta["name"]))))
+            out.write(
+                '<div class="meta">\n'
+                f"  <div><b>Base URL:</b> {html.escape(str(meta.get('base_url') or ''))}</div>\n"
+                f"  <div><b>Browser:</b> {html.escape(str(meta['browser']))} | <b>Headful:</b> {meta['headful']}</div>\n"
+                f"  <div><b>Status:</b> {_status_badge(str(meta['status']))}</div>\n"
+                f"  <div><b>Error:</b> {html.escape(str(meta['error'] or '-'))}</div>\n"
+                f"  <div><b>Duration:</b> {duration:.2f}s</div>\n"
+                + (f"  <div><b>Network:</b> {html.escape(net)}</div>\n" if net else "")
+                + "</div>\n\n<h3>Steps</h3>\n<table>\n"
+                "  <thead><tr><th>#</th><th>Type</th><th>Selector</th><th>Value</th><th>Time</th><th>Status</th><th>Error</th></tr></thead>\n"
+                "  <tbody>\n"
+            )
+
+        for s in iter_steps(log_path):
+            dur = _step_duration(s)
+            tries = f"  attempts={s['attempts']}" if (s.get("attempts") or 0) > 1 else ""
+            txt.write(f"  [{s['index']}] {s['type']}  ({dur:.2f}s)  -> {s['status']}  sel={s.get('selector')!r} val={s.get('value')!r}{tries}\n")
+            match = _detail_line(s)
+            if match:
+                txt.write(f"       {match}\n")
+            if s.get("error"):
+                txt.write(f"       error: {s['error']}\n")
+            if paged:
+                paged.add(s, dur, match)
+                continue
+            out.write(
+                "<tr>"
+                f"<td>{s['index']}</td>"
+                f"<td><code>{html.escape(str(s['type']))}</code></td>"
+                f"<td><code>{html.escape(str(s.get('selector') or ''))}</code></td>"
+                f"<td><code>{html.escape(str(s.get('value') or ''))}</code>"
+                + (f"<div style='color:#6b7280;font-size:12px'>{html.escape(match)}</div>" if match else "") + "</td>"
+                f"<td>{dur:.2f}s</td>"
+                f"<td>{_status_badge(str(s['status']))}</td>"
+                f"<td>{html.escape(s.get('error') or '')}</td>"
+                "</tr>\n"
+            )
+
+        if paged:
+            return paged.close()
+        out.write("  </tbody>\n</table>\n\n<h3>Artifacts</h3>\n<table>\n"
+                  "  <thead><tr><th>Type</th><th>Path</th></tr></thead>\n  <tbody>\n")
+        for a in meta["artifacts"]:
+            p = html.escape(str(a["path"]))
+            t = html.escape(str(a["type"]))
+            link = f'<a href="{p}" target="_blank">{p}</a>'
+            thumb = ""
+            if p.lower().endswith((".png",".jpg",".jpeg",".gif",".webp")):
+                thumb = f'<div><img loading="lazy" src="{p}" style="max-width:320px;border:1px solid #ddd;margin-top:4px"/></div>'
+            out.write(f"<tr><td>{t}</td><td>{link}{thumb}</td></tr>\n")
+        if not meta["artifacts"]:
+            out.write('<tr><td colspan="2">No artifacts</td></tr>\n')
+        out.write("  </tbody>\n</table>\n</body></html>")
+    return reports_dir / "report_summary.html"
+
+def finalize_batch(rows: List[Dict[str, Any]], started_ts: float, reports_dir: Path) -> None:
+    """
+    סיכום מאוחד להרצת batch (כמה תרחישים) – batch_summary.txt + batch_summary.html.
+    הדוחות הפרטניים של כל תרחיש נשארים בתיקייה שלו.
+    """
+    reports_dir.mkdir(parents=True, exist_ok=True)
     total_sec = time.time() - started_ts
+    passed = sum(1 for r in rows if r["status"] == "passed")
 
-    # TXT
     txt_lines = [
-        f"Run: {results['name']}",
-        f"Base URL: {results.get('base_url')}",
-        f"Browser: {results['browser']} | Headful: {results['headful']}",
-        f"Status: {results['status']}",
-        f"Error: {results['error'] or '-'}",
+        f"Batch: {len(rows)} runs | passed: {passed} | failed: {len(rows) - passed}",
         f"Duration: {total_sec:.2f}s",
         "",
-        "Steps:"
+        "Runs:",
     ]
-    for s in results["steps"]:
-        dur = (s["ended"] or time.time()) - s["started"]
-        txt_lines.append(f"  [{s['index']}] {s['type']}  ({dur:.2f}s)  -> {s['status']}  sel={s.get('selector')!r} val={s.get('value')!r}")
-        if s.get("error"):
-            txt_lines.append(f"       error: {s['error']}")
-    txt_path = reports_dir / "report_summary.txt"
-    txt_path.write_text("\n".join(txt_lines), encoding="utf-8")
-
-    # HTML
-    html_path = reports_dir / "report_summary.html"
+    for r in rows:
+        txt_lines.append(f"  {r['scenario']} [{r['browser']}]  ({r['duration']:.2f}s)  -> {r['status']}  report={r['reports_dir']}")
+        if r.get("error"):
+            txt_lines.append(f"       error: {r['error']}")
+    (reports_dir / "batch_summary.txt").write_text("\n".join(txt_lines), encoding="utf-8")
+
     html_rows = []
-    for s in results["steps"]:
-        dur = (s["ended"] or time.time()) - s["started"]
+    for r in rows:
+        rep = html.escape(str(Path(r["reports_dir"]) / "report_summary.html"))
         html_rows.append(
             "<tr>"
-            f"<td>{s['index']}</td>"
-            f"<td><code>{html.escape(str(s['type']))}</code></td>"
-            f"<td><code>{html.escape(str(s.get('selector') or ''))}</code></td>"
-            f"<td><code>{html.escape(str(s.get('value') or ''))}</code></td>"
-            f"<td>{dur:.2f}s</td>"
-            f"<td>{_status_badge(s['status'])}</td>"
-            f"<td>{html.escape(s.get('error') or '')}</td>"
+            f"<td><code>{html.escape(r['scenario'])}</code></td>"
+            f"<td>{html.escape(r['browser'])}</td>"
+            f"<td>{r['duration']:.2f}s</td>"
+            f"<td>{_status_badge(r['status'])}</td>"
+            f'<td><a href="{rep}" target="_blank">{rep}</a></td>'
+            f"<td>{html.escape(r.get('error') or '')}</td>"
             "</tr>"
         )
-
-    art_rows = []
-    for a in results["artifacts"]:
-        p = html.escape(a["path"])
-        t = html.escape(a["type"])
-        link = f'<a href="{p}" target="_blank">{p}</a>'
-        thumb = ""
-        if p.lower().endswith((".png",".jpg",".jpeg",".gif")):
-            thumb = f'<div><img src="{p}" style="max-width:320px;border:1px solid #ddd;margin-top:4px"/></div>'
-        art_rows.append(f"<tr><td>{t}</td><td>{link}{thumb}</td></tr>")
-
     html_doc = f"""<!doctype html>
 <html lang="en"><head>
 <meta charset="utf-8"/>
-<title>RPA Report – {html.escape(results['name'])}</title>
+<title>RPA Batch Report</title>
 <style>
  body{{font-family:Arial,Helvetica,sans-serif;margin:24px}}
  table{{border-collapse:collapse;width:100%}}
  th,td{{border:1px solid #e5e7eb;padding:8px;text-align:left}}
  th{{background:#f3f4f6}}
  code{{background:#f3f4f6;padding:1px 4px;border-radius:4px}}
- .meta div{{margin-bottom:4px}}
 </style>
 </head><body>
-<h2>RPA Report – {html.escape(results['name'])}</h2>
-<div class="meta">
-  <div><b>Base URL:</b> {html.escape(str(results.get('base_url') or ''))}</div>
-  <div><b>Browser:</b> {html.escape(results['browser'])} | <b>Headful:</b> {results['headful']}</div>
-  <div><b>Status:</b> {_status_badge(results['status'])}</div>
-  <div><b>Error:</b> {html.escape(results['error'] or '-')}</div>
-  <div><b>Duration:</b> {total_sec:.2f}s</div>
-</div>
-
-<h3>Steps</h3>
+<h2>RPA Batch Report</h2>
+<div><b>Runs:</b> {len(rows)} | <b>Passed:</b> {passed} | <b>Failed:</b> {len(rows) - passed} | <b>Duration:</b> {total_sec:.2f}s</div>
 <table>
-  <thead><tr><th>#</th><th>Type</th><th>Selector</th><th>Value</th><th>Time</th><th>Status</th><th>Error</th></tr></thead>
+  <thead><tr><th>Scenario</th><th>Browser</th><th>Time</th><th>Status</th><th>Report</th><th>Error</th></tr></thead>
   <tbody>
     {''.join(html_rows)}
   </tbody>
 </table>
-
-<h3>Artifacts</h3>
-<table>
-  <thead><tr><th>Type</th><th>Path</th></tr></thead>
-  <tbody>
-    {''.join(art_rows) if art_rows else '<tr><td colspan="2">No artifacts</td></tr>'}
-  </tbody>
-</table>
 </body></html>"""
-    html_path.write_text(html_doc, encoding="utf-8")
+    (reports_dir / "batch_summary.html").write_text(html_doc, encoding="utf-8")
@@ -0,0 +1,111 @@
+# core/retry.py
+from __future__ import annotations
+import random
+from typing import Any, Dict, Optional
+
+from playwright.sync_api import TimeoutError as PWTimeoutError
+from core.engine import call, pause
+from core.exceptions import ActionExecutionError, StepValidationError, IncludeNotFoundError, IncludeCycleError
+
+TRANSIENT = "transient"
+PERMANENT = "permanent"
+
+# שגיאות דטרמיניסטיות – ניסיון נוסף לא יעזור
+_PERMANENT_TYPES = (AssertionError, ValueError, TypeError, KeyError,
+                    StepValidationError, IncludeNotFoundError, IncludeCycleError)
+_PERMANENT_MARKERS = ("unknown step type", "strict mode violation", "is not a valid selector",
+                      "unexpected token", "target page, context or browser has been closed")
+
+
+def classify_error(e: BaseException) -> str:
+    """
+    transient: timeouts של Playwright, אלמנט שעוד לא נמצא/נותק, שגיאות רשת – שווה לנסות שוב.
+    permanent: assertions (אי-התאמת טקסט), שגיאות אימות/סכמה, סוג צעד לא מוכר, selector שבור.
+    ברירת מחדל (לא מזוהה) – transient, כמו ההתנהגות הקודמת שניסתה שוב כל חריגה.
+    """
+    msg = str(e).lower()
+    if isinstance(e, PWTimeoutError):
+        return TRANSIENT
+    if isinstance(e, ActionExecutionError) or any(m in msg for m in _PERMANENT_MARKERS):
+        return PERMANENT
+    if isinstance(e, _PERMANENT_TYPES):
+        return PERMANENT
+    return TRANSIENT
+
+
+def backoff_delay_ms(attempt: int, base_ms: int, factor: float = 2.0, max_ms: int = 5000) -> float:
+    """השהיה אקספוננציאלית עם jitter (equal jitter): חצי קבוע + חצי אקראי."""
+    d = min(float(max_ms), max(0.0, float(base_ms)) * (float(factor) ** max(0, attempt - 1)))
+    return d / 2.0 + random.uniform(0.0, d / 2.0)
+
+
+# ---------- תקציב retry לכל הריצה ----------
+
+def budget_allows(results: Dict[str, Any], options: Dict[str, Any]) -> bool:
+    """retry_budget (אופציונלי) – כמה retries מותרים בסך הכול לתרחיש; נגמר = נכשלים מהר."""
+    budget = options.get("retry_budget")
+    return budget is None or int(results.get("retries_used", 0)) < int(budget)
+
+def consume_budget(results: Dict[str, Any]) -> None:
+    results["retries_used"] = int(results.get("retries_used", 0)) + 1
+
+
+# ---------- המתנה מונחית-אירועים בין ניסיונות ----------
+
+# מתעורר על שינוי DOM (MutationObserver) או בקשת רשת שהסתיימה (PerformanceObserver),
+# או כשנגמר הזמן – המוקדם מביניהם.
+WAIT_FOR_CHANGE_JS = """
+(ms) => new Promise(resolve => {
+  let done = false, mo = null, po = null;
+  const finish = (why) => {
+    if (done) return; done = true;
+    try { mo && mo.disconnect(); } catch (e) {}
+    try { po && po.disconnect(); } catch (e) {}
+    resolve(why);
+  };
+  setTimeout(() => finish('timeout'), ms);
+  try {
+    mo = new MutationObserver(() => finish('dom'));
+    mo.observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+  } catch (e) {}
+  try {
+    po = new PerformanceObserver(() => finish('network'));
+    po.observe({type: 'resource', buffered: false});
+  } catch (e) {}
+})
+"""
+
+# גם כשה-DOM "רועש" (אנימציות) ממתינים לפחות את החלק הזה מה-delay המחושב
+# (כך שה-backoff נשמר יחסית: delay ארוך → רצפה ארוכה יותר)
+MIN_WAKE_FRACTION = 0.25
+
+
+def wait_for_change(page, delay_ms: float):
+    """
+    flow: ממתין עד delay_ms, אבל מתעורר מוקדם אם הדף השתנה. מחזיר את סיבת ההתעוררות.
+    """
+    floor = float(delay_ms) * MIN_WAKE_FRACTION
+    yield pause(floor / 1000.0)
+    rest = int(max(0.0, delay_ms - floor))
+    if rest <= 0:
+        return "timeout"
+    try:
+        return (yield call(page.evaluate, WAIT_FOR_CHANGE_JS, rest)) or "timeout"
+    except Exception:
+        # ניווט הרס את ה-context – זה בדיוק שינוי שמצדיק ניסיון נוסף
+        return "navigation"
+
+
+def should_retry(e: BaseException, attempt: int, max_retry: int,
+                 results: Dict[str, Any], options: Dict[str, Any]) -> Optional[str]:
+    """
+    מחזיר None אם צריך לנסות שוב, אחרת את הסיבה לעצירה
+    ('exhausted' / 'permanent' / 'budget').
+    """
+    if attempt > max_retry:
+        return "exhausted"
+    if classify_error(e) == PERMANENT:
+        return "permanent"
+    if not budget_allows(results, options):
+        return "budget"
+    return None
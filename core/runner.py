@@ -1,84 +1,96 @@
 # core/runner.py
 from __future__ import annotations
-import time
+import inspect, time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Any, Dict
-from core.config import load_options, substitute_vars
-from core.browser import open_browser, close_browser
-from core.reporting import start_run, record_step, attach_artifact, finalize_run, finish_step
-from core.schema import validate_scenario
+from typing import Any, Dict, Optional
+from core.config import load_options
+from core.browser import launch_browser, stop_browser, new_context_page, close_context
+from core.aio import browser as aio_browser
+from core.reporting import start_run, next_step_index, record_step, attach_artifact, finalize_run, finish_step
 from core.exceptions import ActionExecutionError
-from utils.yaml_io import read_yaml  # אם תבטל YAML – אפשר להסיר
+from core.loader import load_scenario
+from core.template import as_scope
+from core.auth import resolve_auth, ensure_auth, async_ensure_auth, session_alive, invalidate
+from core.network import (resolve_profile, track_requests, mark_step, install_network_profile,
+                          async_install_network_profile)
+from core.har import resolve_har, har_context_options, install_har_replay, async_install_har_replay
+from core.artifacts import save_screenshot, async_save_screenshot
+from core.tracing import (start_tracing, start_chunk, stop_chunk, stop_tracing, video_paths, settle_videos,
+                          async_start_tracing, async_start_chunk, async_stop_chunk, async_stop_tracing,
+                          async_video_paths)
+from core.retry import should_retry, classify_error, consume_budget, wait_for_change
+from core.engine import run_sync, pause, twin
+from core.plan import CompiledStep, compile_steps, format_plan
 from core.actions import ACTION_REGISTRY  # וודא שקיים: goto/fill/click/press/select_option/wait/wait_for_selector/screenshot/assert_*
 
-def _parse_wait_value(v: Any) -> float:
-    if isinstance(v, (int, float)): return float(v)
-    if isinstance(v, str) and v.strip().lower().endswith("ms"):
-        n = v.strip()[:-2].strip()
-        return float(n)/1000.0 if n.isdigit() else 0.5
-    try:
-        return float(v)
-    except Exception:
-        return 0.5
-
-def execute_step(page, step, *, base_url, options, results, variables, reports_dir: Path):
-    # include (string or list)
-    if "include" in step:
-        include = step["include"]
-        include_files = include if isinstance(include, list) else [include]
-        for inc in include_files:
-            inc_path = Path(inc)
-            sub = read_yaml(inc_path)
-            validate_scenario(sub)
-            sub_base = sub.get("base_url", base_url)
-            run_steps(page, sub["steps"], base_url=sub_base, options=options, results=results,
-                      variables=variables, reports_dir=reports_dir)
+def step_flow(page, step, *, base_url, options, results, variables, reports_dir: Path):
+    """
+    flow (core/engine.py) של צעד אחד – אותו קוד ל-sync ול-async. step יכול להיות dict
+    (יקומפל כאן, כולל include) או CompiledStep מוכן.
+    """
+    if not isinstance(step, CompiledStep):
+        variables = as_scope(variables)
+        for cs in compile_steps([step], ACTION_REGISTRY):
+            yield from step_flow(page, cs, base_url=base_url, options=options, results=results,
+                                 variables=variables, reports_dir=reports_dir)
         return
 
-    t = (step.get("type") or "").strip().lower()
-    selector = step.get("selector")
-    value = substitute_vars(step.get("value"), variables)
-    cont = bool(step.get("continue_on_fail", False))
-    rec = record_step(results, len(results["steps"]) + 1, t, selector, value)
+    # צעד שהגיע מ-include נושא את ה-base_url של תת-התרחיש שלו
+    base_url = step.base_url or base_url
+    value = step.render_value(variables)
+    cont = step.continue_on_fail
+    rec = record_step(results, next_step_index(results), step.type, step.selector, value)
     rec["continue_on_fail"] = cont
-    started_ts = time.time()
+    mark_step(page)   # wait_for_response מקבל רק תגובות מהצעד הקודם ואילך
 
-    # retry loop
-    max_retry = int(step.get("retry", 0))
-    delay_ms = int(step.get("retry_delay_ms", 500))
+    # retry loop – רק לשגיאות חולפות, עם backoff ותקציב retry לכל הריצה
+    max_retry = step.retry.max_retry
     attempt = 0
-    last_err = None
 
-    while attempt <= max_retry:
+    while True:
         try:
-            if t == "wait":
-                time.sleep(_parse_wait_value(value))
+            if step.type == "wait":
+                yield pause(step.wait_seconds(value))
             else:
-                action = ACTION_REGISTRY.get(t)
-                if not action:
-                    raise ActionExecutionError(f"Unknown step type: {t}")
-                action(
+                if not step.action:
+                    raise ActionExecutionError(f"Unknown step type: {step.type}")
+                info = step.action(
                     page,
-                    selector=selector,
+                    selector=step.selector,
                     value=value,
                     base_url=base_url,
                     timeout_ms=options["timeout_ms"],
                     reports_dir=reports_dir,
+                    artifacts=options.get("artifacts"),
                 )
-            finish_step(rec, "passed", None)
-            last_err = None
+                if inspect.isgenerator(info):
+                    info = yield from info   # פעולה רשומה היא flow; פונקציה רגילה מחזירה ישר
+                if isinstance(info, dict) and info:
+                    rec["detail"] = info   # למשל match של קליק לפי כוונה – נכנס לדוח
+            rec["attempts"] = attempt + 1
+            # assert_all במצב soft: הצעד נרשם ככישלון, הריצה ממשיכה ונכשלת בסוף run_steps
+            soft = (rec.get("detail") or {}).get("soft_failed")
+            if soft:
+                results["soft_failures"] = results.get("soft_failures", 0) + 1
+            finish_step(rec, "soft-failed" if soft else "passed", soft)
             break
         except Exception as e:
-            last_err = e
             attempt += 1
-            if attempt > max_retry:
+            stop = should_retry(e, attempt, max_retry, results, options)
+            if stop:
+                rec["attempts"] = attempt
+                rec["error_class"] = classify_error(e)
+                if stop == "budget":
+                    print(f"[retry] budget exhausted ({options.get('retry_budget')}) – failing fast")
                 # נכשל סופית
                 if cont:
                     finish_step(rec, "failed-continued", str(e))
+                    results["continued_failures"] = results.get("continued_failures", 0) + 1
                     # ניסיון להוסיף צילום לכישלון חלקי
                     try:
                         shot = reports_dir / f"fail_{int(time.time())}.png"
-                        page.screenshot(path=str(shot))
+                        shot = yield twin(save_screenshot, async_save_screenshot, page, shot, options.get("artifacts"))
                         attach_artifact(results, "screenshot", shot)
                     except Exception:
                         pass
@@ -86,71 +98,187 @@ def execute_step(page, step, *, base_url, options, results, variables, reports_d
                 # לא להמשיך – זרוק חריגה
                 finish_step(rec, "failed", str(e))
                 raise
-            # המתנה בין ניסיונות
-            time.sleep(max(0, delay_ms) / 1000.0)
+            consume_budget(results)
+            # המתנה בין ניסיונות: מתעוררים מוקדם על שינוי DOM/רשת
+            yield from wait_for_change(page, step.retry.delay_for(attempt))
 
     # האטה בין צעדים אם הוגדר
     if options.get("speed_s", 0) > 0:
-        time.sleep(options["speed_s"])
+        yield pause(options["speed_s"])
+
+def steps_flow(page, steps, *, base_url, options, results, variables, reports_dir: Path):
+    # קומפילציה פעם אחת (no-op אם כבר קיבלנו Plan); הלולאה רק מריצה
+    # variables עוטף ל-VariableScope (משתני תרחיש → מחושבים → env) – אותו scope לכל הריצה
+    variables = as_scope(variables)
+    soft_before = results.get("soft_failures", 0)
+    for step in compile_steps(steps, ACTION_REGISTRY):
+        yield from step_flow(page, step, base_url=base_url, options=options,
+                             results=results, variables=variables, reports_dir=reports_dir)
+    soft = results.get("soft_failures", 0) - soft_before
+    if soft:
+        raise AssertionError(f"{soft} soft assertion step(s) failed (see soft-failed steps)")
+
+def execute_step(page, step, *, base_url, options, results, variables, reports_dir: Path):
+    """מריץ צעד אחד על page של sync_api (המימוש: step_flow)."""
+    return run_sync(step_flow(page, step, base_url=base_url, options=options, results=results,
+                              variables=variables, reports_dir=reports_dir))
 
 def run_steps(page, steps, *, base_url, options, results, variables, reports_dir: Path):
-    for step in steps:
-        execute_step(page, step, base_url=base_url, options=options,
-                     results=results, variables=variables, reports_dir=reports_dir)
+    """מריץ רשימת צעדים על page של sync_api (המימוש: steps_flow; ל-async – core/aio/runner.py)."""
+    return run_sync(steps_flow(page, steps, base_url=base_url, options=options, results=results,
+                               variables=variables, reports_dir=reports_dir))
+
+def compile_scenario(path: Path):
+    """טוען + מקמפל תרחיש בלי לפתוח דפדפן. מחזיר (scenario, options, plan)."""
+    scenario = load_scenario(path)
+    options = load_options(scenario)
+    return scenario, options, compile_steps(scenario["steps"], ACTION_REGISTRY)
 
-def run_scenario(path: Path) -> int:
-    scenario = read_yaml(path)
-    validate_scenario(scenario)
+def dry_run(path: Path) -> int:
+    """מדפיס את תוכנית ההרצה המקומפלת (ללא דפדפן). מחזיר 1 אם יש סוגי צעדים לא מוכרים."""
+    scenario, options, plan = compile_scenario(path)
+    browsers = options.get("browsers") or [options["browser"]]
+    print(f"Scenario: {scenario.get('name', path.stem)}  ({path})")
+    print(f"Base URL: {scenario.get('base_url') or scenario.get('url')}  | browsers: {', '.join(browsers)}"
+          f"  | timeout_ms: {options['timeout_ms']}")
+    print(f"Plan ({len(plan)} steps):")
+    print(format_plan(plan))
+    unknown = [cs.type for cs in plan if cs.type != "wait" and not cs.action]
+    if unknown:
+        print(f"⚠️ Unknown step types: {', '.join(sorted(set(unknown)))}")
+    return 1 if unknown else 0
+
+def run_scenario(path: Path, *, parallel: Optional[int] = None) -> int:
+    scenario, base_options, plan = compile_scenario(path)
 
     name = scenario.get("name", path.stem)
     base_url = scenario.get("base_url") or scenario.get("url")
-    base_options = load_options(scenario)
+    if parallel is not None:
+        base_options["parallel"] = max(0, int(parallel))
 
-    # משתנים זמינים – כולל RAND שהוזרק ב-load_options
+    # משתני התרחיש; ${RAND} וכו' מחושבים ב-scope של כל ריצה (core/template.py)
     variables = dict(base_options.get("variables") or {})
 
     browsers = base_options.get("browsers")
     if isinstance(browsers, (list, tuple)) and browsers:
-        rc = 0
+        jobs = []
         for bname in browsers:
-            print(f"\n=== Running on browser: {bname} ===\n")
             opts = dict(base_options); opts["browser"] = str(bname).lower()
             reports_dir = Path("reports") / opts["browser"]
-            rc = max(rc, _run_single(name, base_url, scenario["steps"], opts, reports_dir, variables))
+            jobs.append((opts, reports_dir))
+
+        workers = min(int(base_options.get("parallel") or 0), len(jobs))
+        if workers > 1:
+            return _run_matrix_parallel(name, base_url, plan, jobs, variables, workers)
+
+        rc = 0
+        for opts, reports_dir in jobs:
+            print(f"\n=== Running on browser: {opts['browser']} ===\n")
+            rc = max(rc, _run_single(name, base_url, plan, opts, reports_dir, variables))
         return rc
     else:
         reports_dir = Path("reports")
-        return _run_single(name, base_url, scenario["steps"], base_options, reports_dir, variables)
+        return _run_single(name, base_url, plan, base_options, reports_dir, variables)
+
+def _run_matrix_parallel(name: str, base_url: str, steps, jobs, variables: Dict[str, Any], workers: int) -> int:
+    """
+    מריץ את מטריצת הדפדפנים במקביל – כל דפדפן בתהליך נפרד (Playwright משלו),
+    עם תקרת מקביליות workers. כל תהליך כותב ל-reports/<browser> משלו.
+    """
+    print(f"\n=== Running {len(jobs)} browsers in parallel (workers={workers}) ===\n")
+    rc = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            (opts["browser"], pool.submit(_run_single, name, base_url, steps, opts, reports_dir, variables))
+            for opts, reports_dir in jobs
+        ]
+        for bname, fut in futures:
+            code = fut.result()
+            print(f"=== Browser {bname} finished (rc={code}) ===")
+            rc = max(rc, code)
+    return rc
 
-def _run_single(name: str, base_url: str, steps, options, reports_dir: Path, variables: Dict[str, Any]) -> int:
+def open_context_flow(browser, context_kwargs: Dict[str, Any], net_profile, har):
+    """context + page חדשים, עם פרופיל החסימה ו-replay של HAR (בסדר הזה – ה-HAR גובר)."""
+    ctx, page = yield twin(new_context_page, aio_browser.new_context_page, browser, **context_kwargs)
+    net_stats = yield twin(install_network_profile, async_install_network_profile, ctx, net_profile)
+    yield twin(install_har_replay, async_install_har_replay, ctx, har)
+    track_requests(ctx)  # לצעדי wait_for_response / wait_for_network_idle
+    return ctx, page, net_stats
+
+def setup_context_flow(browser, name: str, base_url: str, options, reports_dir: Path, variables,
+                       context_kwargs: Dict[str, Any]):
+    """
+    פתיחת ה-context של ריצה: HAR, use_auth (storage_state שמור, בדיקת סשן ולוגין מחדש)
+    ופרופיל הרשת. משותף ל-scenario_flow ול-core.controller.run_suite. מחזיר (ctx, page, net_stats, har).
+    """
+    net_profile = resolve_profile(options.get("network"))
+    har = resolve_har(options, name)
+    extra = har_context_options(har)
+    # use_auth: context חדש נטען מ-storage_state שמור במקום לבצע לוגין בכל ריצה
+    auth = resolve_auth(options, base_url, variables)
+    auth_kw = dict(base_url=base_url, options=options, variables=variables, reports_dir=reports_dir, har=har)
+    if auth:
+        state = yield twin(ensure_auth, async_ensure_auth, browser, auth, **auth_kw)
+        extra["storage_state"] = str(state)
+    context_kwargs = dict(context_kwargs, extra_context_options=extra or None)
+    ctx, page, net_stats = yield from open_context_flow(browser, context_kwargs, net_profile, har)
+    if auth and not (yield from session_alive(page, auth, base_url=base_url, timeout_ms=options["timeout_ms"])):
+        print("[auth] cached session expired – logging in again")
+        invalidate(auth["key"])
+        yield twin(close_context, aio_browser.close_context, ctx)
+        state = yield twin(ensure_auth, async_ensure_auth, browser, auth, force=True, **auth_kw)
+        extra["storage_state"] = str(state)
+        ctx, page, net_stats = yield from open_context_flow(browser, context_kwargs, net_profile, har)
+    return ctx, page, net_stats, har
+
+def scenario_flow(name: str, base_url: str, steps, options, reports_dir: Path, variables: Dict[str, Any],
+                  *, browser):
+    """
+    flow של ריצת תרחיש אחת ב-BrowserContext חדש על דפדפן שכבר רץ – משותף ל-_run_single
+    (sync) ול-core.aio.runner._run_single. מחזיר קוד יציאה.
+    """
     started = time.time()
     reports_dir.mkdir(parents=True, exist_ok=True)
     dl_dir = reports_dir / "downloads"; dl_dir.mkdir(parents=True, exist_ok=True)
     vid_dir = reports_dir / "video";     vid_dir.mkdir(parents=True, exist_ok=True)
 
-    p, browser, ctx, page = open_browser(
-        options["browser"],
-        options["headful"],
-        record_video_dir=(vid_dir if options.get("video") else None),
+    context_kwargs = dict(
+        record_video_dir=(vid_dir if options.get("video", "off") != "off" else None),
         downloads_dir=dl_dir,
         viewport=options.get("viewport"),
         user_agent=options.get("user_agent"),
         timeout_ms=options.get("timeout_ms"),
-        slow_mo=options.get("slow_mo", 0),
-        proxy=options.get("proxy"),
     )
 
-    results = start_run(name, base_url, options["browser"], options["headful"])
+    # scope אחד לכל הריצה – ${RAND} זהה בלוגין של use_auth ובצעדים
+    variables = as_scope(variables)
 
-    if options.get("tracing"):
-        try:
-            ctx.tracing.start(screenshots=True, snapshots=True, sources=True)
-        except Exception:
-            pass
+    try:
+        ctx, page, net_stats, har = yield from setup_context_flow(
+            browser, name, base_url, options, reports_dir, variables, context_kwargs)
+    except Exception as e:
+        results = start_run(name, base_url, options["browser"], options["headful"], log_dir=reports_dir)
+        finalize_run(results, "failed", f"setup failed: {e}", started, reports_dir)
+        print(f"❌ Setup failed: {e}")
+        return 1
 
+    results = start_run(name, base_url, options["browser"], options["headful"], log_dir=reports_dir)
+    results["report_mode"] = options.get("report_mode")
+    if net_stats is not None:
+        results["network"] = net_stats  # מתעדכן חי ע"י ה-route handler
+
+    # tracing פעם אחת ל-context; chunk לריצה – נשמר לדיסק רק לפי מצב ה-retain
+    trace_mode = options.get("tracing", "off")
+    if (yield twin(start_tracing, async_start_tracing, ctx, trace_mode)):
+        yield twin(start_chunk, async_start_chunk, ctx, title=name)
+    else:
+        trace_mode = "off"
+
+    status, error = "failed", None
     try:
-        run_steps(page, steps, base_url=base_url, options=options, results=results,
-                  variables=variables, reports_dir=reports_dir)
+        yield from steps_flow(page, steps, base_url=base_url, options=options, results=results,
+                              variables=variables, reports_dir=reports_dir)
         status, error = "passed", None
         print("\n✅ Scenario completed successfully!\n")
         return_code = 0
@@ -158,21 +286,49 @@ def _run_single(name: str, base_url: str, steps, options, reports_dir: Path, var
         status, error = "failed", str(e)
         shot = reports_dir / f"fail_{int(time.time())}.png"
         try:
-            page.screenshot(path=str(shot))
+            shot = yield twin(save_screenshot, async_save_screenshot, page, shot, options.get("artifacts"))
             attach_artifact(results, "screenshot", shot)
             print(f"❌ Failure. Screenshot: {shot}")
         except Exception:
             pass
         return_code = 1
     finally:
-        if options.get("tracing"):
-            try:
-                trace_path = reports_dir / "trace.zip"
-                ctx.tracing.stop(path=str(trace_path))
-                attach_artifact(results, "trace", trace_path)
-            except Exception:
-                pass
-        close_browser(p, browser, ctx)
+        failed = status != "passed"
+        # גם צעד continue_on_fail שנכשל שומר trace (retain-on-failure), אף שהריצה עברה
+        trace_failed = failed or results.get("continued_failures", 0) > 0
+        if trace_mode != "off":
+            kept = yield twin(stop_chunk, async_stop_chunk, ctx, trace_mode, trace_failed, reports_dir / "trace.zip")
+            if kept:
+                attach_artifact(results, "trace", kept)
+            yield twin(stop_tracing, async_stop_tracing, ctx)
+        videos = yield twin(video_paths, async_video_paths, ctx)
+        yield twin(close_context, aio_browser.close_context, ctx)
+        for v in settle_videos(videos, options.get("video", "off"), failed):
+            attach_artifact(results, "video", v)
+        # ה-HAR נכתב לדיסק רק בסגירת ה-context
+        if har and har["mode"] == "record" and har["path"].exists():
+            attach_artifact(results, "har", har["path"])
         finalize_run(results, status, error, started, reports_dir)
 
     return return_code
+
+def _run_single(name: str, base_url: str, steps, options, reports_dir: Path, variables: Dict[str, Any],
+                *, browser=None) -> int:
+    """
+    מריץ תרחיש על דפדפן אחד (sync_api). אם browser הועבר (דפדפן שכבר רץ, למשל מה-batch runner)
+    נפתח עליו BrowserContext נקי בלבד ונסגור רק אותו בסוף.
+    """
+    p = None
+    if browser is None:
+        p, browser = launch_browser(
+            options["browser"],
+            options["headful"],
+            slow_mo=options.get("slow_mo", 0),
+            proxy=options.get("proxy"),
+            server=options.get("browser_server"),
+        )
+    try:
+        return run_sync(scenario_flow(name, base_url, steps, options, reports_dir, variables, browser=browser))
+    finally:
+        if p is not None:
+            stop_browser(p, browser)
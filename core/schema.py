@@ -1,11 +1,27 @@
 # core/schema.py
 from __future__ import annotations
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 def _require(d: Dict[str, Any], key: str, msg: str):
     if key not in d or d[key] in (None, ""):
         raise ValueError(msg)
 
+# value של login: user (או הכינויים username / email), password, success, open – מפתח אחר הוא שגיאה
+LOGIN_KEYS = ("user", "password", "success", "open")
+LOGIN_USER_ALIASES = ("username", "email")
+
+def login_value_error(v: Any) -> Optional[str]:
+    """None אם value של login תקין, אחרת תיאור הבעיה (משותף ל-validate_scenario ול-action_login)."""
+    if not isinstance(v, dict) or not v.get("password"):
+        return "requires value: {user, password[, success, open]}"
+    unknown = sorted(k for k in v if k not in LOGIN_KEYS and k not in LOGIN_USER_ALIASES)
+    if unknown:
+        return f"unknown value key(s) {unknown}; expected {list(LOGIN_KEYS)} (user may be given as username/email)"
+    users = [k for k in ("user", *LOGIN_USER_ALIASES) if k in v]
+    if len(users) > 1:
+        return f"give the user once, got {users}"
+    return None
+
 def _is_ms_string(v: Any) -> bool:
     return isinstance(v, str) and v.strip().lower().endswith("ms") and v.strip()[:-2].strip().isdigit()
 
@@ -29,11 +45,28 @@ def validate_scenario(s: Dict[str, Any]) -> None:
             # עבור אלו, selector לרוב נדרש (מלבד click-by-intent שבו נשתמש ב-value)
             if t != "click":
                 _require(st, "selector", f"Step {i} '{t}' requires 'selector'")
+        if t == "wait_for_response":
+            _require(st, "selector", f"Step {i} 'wait_for_response' requires 'selector' (URL glob / re:regex)")
         if t == "fill":
             _require(st, "value", f"Step {i} 'fill' requires 'value'")
         if t == "press":
             _require(st, "value", f"Step {i} 'press' requires 'value'")
 
+        if t == "login":
+            err = login_value_error(st.get("value"))
+            if err:
+                raise ValueError(f"Step {i} 'login' {err}")
+
+        if t == "fill_form":
+            if not isinstance(st.get("value"), dict) or not st["value"]:
+                raise ValueError(f"Step {i} 'fill_form' requires value: {{selector|name|label: value}}")
+
+        if t == "assert_all":
+            v = st.get("value")
+            checks = v.get("checks") if isinstance(v, dict) else v
+            if not isinstance(checks, list) or not checks:
+                raise ValueError(f"Step {i} 'assert_all' requires a list of checks (or {{checks, soft}})")
+
         if t == "wait":
             # מאפשר גם "500ms" וגם מספר (שניות)
             if "value" not in st:
@@ -56,5 +89,9 @@ def validate_scenario(s: Dict[str, Any]) -> None:
             raise ValueError(f"Step {i} 'retry' must be int")
         if "retry_delay_ms" in st and not isinstance(st["retry_delay_ms"], int):
             raise ValueError(f"Step {i} 'retry_delay_ms' must be int")
+        if "retry_backoff" in st and not isinstance(st["retry_backoff"], (int, float)):
+            raise ValueError(f"Step {i} 'retry_backoff' must be a number")
+        if "retry_max_delay_ms" in st and not isinstance(st["retry_max_delay_ms"], int):
+            raise ValueError(f"Step {i} 'retry_max_delay_ms' must be int")
         if "continue_on_fail" in st and not isinstance(st["continue_on_fail"], bool):
             raise ValueError(f"Step {i} 'continue_on_fail' must be bool")
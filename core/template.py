@@ -0,0 +1,152 @@
+# core/template.py
+from __future__ import annotations
+import datetime, itertools, os, random, re, string, time, uuid
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+# ${KEY} – מפתח יכול להכיל אותיות, ספרות, _ . -
+_VAR_RE = re.compile(r"\$\{([^}]+)\}")
+
+
+def _rand_token(n: int = 6) -> str:
+    return "".join(random.choice(string.ascii_lowercase + string.digits) for _ in range(n))
+
+
+# ---------- משתנים מחושבים (lazy) ----------
+# name -> (fn(scope), memoize). memoize=True: מחושב פעם אחת לכל scope (ריצה).
+COMPUTED_VARS: Dict[str, Tuple[Callable[["VariableScope"], Any], bool]] = {
+    "RAND":       (lambda s: _rand_token(), True),          # יציב לאורך הריצה
+    "RAND_FRESH": (lambda s: _rand_token(), False),         # חדש בכל הפניה
+    "UUID":       (lambda s: uuid.uuid4().hex, False),
+    "TIMESTAMP":  (lambda s: int(time.time()), False),
+    "TIMESTAMP_MS": (lambda s: int(time.time() * 1000), False),
+    "NOW":        (lambda s: datetime.datetime.now().isoformat(timespec="seconds"), False),
+    "TODAY":      (lambda s: datetime.date.today().isoformat(), False),
+    "COUNTER":    (lambda s: next(s._counter), False),      # 1, 2, 3... לכל scope
+}
+
+
+class VariableScope(Mapping):
+    """
+    מיפוי משורשר לחיפוש משתנים: משתני התרחיש → משתנים מחושבים → env.
+    משתנה מחושב מוערך רק כשמפנים אליו; memoized נשמר ב-scope בלבד – scope אחד לריצה,
+    ולכן ${RAND} יציב לאורך ריצה אחת וחדש בכל ריצה (גם בכל דפדפן במטריצה).
+    """
+    def __init__(self, variables: Optional[Mapping[str, Any]] = None, *,
+                 env: Optional[Mapping[str, str]] = os.environ,
+                 computed: Optional[Mapping[str, Tuple[Callable, bool]]] = None):
+        self._vars: Mapping[str, Any] = variables or {}
+        self._env = env if env is not None else {}
+        self._computed = COMPUTED_VARS if computed is None else computed
+        self._memo: Dict[str, Any] = {}
+        self._counter = itertools.count(1)
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._vars:
+            return self._vars[key]
+        if key in self._computed:
+            if key in self._memo:
+                return self._memo[key]
+            fn, memoize = self._computed[key]
+            val = fn(self)
+            if memoize:
+                self._memo[key] = val
+            return val
+        if key in self._env:
+            return self._env[key]
+        raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._vars or key in self._computed or key in self._env
+
+    def __iter__(self) -> Iterator[str]:
+        # לא מעריכים משתנים מחושבים באיטרציה – רק שמות
+        seen = set()
+        for layer in (self._vars, self._computed, self._env):
+            for k in layer:
+                if k not in seen:
+                    seen.add(k)
+                    yield k
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+def as_scope(variables: Any) -> VariableScope:
+    return variables if isinstance(variables, VariableScope) else VariableScope(variables)
+
+
+# ---------- תבניות מקומפלות ----------
+
+class Template(tuple):
+    """תבנית מפוצלת מראש: חלקים = מחרוזת רגילה או ("var", KEY); source = המחרוזת המקורית."""
+    def __new__(cls, parts, source: str):
+        obj = super().__new__(cls, parts)
+        obj.source = source
+        return obj
+
+    def __getnewargs__(self):  # pickle (ProcessPoolExecutor)
+        return (tuple(self), self.source)
+
+    @property
+    def names(self) -> Tuple[str, ...]:
+        return tuple(p[1] for p in self if not isinstance(p, str))
+
+
+def compile_template(value: Any):
+    """
+    מפצל מחרוזת עם ${VAR} לחלקים פעם אחת. dict/list (למשל value של login / assert_all)
+    מקומפלים לכל איבר. ערך אחר (או בלי משתנים) מוחזר כמו שהוא.
+    """
+    if isinstance(value, dict):
+        return {k: compile_template(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [compile_template(v) for v in value]
+    if not isinstance(value, str) or "${" not in value:
+        return value
+    parts = []
+    pos = 0
+    for m in _VAR_RE.finditer(value):
+        if m.start() > pos:
+            parts.append(value[pos:m.start()])
+        parts.append(("var", m.group(1)))
+        pos = m.end()
+    if pos < len(value):
+        parts.append(value[pos:])
+    return Template(tuple(parts), value)
+
+
+def render_template(tpl: Any, variables: Optional[Mapping[str, Any]], *, typed: bool = False):
+    """
+    מרכיב תבנית מקומפלת; משתנה לא מוכר נשאר ${KEY}.
+    typed=True: תבנית שהיא הפניה יחידה (למשל "${DELAY}") מחזירה את הערך המקורי (int/float/bool).
+    """
+    if isinstance(tpl, dict):
+        return {k: render_template(v, variables, typed=typed) for k, v in tpl.items()}
+    if isinstance(tpl, list):
+        return [render_template(v, variables, typed=typed) for v in tpl]
+    if not isinstance(tpl, Template):
+        return tpl
+    variables = variables if variables is not None else {}
+    if typed and len(tpl) == 1 and not isinstance(tpl[0], str) and tpl[0][1] in variables:
+        return variables[tpl[0][1]]
+    out = []
+    for part in tpl:
+        if isinstance(part, str):
+            out.append(part)
+        else:
+            k = part[1]
+            out.append(str(variables[k]) if k in variables else "${" + k + "}")
+    return "".join(out)
+
+
+def substitute(value: Any, variables: Optional[Mapping[str, Any]]):
+    """החלפה במעבר regex יחיד (לערכים שלא קומפלו מראש)."""
+    if not isinstance(value, str) or "${" not in value:
+        return value
+    variables = variables if variables is not None else {}
+
+    def _sub(m):
+        k = m.group(1)
+        return str(variables[k]) if k in variables else m.group(0)
+    return _VAR_RE.sub(_sub, value)
@@ -0,0 +1,141 @@
+# core/tracing.py
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, List, Optional
+
+# מצבי שמירה ל-trace ול-video:
+#   off               – לא מקליטים
+#   on                – שומרים תמיד (ההתנהגות הישנה)
+#   retain-on-failure – מקליטים, אבל שומרים רק chunk/context שנכשל
+RETAIN_MODES = ("off", "on", "retain-on-failure")
+_ALIASES = {"0": "off", "false": "off", "no": "off", "none": "off",
+            "1": "on", "true": "on", "yes": "on", "always": "on",
+            "retain": "retain-on-failure", "on-failure": "retain-on-failure",
+            "retain_on_failure": "retain-on-failure"}
+
+
+def parse_retain_mode(v: Any, default: str = "off") -> str:
+    """bool / "0" / "1" / "on" / "retain-on-failure" ... → אחד מ-RETAIN_MODES."""
+    if v is None or v == "":
+        return default
+    if isinstance(v, bool):
+        return "on" if v else "off"
+    s = str(v).strip().lower()
+    s = _ALIASES.get(s, s)
+    if s not in RETAIN_MODES:
+        raise ValueError(f"expected one of {RETAIN_MODES}, got {v!r}")
+    return s
+
+
+def keep(mode: str, failed: bool) -> bool:
+    return mode == "on" or (mode == "retain-on-failure" and failed)
+
+
+# ---------- tracing: start פעם אחת ל-context, chunk לכל טסט ----------
+
+def start_tracing(ctx, mode: str) -> bool:
+    if mode == "off":
+        return False
+    try:
+        ctx.tracing.start(screenshots=True, snapshots=True, sources=True)
+        return True
+    except Exception:
+        return False
+
+
+def start_chunk(ctx, title: Optional[str] = None) -> None:
+    try:
+        ctx.tracing.start_chunk(title=title)
+    except Exception:
+        pass
+
+
+def stop_chunk(ctx, mode: str, failed: bool, path: Path) -> Optional[Path]:
+    """שומר את ה-chunk ל-path אם צריך לשמור אותו; אחרת Playwright זורק אותו בלי לכתוב zip."""
+    try:
+        if keep(mode, failed):
+            ctx.tracing.stop_chunk(path=str(path))
+            return path
+        ctx.tracing.stop_chunk()
+    except Exception:
+        pass
+    return None
+
+
+def stop_tracing(ctx) -> None:
+    try:
+        ctx.tracing.stop()
+    except Exception:
+        pass
+
+
+async def async_start_tracing(ctx, mode: str) -> bool:
+    if mode == "off":
+        return False
+    try:
+        await ctx.tracing.start(screenshots=True, snapshots=True, sources=True)
+        return True
+    except Exception:
+        return False
+
+
+async def async_start_chunk(ctx, title: Optional[str] = None) -> None:
+    try:
+        await ctx.tracing.start_chunk(title=title)
+    except Exception:
+        pass
+
+
+async def async_stop_chunk(ctx, mode: str, failed: bool, path: Path) -> Optional[Path]:
+    try:
+        if keep(mode, failed):
+            await ctx.tracing.stop_chunk(path=str(path))
+            return path
+        await ctx.tracing.stop_chunk()
+    except Exception:
+        pass
+    return None
+
+
+async def async_stop_tracing(ctx) -> None:
+    try:
+        await ctx.tracing.stop()
+    except Exception:
+        pass
+
+
+# ---------- video: הקובץ נכתב רק בסגירת ה-context, ואז מחליטים אם לשמור ----------
+
+def video_paths(ctx) -> List[Path]:
+    """נתיבי הווידאו של כל הדפים ב-context (לקרוא לפני הסגירה)."""
+    out = []
+    for pg in list(getattr(ctx, "pages", []) or []):
+        try:
+            if pg.video:
+                out.append(Path(pg.video.path()))
+        except Exception:
+            pass
+    return out
+
+
+async def async_video_paths(ctx) -> List[Path]:
+    out = []
+    for pg in list(getattr(ctx, "pages", []) or []):
+        try:
+            if pg.video:
+                out.append(Path(await pg.video.path()))
+        except Exception:
+            pass
+    return out
+
+
+def settle_videos(paths: List[Path], mode: str, failed: bool) -> List[Path]:
+    """אחרי סגירת ה-context: מוחק וידאו של ריצה שעברה (retain-on-failure). מחזיר את מה שנשמר."""
+    if keep(mode, failed):
+        return [p for p in paths if p.exists()]
+    for p in paths:
+        try:
+            p.unlink()
+        except OSError:
+            pass
+    return []
@@ -61,29 +61,13 @@ def suggest_next_actions(obs: Dict[str, Any]) -> List[Dict[str, Any]]:
     inputs = obs.get("inputs") or []
     texts = " ".join(obs.get("visible_texts") or [])
 
-    # 1) אם יש מודאל פתוח – ננסה לאתר שדות לוגין ולשלוח.
-    if modal and has_pw:
-        steps += [
-            {"type": "wait_for_selector", "selector": "input[type='password']", "value": "visible", "continue_on_fail": True},
-            {"type": "wait_for_selector", "selector": "input[type='text'], input[type='email'], [name*='user' i]", "value": "visible", "continue_on_fail": True},
-            {"type": "fill", "selector": "input[type='text'], input[type='email'], [name*='user' i]", "value": "${USERNAME}", "continue_on_fail": True},
-            {"type": "fill", "selector": "input[type='password']", "value": "${PASSWORD}", "continue_on_fail": True},
-            {"type": "click", "value": "log in", "continue_on_fail": True},
-        ]
-        return steps
-
-    # 2) אם יש שדה סיסמה אך אין מודאל – כנראה דף לוגין / הרשמה.
+    # 1) יש שדה סיסמה (במודאל או בדף) – צעד login אחד מזהה את השדות וה-submit בעצמו.
     if has_pw:
-        steps += [
-            {"type": "wait_for_selector", "selector": "input[type='password']", "value": "visible", "continue_on_fail": True},
-            {"type": "wait_for_selector", "selector": "input[type='text'], input[type='email'], [name*='user' i]", "value": "visible", "continue_on_fail": True},
-            {"type": "fill", "selector": "input[type='text'], input[type='email'], [name*='user' i]", "value": "${USERNAME}", "continue_on_fail": True},
-            {"type": "fill", "selector": "input[type='password']", "value": "${PASSWORD}", "continue_on_fail": True},
-            {"type": "click", "value": "login", "continue_on_fail": True},
-        ]
+        steps.append({"type": "login", "value": {"user": "${USERNAME}", "password": "${PASSWORD}"},
+                      "continue_on_fail": True})
         return steps
 
-    # 3) אם אין סיסמה – נחפש CTA עיקרי (start / continue / sign up / add to cart ...)
+    # 2) אם אין סיסמה – נחפש CTA עיקרי (start / continue / sign up / add to cart ...)
     cta_texts = ["start", "get started", "continue", "submit", "sign up", "register",
                  "buy", "add to cart", "checkout", "התחל", "המשך", "שלח", "הרשמה", "קנה", "הוסף לעגלה"]
     for b in buttons:
@@ -97,7 +81,7 @@ def suggest_next_actions(obs: Dict[str, Any]) -> List[Dict[str, Any]]:
                 ]
                 break
 
-    # 4) אם זוהתה שגיאה – נציע צילום מסך
+    # 3) אם זוהתה שגיאה – נציע צילום מסך
     if flags.get("error_banner"):
         steps.append({"type": "screenshot", "value": "error_banner.png"})
 
@@ -137,12 +121,8 @@ def generate_suite_from_graph_local(graph: Dict[str, Any]) -> List[Dict[str, Any
             "name": "Login (generic)",
             "steps": [
                 {"type": "goto", "selector": "/"},
-                {"type": "click", "value": "login", "continue_on_fail": True},
-                {"type": "wait_for_selector", "selector": "input[type='text'], input[type='email'], [name*='user' i]", "value": "visible", "continue_on_fail": True},
-                {"type": "wait_for_selector", "selector": "input[type='password']", "value": "visible", "continue_on_fail": True},
-                {"type": "fill", "selector": "input[type='text'], input[type='email'], [name*='user' i]", "value": "${USERNAME}", "continue_on_fail": True},
-                {"type": "fill", "selector": "input[type='password']", "value": "${PASSWORD}", "continue_on_fail": True},
-                {"type": "click", "value": "login", "continue_on_fail": True},
+                # login פותח את המודאל/טופס בעצמו אם עדיין אין שדה סיסמה
+                {"type": "login", "value": {"user": "${USERNAME}", "password": "${PASSWORD}"}, "continue_on_fail": True},
                 {"type": "screenshot", "value": "after_login.png"},
             ],
         })
@@ -153,10 +133,10 @@ def generate_suite_from_graph_local(graph: Dict[str, Any]) -> List[Dict[str, Any
             "steps": [
                 {"type": "goto", "selector": "/"},
                 {"type": "click", "value": "sign up", "continue_on_fail": True},
-                {"type": "wait_for_selector", "selector": "input[type='text'], input[type='email'], [name*='user' i]", "value": "visible", "continue_on_fail": True},
-                {"type": "wait_for_selector", "selector": "input[type='password']", "value": "visible", "continue_on_fail": True},
-                {"type": "fill", "selector": "input[type='text'], input[type='email'], [name*='user' i]", "value": "demo_${RAND}", "continue_on_fail": True},
-                {"type": "fill", "selector": "input[type='password']", "value": "demo_${RAND}", "continue_on_fail": True},
+                {"type": "fill_form", "value": {
+                    "input[type='text'], input[type='email'], [name*='user' i]": "demo_${RAND}",
+                    "input[type='password']": "demo_${RAND}",
+                }, "continue_on_fail": True},
                 {"type": "click", "value": "sign up", "continue_on_fail": True},
                 {"type": "screenshot", "value": "after_signup.png"},
             ],
@@ -0,0 +1,28 @@
+from pathlib import Path
+import argparse
+from core.reporting import RESULTS_LOG, render_report
+
+def main():
+    ap = argparse.ArgumentParser(description="Rebuild RPA reports from a results.jsonl log "
+                                             "(also works on partial logs of killed runs)")
+    ap.add_argument("logs", nargs="+", help=f"{RESULTS_LOG} file(s) or report directories containing one")
+    ap.add_argument("--out", default=None, help="Output directory (default: next to each log)")
+    ap.add_argument("--mode", choices=("auto", "single", "paged"), default=None,
+                    help="paged: small index page + step data in JSON chunks (for very large runs)")
+    args = ap.parse_args()
+
+    rc = 0
+    for item in args.logs:
+        log = Path(item)
+        if log.is_dir():
+            log = log / RESULTS_LOG
+        if not log.is_file():
+            print(f"❌ No results log: {log}")
+            rc = 1
+            continue
+        out = render_report(log, Path(args.out) if args.out else None, mode=args.mode)
+        print(f"✅ {log} -> {out}")
+    raise SystemExit(rc)
+
+if __name__ == "__main__":
+    main()
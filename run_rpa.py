@@ -1,13 +1,70 @@
 from pathlib import Path
-import argparse
+import argparse, os
 from core.runner import run_scenario
 
 def main():
     ap = argparse.ArgumentParser(description="RPA Runner (YAML + Playwright)")
-    ap.add_argument("scenario", help="Path to YAML scenario")
+    ap.add_argument("scenario", nargs="+", help="YAML scenario file(s), directories or globs")
+    ap.add_argument("--parallel", type=int, default=None,
+                    help="Run the options.browsers matrix with up to N browsers at once")
+    ap.add_argument("--workers", type=int, default=1,
+                    help="Batch mode: number of workers (each keeps its own browser)")
+    ap.add_argument("--engine", choices=("sync", "async"), default="sync",
+                    help="Batch mode: 'async' drives all scenarios from one event loop "
+                         "with --workers as the concurrent-context limit")
+    ap.add_argument("--dry-run", action="store_true",
+                    help="Print the compiled execution plan without starting a browser")
+    ap.add_argument("--network-profile", choices=("none", "fast", "minimal"), default=None,
+                    help="Block heavy/analytics requests (fast: images/fonts/media + analytics)")
+    ap.add_argument("--block", default=None,
+                    help="Comma-separated resource types to block (image,font,media,stylesheet,...)")
+    ap.add_argument("--deny", action="append", default=[],
+                    help="URL glob to block (repeatable)")
+    ap.add_argument("--allow", action="append", default=[],
+                    help="URL glob that is never blocked (repeatable)")
+    ap.add_argument("--network-mode", choices=("live", "record", "replay"), default=None,
+                    help="record: save traffic to reports/<name>/network_<browser>.har; "
+                         "replay: serve responses from that HAR (no network needed)")
+    ap.add_argument("--har-not-found", choices=("abort", "fallback"), default=None,
+                    help="Replay: abort requests missing from the HAR, or let them hit the network")
     args = ap.parse_args()
-    code = run_scenario(Path(args.scenario))
-    raise SystemExit(code)
+
+    # חסימת משאבים עוברת דרך env – load_options ממזג אותה עם options.network של התרחיש
+    if args.network_profile:
+        os.environ["NETWORK_PROFILE"] = args.network_profile
+    if args.block:
+        os.environ["NETWORK_BLOCK"] = args.block
+    if args.deny:
+        os.environ["NETWORK_DENY"] = ",".join(args.deny)
+    if args.allow:
+        os.environ["NETWORK_ALLOW"] = ",".join(args.allow)
+    if args.network_mode:
+        os.environ["NETWORK_MODE"] = args.network_mode
+    if args.har_not_found:
+        os.environ["HAR_NOT_FOUND"] = args.har_not_found
+
+    if args.dry_run:
+        from core.runner import dry_run
+        from core.batch import expand_scenario_paths
+        paths = expand_scenario_paths(args.scenario)
+        if not paths:
+            ap.error(f"No YAML scenarios matched: {' '.join(args.scenario)}")
+        raise SystemExit(max(dry_run(p) for p in paths))
+
+    # תרחיש בודד – ההתנהגות הקיימת
+    if len(args.scenario) == 1 and Path(args.scenario[0]).is_file():
+        code = run_scenario(Path(args.scenario[0]), parallel=args.parallel)
+        raise SystemExit(code)
+
+    from core.batch import expand_scenario_paths, run_batch
+    paths = expand_scenario_paths(args.scenario)
+    if not paths:
+        ap.error(f"No YAML scenarios matched: {' '.join(args.scenario)}")
+    print(f"[batch] {len(paths)} scenarios, workers={args.workers}, engine={args.engine}")
+    if args.engine == "async":
+        from core.aio.runner import run_batch_async
+        raise SystemExit(run_batch_async(paths, concurrency=args.workers))
+    raise SystemExit(run_batch(paths, workers=args.workers))
 
 if __name__ == "__main__":
     main()
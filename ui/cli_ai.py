@@ -23,7 +23,10 @@ def build_argparser():
     ap.add_argument("--url", required=True)
     ap.add_argument("--browser", default="chromium", choices=("chromium","firefox","webkit"))
     ap.add_argument("--headful", action="store_true")
-    ap.add_argument("--video", action="store_true")
+    ap.add_argument("--video", nargs="?", const="on", default="off",
+                    choices=("off", "on", "retain-on-failure"))
+    ap.add_argument("--tracing", default=None, choices=("off", "on", "retain-on-failure"),
+                    help="Per-test trace chunks (default: retain-on-failure)")
     ap.add_argument("--timeout-ms", type=int, default=20000)
     ap.add_argument("--viewport", type=_parse_viewport, default=_parse_viewport("1366x900"))
     ap.add_argument("--slow-mo", type=int, default=0)
@@ -32,6 +35,11 @@ def build_argparser():
     ap.add_argument("--var", action="append")
     ap.add_argument("--ollama-model", default="llama3")
     ap.add_argument("--no-llm", action="store_true", help="Run without LLM (use fallback plan)")
+    ap.add_argument("--use-auth", dest="use_auth", default=None,
+                    help="Login scenario YAML to run once; its storage state is reused across runs")
+    ap.add_argument("--network-mode", dest="network_mode", default=None, choices=("live", "record", "replay"),
+                    help="record traffic to a HAR, or replay the suite against the recorded HAR")
+    ap.add_argument("--har-not-found", dest="har_not_found", default=None, choices=("abort", "fallback"))
     return ap
 
 def main():
@@ -40,7 +48,8 @@ def main():
         "url": args.url,
         "browser": args.browser,
         "headful": bool(args.headful),
-        "video": bool(args.video),
+        "video": args.video,
+        "tracing": args.tracing,
         "timeout_ms": int(args.timeout_ms),
         "viewport": args.viewport,
         "slow_mo": int(args.slow_mo),
@@ -49,7 +58,10 @@ def main():
         "variables": {"USERNAME": "standard_user", "PASSWORD": "secret_sauce"},
         "ollama_model": args.ollama_model,
         "force_plan": True, # מבחינתנו לא רלוונטי, אבל לא מזיק
-        "no_llm": bool(args.no_llm)
+        "no_llm": bool(args.no_llm),
+        "use_auth": ({"include": args.use_auth} if args.use_auth else None),
+        "network_mode": args.network_mode,
+        "har_not_found": args.har_not_found,
     }
     options["variables"].update(_parse_vars(args.var))
     run_suite(options)
@@ -1,6 +1,9 @@
 from pathlib import Path
 import yaml
 
+# LibYAML (C) כשזמין – מהיר משמעותית מה-loader הטהור של Python
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 def read_yaml(path: Path) -> dict:
     with open(path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f) or {}
+        return yaml.load(f, Loader=_Loader) or {}